@@ -1,5 +1,41 @@
-from cricpy.io.file_loader import load_yaml
-from cricpy.parsers.cricsheet_parser import parse_match
+"""
+cricpy: parsing and analysis of Cricsheet cricket data.
+
+Public names are imported on first access (PEP 562), so ``import cricpy``
+does not pull in pandas or PyYAML until a loader or parser is used.
+"""
+import importlib
 
 __version__ = "0.1.0"
-__all__ = ["load_yaml", "parse_match"]
\ No newline at end of file
+
+_LAZY_ATTRIBUTES = {
+    'load_yaml': 'cricpy.io.file_loader',
+    'load_json': 'cricpy.io.file_loader',
+    'load_match': 'cricpy.io.file_loader',
+    'load_all_yaml': 'cricpy.io.file_loader',
+    'iter_matches': 'cricpy.io.file_loader',
+    'LoadStats': 'cricpy.io.file_loader',
+    'parse_match': 'cricpy.parsers.cricsheet_parser',
+    'parse_info': 'cricpy.parsers.cricsheet_parser',
+    'build_corpus': 'cricpy.io.corpus',
+    'open_corpus': 'cricpy.io.corpus',
+    'MatchCache': 'cricpy.cache',
+}
+_SUBMODULES = {'cache', 'cli', 'io', 'models', 'parsers', 'profiling', 'stats', 'synthetic'}
+
+__all__ = list(_LAZY_ATTRIBUTES)
+
+
+def __getattr__(name):
+    if name in _SUBMODULES:
+        return importlib.import_module(f'{__name__}.{name}')
+    module = _LAZY_ATTRIBUTES.get(name)
+    if module is None:
+        raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+    value = getattr(importlib.import_module(module), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_ATTRIBUTES) | _SUBMODULES)
@@ -0,0 +1,5 @@
+import sys
+
+from cricpy.cli import main
+
+sys.exit(main())
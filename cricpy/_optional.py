@@ -0,0 +1,17 @@
+"""
+Helpers for optional third-party dependencies.
+"""
+import importlib
+
+
+def import_optional(name, extra=None, feature=None):
+    """
+    Import and return an optional dependency, raising an ImportError that
+    names the package (and the cricpy extra providing it) when it is missing.
+    """
+    try:
+        return importlib.import_module(name)
+    except ImportError as e:
+        what = feature or 'this feature'
+        hint = f'pip install cricpy[{extra}]' if extra else f'pip install {name}'
+        raise ImportError(f'{name} is required for {what}; install it with `{hint}`') from e
@@ -0,0 +1,169 @@
+"""
+Thread-safe in-memory cache of parsed matches for long-running services.
+"""
+import os
+import threading
+from collections import OrderedDict
+
+from cricpy.io.file_loader import load_match
+from cricpy.parsers.cricsheet_parser import parse_match
+
+
+def _load_and_parse(path):
+    errors = []
+    match_dict = load_match(path, on_error=lambda _, e: errors.append(e))
+    if errors:
+        raise errors[0]
+    if not match_dict:
+        raise ValueError(f'match file is empty: {path}')
+    return parse_match(match_dict)
+
+
+def _frame_nbytes(value):
+    memory_usage = getattr(value, 'memory_usage', None)
+    if memory_usage is None:
+        return 0
+    return int(memory_usage(index=True, deep=True).sum())
+
+
+class _Pending:
+    __slots__ = ('event', 'value', 'error')
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.value = None
+        self.error = None
+
+
+class MatchCache:
+    """
+    LRU cache of parsed match files keyed by path.
+
+    Entries are bounded by count (``max_entries``) and, optionally, by the
+    approximate total size in bytes (``max_bytes``, measured with
+    ``sizeof``). Every lookup compares the file's mtime and size with the
+    cached entry and reloads it when the file has changed. Concurrent
+    lookups of the same uncached file share one load: the first caller
+    parses, the others wait for its result (or its exception).
+
+    ``load(path)`` defaults to ``load_match`` + ``parse_match``. Cached
+    values are shared between callers and must be treated as read-only.
+    """
+
+    def __init__(self, max_entries=1024, max_bytes=None, load=None, sizeof=None):
+        if max_entries < 1:
+            raise ValueError('max_entries must be at least 1')
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._load = load or _load_and_parse
+        self._sizeof = sizeof or _frame_nbytes
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._inflight = {}
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get(self, path):
+        """
+        Return the parsed match for ``path``, loading it on a miss.
+        """
+        key = os.path.abspath(path)
+        st = os.stat(key)
+        signature = (st.st_mtime_ns, st.st_size)
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[0] == signature:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return entry[1]
+                self._remove(key)
+                self.invalidations += 1
+            self.misses += 1
+            pending = self._inflight.get(key)
+            owner = pending is None
+            if owner:
+                pending = self._inflight[key] = _Pending()
+
+        if not owner:
+            pending.event.wait()
+            if pending.error is not None:
+                raise pending.error
+            return pending.value
+
+        try:
+            value = self._load(key)
+            size = self._sizeof(value)
+        except BaseException as e:
+            pending.error = e
+            with self._lock:
+                del self._inflight[key]
+            pending.event.set()
+            raise
+
+        pending.value = value
+        with self._lock:
+            del self._inflight[key]
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (signature, value, size)
+            self.nbytes += size
+            self._evict()
+        pending.event.set()
+        return value
+
+    def _remove(self, key):
+        _, _, size = self._entries.pop(key)
+        self.nbytes -= size
+
+    def _evict(self):
+        while len(self._entries) > self.max_entries or (
+            self.max_bytes is not None and self.nbytes > self.max_bytes and len(self._entries) > 1
+        ):
+            _, (_, _, size) = self._entries.popitem(last=False)
+            self.nbytes -= size
+            self.evictions += 1
+
+    def invalidate(self, path):
+        """
+        Drop the entry for ``path``, if cached.
+        """
+        key = os.path.abspath(path)
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+                self.invalidations += 1
+
+    def clear(self):
+        """
+        Drop all entries; counters are kept.
+        """
+        with self._lock:
+            self._entries.clear()
+            self.nbytes = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, path):
+        return os.path.abspath(path) in self._entries
+
+    def stats(self):
+        """
+        Return a snapshot of the cache counters.
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'nbytes': self.nbytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'evictions': self.evictions,
+                'invalidations': self.invalidations,
+            }
@@ -0,0 +1,519 @@
+"""
+Command-line interface for cricpy.
+
+Usage:
+    cricpy convert <src> <dst> [--format parquet|csv|wire] [--workers N] [--validate]
+                   [--quarantine DIR] [--explain REPORT] [--schedule stream|lpt]
+                   [--costs REPORT]
+    cricpy corpus <src> <dst> [--overwrite] [--dedup] [--dedup-index PATH] [--venue-index PATH]
+    cricpy ingest-shard <src> <dst> --shard-index I --num-shards N
+    cricpy merge-shards <shard_dir>... --output <dst>
+    cricpy scorecards <corpus> <dst> [--format parquet|json]
+    cricpy synthesize <dst> [--matches N] [--seed S] [--formats T20 ODI Test Hundred]
+                      [--format yaml|json|zip] [--workers N]
+"""
+import argparse
+import csv
+import importlib.util
+import json
+import os
+import shutil
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from cricpy.io.file_loader import iter_match_files, iter_matches, load_match, match_id_from_path
+
+FORMATS = ('parquet', 'csv', 'wire')
+SCHEDULES = ('stream', 'lpt')
+EXPLAIN_COLUMNS = ['file', 'bytes', 'balls', 'decode_s', 'parse_s', 'write_s', 'total_s', 'status']
+
+
+def _partition_value(value):
+    """
+    Render a value as a directory-safe partition label.
+    """
+    if value is None or value == '':
+        return 'unknown'
+    return str(value).replace('/', '-').replace(os.sep, '-')
+
+
+def convert_file(path, dst, fmt='parquet', validate=False, timings=None):
+    """
+    Convert one match file into a part of the output dataset.
+
+    The deliveries are written to ``<dst>/match_type=<type>/season=<season>/``
+    with the file stem as ``match_id``; ``fmt='wire'`` writes one message of
+    ``cricpy.io.wire``. Returns the number of deliveries written.
+    ``validate=True`` checks the match structure before parsing it and raises
+    MatchValidationError for a malformed match.
+
+    ``timings``, if given, is a dict that receives the seconds spent in the
+    ``decode``, ``parse`` and ``write`` steps as each one finishes.
+    """
+    from cricpy.parsers.cricsheet_parser import parse_info, parse_match
+
+    timings = {} if timings is None else timings
+    start = time.perf_counter()
+    errors = []
+    match_dict = load_match(path, on_error=lambda _, e: errors.append(e))
+    timings['decode'] = time.perf_counter() - start
+    if errors:
+        raise errors[0]
+    if not match_dict:
+        raise ValueError('file is empty')
+
+    start = time.perf_counter()
+    match_id = match_id_from_path(path)
+    df = parse_match(match_dict, validate=validate)
+    df.insert(0, 'match_id', match_id)
+    info = parse_info(match_dict)
+    timings['parse'] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    out_dir = os.path.join(
+        dst,
+        f"match_type={_partition_value(info['match_type'])}",
+        f"season={_partition_value(info['season'])}",
+    )
+    os.makedirs(out_dir, exist_ok=True)
+    out_path = os.path.join(out_dir, f'{match_id}.{fmt}')
+    if fmt == 'parquet':
+        df.to_parquet(out_path, index=False)
+    elif fmt == 'wire':
+        from cricpy.io.wire import encode_columns
+
+        with open(out_path, 'wb') as f:
+            f.write(encode_columns(df, match_id))
+    else:
+        df.to_csv(out_path, index=False)
+    timings['write'] = time.perf_counter() - start
+    return len(df)
+
+
+def _failure_kind(error):
+    """
+    Classify a conversion failure: a validation issue code, or one of
+    ``read_error``, ``decode_error`` and ``parse_error``.
+    """
+    import yaml
+
+    from cricpy.parsers.validation import MatchValidationError
+
+    if isinstance(error, MatchValidationError):
+        return error.code
+    if isinstance(error, (yaml.YAMLError, json.JSONDecodeError, UnicodeDecodeError)):
+        return 'decode_error'
+    if isinstance(error, OSError):
+        return 'read_error'
+    return 'parse_error'
+
+
+def _convert_task(task):
+    """
+    Worker entry point: convert one file and report (path, balls, error,
+    kind, timings).
+    """
+    path, dst, fmt, validate = task
+    timings = {}
+    try:
+        return path, convert_file(path, dst, fmt, validate, timings), None, None, timings
+    except Exception as e:
+        return path, 0, f'{type(e).__name__}: {e}', _failure_kind(e), timings
+
+
+def _explain_row(path, balls, kind, timings):
+    row = {'file': path, 'bytes': os.path.getsize(path) if os.path.exists(path) else 0,
+           'balls': balls}
+    for step in ('decode', 'parse', 'write'):
+        row[f'{step}_s'] = round(timings.get(step, 0.0), 6)
+    row['total_s'] = round(sum(timings.values()), 6)
+    row['status'] = kind or 'ok'
+    return row
+
+
+def write_explain_report(rows, path):
+    """
+    Write per-file conversion costs as CSV, most expensive first.
+    """
+    rows = sorted(rows, key=lambda row: row['total_s'], reverse=True)
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.DictWriter(f, fieldnames=EXPLAIN_COLUMNS)
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def read_explain_report(path):
+    """
+    Read a report written by ``write_explain_report`` into
+    {file: (bytes, total seconds)} for the files that converted.
+    """
+    costs = {}
+    with open(path, newline='', encoding='utf-8') as f:
+        for row in csv.DictReader(f):
+            if row['status'] == 'ok':
+                costs[row['file']] = (int(row['bytes']), float(row['total_s']))
+    return costs
+
+
+def estimate_costs(paths, report=None):
+    """
+    Estimate the relative conversion cost of each path.
+
+    Without a report the cost is the file size. With one (as returned by
+    ``read_explain_report``) a file measured at its current size costs its
+    measured time, and any other file its size times the report's overall
+    seconds per byte.
+    """
+    sizes = [os.path.getsize(path) for path in paths]
+    if not report:
+        return [float(size) for size in sizes]
+    measured_bytes = sum(size for size, _ in report.values())
+    rate = sum(seconds for _, seconds in report.values()) / max(measured_bytes, 1)
+    costs = []
+    for path, size in zip(paths, sizes):
+        known = report.get(path)
+        costs.append(known[1] if known is not None and known[0] == size else size * rate)
+    return costs
+
+
+def lpt_order(paths, costs):
+    """
+    Return the paths most expensive first (longest processing time first),
+    so the heaviest files cannot start last and stretch the tail of a
+    parallel run.
+    """
+    order = sorted(range(len(paths)), key=lambda i: costs[i], reverse=True)
+    return [paths[i] for i in order]
+
+
+def _quarantine(directory, path, kind, error):
+    """
+    Copy a failed file to ``<directory>/<kind>/`` and append it to the
+    quarantine's ``report.jsonl``.
+    """
+    target = os.path.join(directory, kind)
+    os.makedirs(target, exist_ok=True)
+    shutil.copy2(path, os.path.join(target, os.path.basename(path)))
+    with open(os.path.join(directory, 'report.jsonl'), 'a', encoding='utf-8') as f:
+        f.write(json.dumps({'file': path, 'kind': kind, 'error': error}) + '\n')
+
+
+def _run_tasks(tasks, workers):
+    """
+    Yield task results, keeping at most a few tasks per worker in flight so
+    the source archive is streamed rather than listed up front.
+    """
+    if workers <= 1:
+        for task in tasks:
+            yield _convert_task(task)
+        return
+
+    window = workers * 4
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = set()
+        for task in tasks:
+            pending.add(executor.submit(_convert_task, task))
+            if len(pending) >= window:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield future.result()
+        for future in pending:
+            yield future.result()
+
+
+class _Progress:
+    """
+    Throughput reporter writing files/sec and balls/sec to a stream.
+    """
+
+    def __init__(self, stream, interval=1.0, enabled=True):
+        self.stream = stream
+        self.interval = interval
+        self.enabled = enabled
+        self.files = 0
+        self.balls = 0
+        self.failed = 0
+        self.start = time.perf_counter()
+        self._last = self.start
+
+    def update(self, balls, failed):
+        self.files += 1
+        self.balls += balls
+        self.failed += int(failed)
+        now = time.perf_counter()
+        if self.enabled and now - self._last >= self.interval:
+            self._last = now
+            self._write(now)
+
+    def _write(self, now):
+        elapsed = max(now - self.start, 1e-9)
+        self.stream.write(
+            f'{self.files} files, {self.balls} balls, {self.failed} failed '
+            f'in {elapsed:.1f}s ({self.files / elapsed:.1f} files/s, '
+            f'{self.balls / elapsed:.0f} balls/s)\n'
+        )
+        self.stream.flush()
+
+    def finish(self):
+        if self.enabled:
+            self._write(time.perf_counter())
+
+
+def _parquet_available():
+    return any(importlib.util.find_spec(name) for name in ('pyarrow', 'fastparquet'))
+
+
+def _cmd_convert(args, parser):
+    if args.format == 'parquet' and not _parquet_available():
+        parser.error('parquet output requires pyarrow or fastparquet; use --format csv')
+    if os.path.isfile(args.src):
+        paths = iter([args.src])
+    elif os.path.isdir(args.src):
+        paths = iter_match_files(args.src)
+    else:
+        parser.error(f'source not found: {args.src}')
+    if args.costs and args.schedule != 'lpt':
+        parser.error('--costs requires --schedule lpt')
+    if args.schedule == 'lpt':
+        paths = list(paths)
+        report = read_explain_report(args.costs) if args.costs else None
+        paths = lpt_order(paths, estimate_costs(paths, report))
+
+    tasks = ((path, args.dst, args.format, args.validate) for path in paths)
+    progress = _Progress(sys.stderr, interval=args.progress_interval, enabled=not args.quiet)
+    explain = []
+    for path, balls, error, kind, timings in _run_tasks(tasks, args.workers):
+        if error:
+            sys.stderr.write(f'error: {path}: [{kind}] {error}\n')
+            if args.quarantine:
+                _quarantine(args.quarantine, path, kind, error)
+        if args.explain:
+            explain.append(_explain_row(path, balls, kind, timings))
+        progress.update(balls, error is not None)
+    progress.finish()
+    if args.explain:
+        write_explain_report(explain, args.explain)
+    return 1 if progress.failed else 0
+
+
+def _cmd_corpus(args, parser):
+    from cricpy.io.corpus import build_corpus
+    from cricpy.io.dedup import FingerprintIndex
+    from cricpy.stats.venues import VenueIndex
+
+    if not os.path.isdir(args.src):
+        parser.error(f'source folder not found: {args.src}')
+    errors = []
+    dedup = None
+    if args.dedup or args.dedup_index:
+        # a rebuild starts from an empty corpus, so it must not skip what the old one held
+        dedup = FingerprintIndex(args.dedup_index, reset=args.overwrite)
+    venues = VenueIndex.load(args.venue_index) if args.venue_index else None
+    try:
+        matches = iter_matches(args.src, on_error=lambda path, e: errors.append((path, e)),
+                               dedup=dedup)
+        corpus = build_corpus(matches, args.dst, overwrite=args.overwrite, venues=venues)
+        if venues is not None:
+            venues.save(args.venue_index)
+    except BaseException:
+        if dedup is not None:
+            dedup.rollback()
+        raise
+    finally:
+        if dedup is not None:
+            dedup.close()
+    for path, error in errors:
+        sys.stderr.write(f'error: {path}: {type(error).__name__}: {error}\n')
+    if not args.quiet:
+        sys.stderr.write(f'{corpus!r}\n')
+        if dedup is not None:
+            for duplicate in dedup.duplicates:
+                sys.stderr.write(f'duplicate: {duplicate.path} ({duplicate.reason} match of '
+                                 f'{duplicate.duplicate_of})\n')
+            sys.stderr.write(f'{len(dedup.duplicates)} duplicate files skipped\n')
+    return 1 if errors else 0
+
+
+def _cmd_ingest_shard(args, parser):
+    from cricpy.io.shards import ingest_shard
+
+    if not os.path.isdir(args.src):
+        parser.error(f'source folder not found: {args.src}')
+    if not 0 <= args.shard_index < args.num_shards:
+        parser.error(f'invalid shard {args.shard_index} of {args.num_shards}')
+    manifest = ingest_shard(args.src, args.dst, args.shard_index, args.num_shards,
+                            overwrite=args.overwrite)
+    for failure in manifest['failed']:
+        sys.stderr.write(f"error: {failure['source']}: {failure['error']}\n")
+    if not args.quiet:
+        sys.stderr.write(
+            f"shard {args.shard_index}/{args.num_shards}: {manifest['n_matches']} matches, "
+            f"{manifest['n_deliveries']} deliveries\n"
+        )
+    return 1 if manifest['failed'] else 0
+
+
+def _cmd_merge_shards(args, parser):
+    from cricpy.io.shards import merge_shards
+
+    try:
+        corpus = merge_shards(args.shards, args.output, overwrite=args.overwrite,
+                              require_complete=not args.allow_partial)
+    except (FileNotFoundError, ValueError) as e:
+        parser.error(str(e))
+    if not args.quiet:
+        sys.stderr.write(f'{corpus!r}\n')
+    return 0
+
+
+def _cmd_scorecards(args, parser):
+    from cricpy.io.corpus import open_corpus
+    from cricpy.stats.scorecard import corpus_scorecards, write_json, write_parquet
+
+    if args.format == 'parquet' and not _parquet_available():
+        parser.error('parquet output requires pyarrow; use --format json')
+    try:
+        corpus = open_corpus(args.corpus)
+    except FileNotFoundError as e:
+        parser.error(str(e))
+    cards = corpus_scorecards(corpus)
+    if args.format == 'parquet':
+        write_parquet(cards, args.dst)
+    else:
+        write_json(cards, args.dst)
+    if not args.quiet:
+        n_matches = corpus.manifest['n_matches']
+        sys.stderr.write(f'{len(cards.innings)} innings of {n_matches} matches\n')
+    return 0
+
+
+def _cmd_synthesize(args, parser):
+    from cricpy.synthetic import write_synthetic_corpus
+
+    start = time.perf_counter()
+    try:
+        write_synthetic_corpus(args.dst, args.matches, seed=args.seed, formats=args.formats,
+                               file_format=args.format, workers=args.workers)
+    except ValueError as e:
+        parser.error(str(e))
+    if not args.quiet:
+        sys.stderr.write(f'{args.matches} matches in {time.perf_counter() - start:.1f}s\n')
+    return 0
+
+
+def build_parser():
+    """
+    Build the argument parser for the ``cricpy`` command.
+    """
+    parser = argparse.ArgumentParser(prog='cricpy', description='Tools for Cricsheet match data')
+    subparsers = parser.add_subparsers(dest='command')
+    subparsers.required = True
+
+    convert = subparsers.add_parser(
+        'convert',
+        help='Convert YAML/JSON match files into a partitioned Parquet/CSV/wire dataset',
+    )
+    convert.add_argument('src', help='Match file or folder of match files')
+    convert.add_argument('dst', help='Output folder')
+    convert.add_argument('--format', choices=FORMATS, default='parquet', help='Output format')
+    convert.add_argument('--workers', type=int, default=1, help='Number of worker processes')
+    convert.add_argument('--progress-interval', type=float, default=1.0,
+                         help='Seconds between progress reports')
+    convert.add_argument('--validate', action='store_true',
+                         help='Check each match structure before converting it')
+    convert.add_argument('--quarantine', metavar='DIR',
+                         help='Copy files that fail into DIR/<kind>/ and list them in '
+                              'DIR/report.jsonl')
+    convert.add_argument('--explain', metavar='REPORT',
+                         help='Write per-file size, balls and decode/parse/write times to a '
+                              'CSV file')
+    convert.add_argument('--schedule', choices=SCHEDULES, default='stream',
+                         help='stream: convert files in listing order; '
+                              'lpt: list all files and convert the most expensive first')
+    convert.add_argument('--costs', metavar='REPORT',
+                         help='--explain report of an earlier run to estimate costs from '
+                              '(default: file size)')
+    convert.add_argument('--quiet', '-q', action='store_true', help='Do not report progress')
+    convert.set_defaults(func=_cmd_convert)
+
+    corpus = subparsers.add_parser(
+        'corpus',
+        help='Build a memory-mapped corpus from a folder of match files',
+    )
+    corpus.add_argument('src', help='Folder of match files')
+    corpus.add_argument('dst', help='Corpus folder to create')
+    corpus.add_argument('--overwrite', action='store_true', help='Replace an existing corpus')
+    corpus.add_argument('--dedup', action='store_true',
+                        help='Skip matches that repeat an earlier file in this run')
+    corpus.add_argument('--dedup-index', metavar='PATH',
+                        help='Fingerprint index file carrying deduplication across runs '
+                             '(implies --dedup; reset by --overwrite)')
+    corpus.add_argument('--venue-index', metavar='PATH',
+                        help='Venue index file to update with the ingested matches')
+    corpus.add_argument('--quiet', '-q', action='store_true', help='Do not print a summary')
+    corpus.set_defaults(func=_cmd_corpus)
+
+    ingest = subparsers.add_parser(
+        'ingest-shard',
+        help='Build the corpus of one shard of a folder of match files',
+    )
+    ingest.add_argument('src', help='Folder of match files (the same snapshot on every node)')
+    ingest.add_argument('dst', help='Shard folder to create')
+    ingest.add_argument('--shard-index', type=int, required=True, help='Shard to ingest (0-based)')
+    ingest.add_argument('--num-shards', type=int, required=True, help='Total number of shards')
+    ingest.add_argument('--overwrite', action='store_true', help='Replace an existing shard')
+    ingest.add_argument('--quiet', '-q', action='store_true', help='Do not print a summary')
+    ingest.set_defaults(func=_cmd_ingest_shard)
+
+    merge = subparsers.add_parser(
+        'merge-shards',
+        help='Merge shard folders into a single corpus',
+    )
+    merge.add_argument('shards', nargs='+', help='Shard folders written by ingest-shard')
+    merge.add_argument('--output', '-o', required=True, help='Corpus folder to create')
+    merge.add_argument('--overwrite', action='store_true', help='Replace an existing corpus')
+    merge.add_argument('--allow-partial', action='store_true',
+                       help='Merge even if some shards are missing')
+    merge.add_argument('--quiet', '-q', action='store_true', help='Do not print a summary')
+    merge.set_defaults(func=_cmd_merge_shards)
+
+    cards = subparsers.add_parser(
+        'scorecards',
+        help='Write the scorecards of every match in a corpus',
+    )
+    cards.add_argument('corpus', help='Corpus folder')
+    cards.add_argument('dst', help='Output folder')
+    cards.add_argument('--format', choices=('parquet', 'json'), default='parquet',
+                       help='One Parquet file per table, or one JSON file per match')
+    cards.add_argument('--quiet', '-q', action='store_true', help='Do not print a summary')
+    cards.set_defaults(func=_cmd_scorecards)
+
+    synth = subparsers.add_parser(
+        'synthesize',
+        help='Write a reproducible corpus of synthetic match files',
+    )
+    synth.add_argument('dst', help='Output folder, or zip file with --format zip')
+    synth.add_argument('--matches', type=int, default=1000, help='Number of matches')
+    synth.add_argument('--seed', type=int, default=0, help='The same seed writes the same files')
+    synth.add_argument('--formats', nargs='+', default=['T20'],
+                       help='Match formats to draw from: T20, ODI, Test, Hundred')
+    synth.add_argument('--format', choices=('yaml', 'json', 'zip'), default='yaml',
+                       help='One YAML or JSON file per match, or a zip of YAML files')
+    synth.add_argument('--workers', type=int, default=1, help='Number of worker processes')
+    synth.add_argument('--quiet', '-q', action='store_true', help='Do not print a summary')
+    synth.set_defaults(func=_cmd_synthesize)
+    return parser
+
+
+def main(argv=None):
+    """
+    Run the ``cricpy`` command and return its exit status.
+    """
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    return args.func(args, parser)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,45 @@
+"""
+Loading of Cricsheet match files and storage of parsed corpora.
+
+Names are imported on first access so importing the package stays cheap.
+"""
+import importlib
+
+_LAZY_ATTRIBUTES = {
+    'load_yaml': 'cricpy.io.file_loader',
+    'load_json': 'cricpy.io.file_loader',
+    'load_match': 'cricpy.io.file_loader',
+    'load_all_yaml': 'cricpy.io.file_loader',
+    'iter_match_files': 'cricpy.io.file_loader',
+    'iter_matches': 'cricpy.io.file_loader',
+    'LoadStats': 'cricpy.io.file_loader',
+    'aiter_matches': 'cricpy.io.async_loader',
+    'aload_all_yaml': 'cricpy.io.async_loader',
+    'build_corpus': 'cricpy.io.corpus',
+    'open_corpus': 'cricpy.io.corpus',
+    'Corpus': 'cricpy.io.corpus',
+    'CorpusWriter': 'cricpy.io.corpus',
+    'shard_of': 'cricpy.io.file_loader',
+    'ingest_shard': 'cricpy.io.shards',
+    'merge_shards': 'cricpy.io.shards',
+    'FingerprintIndex': 'cricpy.io.dedup',
+    'to_wire': 'cricpy.io.wire',
+    'read_wire': 'cricpy.io.wire',
+    'iter_wire': 'cricpy.io.wire',
+    'write_wire': 'cricpy.io.wire',
+}
+
+__all__ = list(_LAZY_ATTRIBUTES)
+
+
+def __getattr__(name):
+    module = _LAZY_ATTRIBUTES.get(name)
+    if module is None:
+        raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+    value = getattr(importlib.import_module(module), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_ATTRIBUTES))
@@ -0,0 +1,128 @@
+"""
+Asyncio loading of match files, overlapping file I/O with decoding.
+
+Blocking ``open``/``read`` calls run on a thread pool sized to the in-flight
+window, so on high-latency filesystems (NFS, FUSE mounts) many files are
+being fetched while earlier ones are decoded. Decoding runs on
+``decode_executor``, which defaults to the event loop's executor. Pass a
+``ProcessPoolExecutor`` to decode on several cores.
+
+    async for match_id, match in aiter_matches('matches/', max_in_flight=32):
+        ...
+"""
+import asyncio
+import json
+import logging
+import os
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from cricpy.io.file_loader import (
+    MATCH_EXTENSIONS, YAML_EXTENSIONS, iter_match_files, match_id_from_path, yaml_loads,
+)
+
+logger = logging.getLogger(__name__)
+
+
+def read_bytes(path):
+    """
+    Read a whole file as bytes.
+    """
+    with open(path, 'rb') as f:
+        return f.read()
+
+
+def decode_match(path, data):
+    """
+    Decode the bytes of a match file, as JSON for ``.json`` files and as
+    YAML otherwise.
+    """
+    text = data.decode('utf-8')
+    if str(path).endswith('.json'):
+        return json.loads(text)
+    return yaml_loads(text)
+
+
+async def _load_one(loop, path, reader, io_executor, decode_executor):
+    data = await loop.run_in_executor(io_executor, reader, path)
+    match = await loop.run_in_executor(decode_executor, decode_match, path, data)
+    return len(data), match
+
+
+async def _aiter_loaded(paths, max_in_flight, decode_executor, reader, on_error, stats):
+    """
+    Yield (path, match_dict) for each path in input order, keeping up to
+    ``max_in_flight`` files being read or decoded at once.
+    """
+    if max_in_flight < 1:
+        raise ValueError('max_in_flight must be at least 1')
+    loop = asyncio.get_running_loop()
+    reader = reader or read_bytes
+    io_executor = ThreadPoolExecutor(max_workers=max_in_flight)
+    pending = deque()
+
+    def submit(path):
+        task = asyncio.ensure_future(_load_one(loop, path, reader, io_executor, decode_executor))
+        pending.append((path, time.perf_counter(), task))
+
+    async def finish():
+        path, start, task = pending.popleft()
+        try:
+            nbytes, match = await task
+        except Exception as e:
+            if stats is not None:
+                stats.record(path, 0, time.perf_counter() - start, error=e)
+            if on_error is not None:
+                on_error(path, e)
+            else:
+                logger.error("Failed to load file: %s — %s", path, e)
+            return None
+        if stats is not None:
+            stats.record(path, nbytes, time.perf_counter() - start)
+        return path, match
+
+    try:
+        for path in paths:
+            submit(path)
+            if len(pending) >= max_in_flight:
+                result = await finish()
+                if result is not None and result[1]:
+                    yield result
+        while pending:
+            result = await finish()
+            if result is not None and result[1]:
+                yield result
+    finally:
+        for _, _, task in pending:
+            task.cancel()
+        io_executor.shutdown(wait=False)
+
+
+async def aiter_matches(folder_path, max_in_flight=16, decode_executor=None, reader=None,
+                        on_error=None, stats=None, extensions=MATCH_EXTENSIONS):
+    """
+    Asynchronously yield (match_id, match_dict) for the match files in a
+    folder, in sorted filename order, like ``iter_matches``.
+
+    ``reader(path) -> bytes`` replaces the blocking file read (it runs on the
+    I/O thread pool). ``on_error`` and ``stats`` behave as for ``load_yaml``.
+    """
+    async for path, match in _aiter_loaded(iter_match_files(folder_path, extensions),
+                                           max_in_flight, decode_executor, reader,
+                                           on_error, stats):
+        yield match_id_from_path(path), match
+
+
+async def aload_all_yaml(folder_path, max_in_flight=16, decode_executor=None, reader=None,
+                         on_error=None, stats=None):
+    """
+    Asynchronous ``load_all_yaml``: returns a list of (filename, match_dict)
+    tuples for the YAML files in a folder.
+    """
+    return [
+        (os.path.basename(path), match)
+        async for path, match in _aiter_loaded(iter_match_files(folder_path, YAML_EXTENSIONS),
+                                               max_in_flight, decode_executor, reader,
+                                               on_error, stats)
+    ]
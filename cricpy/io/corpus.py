@@ -0,0 +1,392 @@
+"""
+Consolidated, memory-mapped corpus of parsed deliveries.
+
+A corpus is a folder holding one raw little-endian array per delivery
+column, a shared string dictionary for the name-like columns and a table of
+match metadata:
+
+    corpus.json          manifest: row counts, column dtypes
+    strings.json         string dictionary; string columns hold int32 codes (-1 = None)
+    matches.json         one record per match, with its [start, stop) delivery rows
+    <column>.bin         raw delivery column data
+    wickets.<column>.bin one row per wicket
+    fielders.<column>.bin one row per fielder credited in a wicket
+
+The wickets and fielders side tables refer to deliveries by ``row``, the
+delivery's position in the corpus, so dismissal and fielding analysis are
+integer joins.
+
+Opening a corpus maps the column files read-only, so it costs a few small
+JSON reads regardless of corpus size, and every process opening the same
+corpus shares one copy of the data in the page cache.
+
+    build_corpus(iter_matches('matches/'), 'corpus/')
+    corpus = open_corpus('corpus/')
+    df = corpus.to_pandas()
+"""
+import array
+import json
+import os
+import shutil
+import sys
+
+import numpy as np
+import pandas as pd
+
+from cricpy.parsers.cricsheet_parser import (
+    BOOL_COLUMNS, COLUMNS, FIELDER_COLUMNS, STRING_COLUMNS, WICKET_TABLE_COLUMNS,
+    delivery_columns, dismissal_columns, parse_info,
+)
+
+FORMAT_VERSION = 1
+MANIFEST = 'corpus.json'
+STRINGS = 'strings.json'
+MATCHES = 'matches.json'
+
+_TYPECODES = {
+    'match_index': 'i',
+    'row': 'i',
+    'ball': 'd',
+    'over': 'h',
+    'ball_in_over': 'h',
+    'runs_total': 'h',
+    'runs_batter': 'h',
+    'runs_extras': 'h',
+    'wicket_number': 'h',
+}
+SIDE_TABLES = {
+    'wickets': ['row', 'match_index'] + WICKET_TABLE_COLUMNS[1:],
+    'fielders': ['row', 'match_index'] + FIELDER_COLUMNS[1:],
+}
+
+
+def _typecode(column):
+    """
+    array.array typecode used to store a column.
+    """
+    if column in STRING_COLUMNS:
+        return 'i'
+    if column in BOOL_COLUMNS:
+        return 'b'
+    return _TYPECODES.get(column, 'i')
+
+
+def _column_spec(column):
+    return {
+        'dtype': np.dtype(_typecode(column)).newbyteorder('<').str,
+        'strings': column in STRING_COLUMNS,
+    }
+
+
+class _TableWriter:
+    """
+    Buffered column files for one table of a corpus.
+    """
+
+    def __init__(self, path, prefix, columns):
+        self.columns = columns
+        self.n_rows = 0
+        self._buffers = {c: array.array(_typecode(c)) for c in columns}
+        self._files = {c: open(os.path.join(path, f'{prefix}{c}.bin'), 'wb') for c in columns}
+
+    def extend(self, columns, n):
+        for name, values in columns.items():
+            self._buffers[name].extend(values)
+        self.n_rows += n
+
+    def buffered(self):
+        return len(self._buffers[self.columns[0]])
+
+    def flush(self):
+        for name, buffer in self._buffers.items():
+            if sys.byteorder == 'big':
+                buffer.byteswap()
+            buffer.tofile(self._files[name])
+            del buffer[:]
+
+    def close(self):
+        for f in self._files.values():
+            f.close()
+
+    def manifest(self):
+        return {
+            'n_rows': self.n_rows,
+            'columns': {name: _column_spec(name) for name in self.columns},
+        }
+
+
+class CorpusWriter:
+    """
+    Stream matches into a new corpus folder.
+
+    Rows are buffered per column and flushed to disk every ``flush_rows``
+    deliveries, so memory use is bounded by the buffer size and the string
+    dictionary, not by the corpus size. The manifest is written by
+    ``close``; a folder without one is an incomplete corpus.
+
+    ``venues`` (a ``cricpy.stats.venues.VenueIndex``) is updated with every
+    match added, reusing the parsed deliveries.
+    """
+
+    def __init__(self, path, overwrite=False, flush_rows=1 << 16, venues=None):
+        if os.path.exists(path):
+            if not overwrite and os.listdir(path):
+                raise FileExistsError(f'corpus folder is not empty: {path}')
+            shutil.rmtree(path)
+        os.makedirs(path)
+        self.path = path
+        self.flush_rows = flush_rows
+        self.venues = venues
+        self.columns = ['match_index'] + COLUMNS
+        self.matches = []
+        self._strings = []
+        self._codes = {}
+        self._deliveries = _TableWriter(path, '', self.columns)
+        self._side = {name: _TableWriter(path, f'{name}.', columns)
+                      for name, columns in SIDE_TABLES.items()}
+        self._closed = False
+
+    @property
+    def n_rows(self):
+        return self._deliveries.n_rows
+
+    def _code(self, value):
+        if value is None:
+            return -1
+        code = self._codes.get(value)
+        if code is None:
+            code = self._codes[value] = len(self._strings)
+            self._strings.append(value)
+        return code
+
+    def _encode(self, columns):
+        code = self._code
+        return {
+            name: [code(v) for v in values] if name in STRING_COLUMNS else values
+            for name, values in columns.items()
+        }
+
+    def add(self, match_id, match_dict):
+        """
+        Append one match; returns the number of deliveries added.
+        """
+        columns = delivery_columns(match_dict)
+        n = len(columns['ball'])
+        start = self.n_rows
+        match_index = len(self.matches)
+        record = {'match_id': str(match_id), 'start': start, 'stop': start + n}
+        record.update(parse_info(match_dict))
+        self.matches.append(record)
+        if self.venues is not None:
+            self.venues.add(match_id, match_dict, columns)
+
+        columns['match_index'] = [match_index] * n
+        self._deliveries.extend(self._encode(columns), n)
+
+        for name, table in zip(SIDE_TABLES, dismissal_columns(match_dict)):
+            rows = table.pop('delivery_id')
+            table['row'] = [start + i for i in rows]
+            table['match_index'] = [match_index] * len(rows)
+            self._side[name].extend(self._encode(table), len(rows))
+
+        if self._deliveries.buffered() >= self.flush_rows:
+            self._flush()
+        return n
+
+    def _flush(self):
+        self._deliveries.flush()
+        for table in self._side.values():
+            table.flush()
+
+    def _close_files(self):
+        self._deliveries.close()
+        for table in self._side.values():
+            table.close()
+        self._closed = True
+
+    def close(self):
+        """
+        Flush the remaining rows and write the dictionary, match table and manifest.
+        """
+        if self._closed:
+            return
+        self._flush()
+        self._close_files()
+        with open(os.path.join(self.path, STRINGS), 'w', encoding='utf-8') as f:
+            json.dump(self._strings, f, ensure_ascii=False)
+        with open(os.path.join(self.path, MATCHES), 'w', encoding='utf-8') as f:
+            json.dump(self.matches, f, ensure_ascii=False, default=str)
+        manifest = {
+            'version': FORMAT_VERSION,
+            'n_deliveries': self.n_rows,
+            'n_matches': len(self.matches),
+            'byteorder': 'little',
+            'columns': self._deliveries.manifest()['columns'],
+            'tables': {name: table.manifest() for name, table in self._side.items()},
+        }
+        with open(os.path.join(self.path, MANIFEST), 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, indent=2)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self._close_files()
+
+
+def build_corpus(matches, path, overwrite=False, venues=None):
+    """
+    Build a corpus at ``path`` from an iterable of (match_id, match_dict)
+    pairs, such as ``iter_matches(folder)``. Returns the opened Corpus.
+    ``venues`` is passed to the CorpusWriter.
+    """
+    with CorpusWriter(path, overwrite=overwrite, venues=venues) as writer:
+        for match_id, match_dict in matches:
+            writer.add(match_id, match_dict)
+    return Corpus(path)
+
+
+class Corpus:
+    """
+    Read-only view of a corpus folder with memory-mapped columns.
+    """
+
+    def __init__(self, path):
+        manifest_path = os.path.join(path, MANIFEST)
+        if not os.path.exists(manifest_path):
+            raise FileNotFoundError(f'not a corpus (no {MANIFEST}): {path}')
+        with open(manifest_path, encoding='utf-8') as f:
+            self.manifest = json.load(f)
+        if self.manifest.get('version') != FORMAT_VERSION:
+            raise ValueError(f"unsupported corpus version: {self.manifest.get('version')}")
+        self.path = path
+        self._strings = None
+        self._matches = None
+        self._match_ids = None
+        self._arrays = {}
+
+    def __len__(self):
+        return self.manifest['n_deliveries']
+
+    def __repr__(self):
+        return (
+            f"Corpus({self.path!r}, matches={self.manifest['n_matches']}, "
+            f'deliveries={len(self)})'
+        )
+
+    @property
+    def columns(self):
+        return list(self.manifest['columns'])
+
+    @property
+    def strings(self):
+        """
+        The string dictionary shared by all string columns.
+        """
+        if self._strings is None:
+            with open(os.path.join(self.path, STRINGS), encoding='utf-8') as f:
+                self._strings = json.load(f)
+        return self._strings
+
+    @property
+    def matches(self):
+        """
+        Match metadata as a DataFrame, one row per match in corpus order.
+        """
+        if self._matches is None:
+            with open(os.path.join(self.path, MATCHES), encoding='utf-8') as f:
+                self._matches = pd.DataFrame(json.load(f))
+        return self._matches
+
+    def _table_spec(self, table):
+        if table == 'deliveries':
+            return len(self), self.manifest['columns'], ''
+        spec = self.manifest['tables'][table]
+        return spec['n_rows'], spec['columns'], f'{table}.'
+
+    def column(self, name, table='deliveries'):
+        """
+        Return the memory-mapped array for a column of ``table``
+        ('deliveries', 'wickets' or 'fielders'); string columns give their
+        int32 codes into ``strings``.
+        """
+        arr = self._arrays.get((table, name))
+        if arr is None:
+            n_rows, columns, prefix = self._table_spec(table)
+            dtype = np.dtype(columns[name]['dtype'])
+            if n_rows == 0:
+                arr = np.empty(0, dtype=dtype)
+            else:
+                arr = np.memmap(os.path.join(self.path, f'{prefix}{name}.bin'), dtype=dtype,
+                                mode='r', shape=(n_rows,))
+            self._arrays[(table, name)] = arr
+        return arr
+
+    def _match_id_codes(self):
+        """
+        (codes, categories) mapping each match index to its match id; two
+        matches may share an id (e.g. ``a.yaml`` and ``a.json``).
+        """
+        if self._match_ids is None:
+            ids = self.matches['match_id'] if len(self.matches) else pd.Series([], dtype=object)
+            codes, categories = pd.factorize(ids)
+            self._match_ids = codes.astype(np.int32), pd.Index(categories, dtype=object)
+        return self._match_ids
+
+    def _series(self, name, start, stop, table='deliveries'):
+        values = self.column(name, table)[start:stop]
+        if name == 'match_index':
+            codes, categories = self._match_id_codes()
+            return pd.Categorical.from_codes(codes[values], categories=categories)
+        if name in STRING_COLUMNS:
+            return pd.Categorical.from_codes(values, categories=pd.Index(self.strings))
+        if name in BOOL_COLUMNS:
+            return values.astype(bool)
+        return values
+
+    def to_pandas(self, columns=None, start=0, stop=None):
+        """
+        Return deliveries as a DataFrame with categorical string columns and
+        a ``match_id`` column, indexed by corpus row. Numeric columns are not
+        copied out of the map.
+        """
+        stop = len(self) if stop is None else stop
+        columns = columns or COLUMNS
+        data = {'match_id': self._series('match_index', start, stop)}
+        for name in columns:
+            data[name] = self._series(name, start, stop)
+        return pd.DataFrame(data, index=pd.RangeIndex(start, stop), copy=False)
+
+    def table(self, name):
+        """
+        Return the 'wickets' or 'fielders' side table as a DataFrame. Its
+        ``row`` column is the corpus row (``to_pandas`` index) of the delivery.
+        """
+        n_rows, columns, _ = self._table_spec(name)
+        data = {'match_id': self._series('match_index', 0, n_rows, name)}
+        for column in columns:
+            if column != 'match_index':
+                data[column] = self._series(column, 0, n_rows, name)
+        return pd.DataFrame(data, copy=False)
+
+    def match(self, match_id, columns=None):
+        """
+        Return the deliveries of one match (of every match with that id, in
+        corpus order, if several share it).
+        """
+        records = self.matches[self.matches['match_id'] == str(match_id)]
+        if not len(records):
+            raise KeyError(match_id)
+        frames = [self.to_pandas(columns, int(start), int(stop))
+                  for start, stop in zip(records['start'], records['stop'])]
+        return frames[0] if len(frames) == 1 else pd.concat(frames)
+
+
+def open_corpus(path):
+    """
+    Open a corpus folder written by ``build_corpus``.
+    """
+    return Corpus(path)
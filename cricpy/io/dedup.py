@@ -0,0 +1,193 @@
+"""
+Duplicate-match detection for ingest.
+
+The same match often arrives several times under different file names when
+Cricsheet bundles are mixed (all matches, per-league and per-team
+archives). A FingerprintIndex recognises repeats by two fingerprints:
+
+    content   a hash of the file text; identical copies are skipped before
+              they are decoded
+    identity  a hash of the match identity in ``info`` (match type, gender,
+              teams, dates and venue); catches copies that differ in layout
+              or formatting. For YAML files it is read from the text before
+              the ``innings`` section, so deliveries are never decoded
+
+With a ``path`` the index is persisted as an append-only text file, so a
+later run skips the matches an earlier run already ingested. New entries
+are written by ``flush`` or ``close``; leaving the ``with`` block on an
+exception drops the entries of that run, so a failed ingest is retried in
+full. ``reset=True`` starts the file afresh, for rebuilding from scratch.
+
+    with FingerprintIndex('seen.idx') as index:
+        for match_id, match in iter_matches('bundles/', dedup=index):
+            ...
+    index.duplicates     # [Duplicate(path, duplicate_of, reason), ...]
+"""
+import hashlib
+import json
+import logging
+import os
+from collections import namedtuple
+
+from cricpy.io.file_loader import yaml_loads
+
+logger = logging.getLogger(__name__)
+
+Duplicate = namedtuple('Duplicate', ['path', 'duplicate_of', 'reason'])
+
+
+def content_fingerprint(text):
+    """
+    Return the content fingerprint of a match file's text.
+    """
+    return hashlib.blake2b(text.encode('utf-8'), digest_size=16).hexdigest()
+
+
+def match_identity(match_dict):
+    """
+    Return the identity fingerprint of a match, or None when its ``info``
+    lacks the teams or dates needed to identify it.
+    """
+    info = (match_dict or {}).get('info') or {}
+    teams = info.get('teams')
+    dates = info.get('dates')
+    if not teams or not dates:
+        return None
+    key = [
+        info.get('match_type'),
+        info.get('gender'),
+        sorted(str(t) for t in teams),
+        [str(d) for d in dates],
+        info.get('venue'),
+    ]
+    return hashlib.blake2b(json.dumps(key).encode('utf-8'), digest_size=16).hexdigest()
+
+
+def _yaml_header(text):
+    """
+    Decode the part of a YAML match file before its ``innings`` section.
+    """
+    end = text.find('\ninnings:')
+    try:
+        header = yaml_loads(text if end < 0 else text[:end])
+    except Exception:
+        return None
+    return header if isinstance(header, dict) else None
+
+
+class FingerprintIndex:
+    """
+    Set of content and identity fingerprints of the matches ingested so far,
+    optionally persisted to ``path``.
+
+    ``identity=False`` limits detection to byte-identical copies. Skipped
+    files are listed in ``duplicates`` and logged at INFO level.
+    """
+
+    def __init__(self, path=None, identity=True, reset=False):
+        self.path = path
+        self.identity = identity
+        self.duplicates = []
+        self._seen = {}
+        self._pending = {}
+        self._unsaved = {}
+        self._file = None
+        if path is not None:
+            if os.path.exists(path) and not reset:
+                with open(path, encoding='utf-8') as f:
+                    for line in f:
+                        kind, fingerprint, source = line.rstrip('\n').split('\t', 2)
+                        self._seen.setdefault((kind, fingerprint), source)
+            self._file = open(path, 'w' if reset else 'a', encoding='utf-8')
+
+    def __len__(self):
+        return sum(1 for kind, _ in self._seen if kind == 'content')
+
+    def _is_duplicate(self, path, kind, fingerprint):
+        source = self._seen.get((kind, fingerprint))
+        if source is None:
+            return False
+        self.duplicates.append(Duplicate(path, source, kind))
+        logger.info('Skipping duplicate match: %s (%s duplicate of %s)', path, kind, source)
+        return True
+
+    def accept_text(self, path, text):
+        """
+        Check a file's text before it is decoded; returns False for a duplicate.
+        """
+        content = content_fingerprint(text)
+        if self._is_duplicate(path, 'content', content):
+            return False
+        identity = None
+        if self.identity and not str(path).endswith('.json'):
+            identity = match_identity(_yaml_header(text))
+            if identity is not None and self._is_duplicate(path, 'identity', identity):
+                return False
+        self._pending[path] = (content, identity)
+        return True
+
+    def accept_match(self, path, match_dict):
+        """
+        Check a decoded match and record its fingerprints; returns False for
+        a duplicate. Files are only recorded once they decode successfully.
+        """
+        content, identity = self._pending.pop(path, (None, None))
+        if self.identity and identity is None:
+            identity = match_identity(match_dict)
+            if identity is not None and self._is_duplicate(path, 'identity', identity):
+                return False
+        source = os.path.basename(str(path))
+        added = []
+        for kind, fingerprint in (('content', content), ('identity', identity)):
+            if fingerprint is not None and (kind, fingerprint) not in self._seen:
+                self._seen[(kind, fingerprint)] = source
+                added.append((kind, fingerprint))
+        self._unsaved[path] = added
+        return True
+
+    def discard(self, path):
+        """
+        Forget a file that failed after ``accept_text`` or ``accept_match``
+        (a decode or parse error), so a valid copy of it is not skipped.
+        Entries already flushed to the index file are kept.
+        """
+        self._pending.pop(path, None)
+        for key in self._unsaved.pop(path, ()):
+            self._seen.pop(key, None)
+
+    def rollback(self):
+        """
+        Forget every file accepted since the last ``flush``.
+        """
+        for path in list(self._unsaved):
+            self.discard(path)
+        self._pending.clear()
+
+    def flush(self):
+        """
+        Write the files accepted since the last flush to the index file.
+        """
+        if self._file is not None:
+            for path, added in self._unsaved.items():
+                source = os.path.basename(str(path))
+                for kind, fingerprint in added:
+                    self._file.write(f'{kind}\t{fingerprint}\t{source}\n')
+            self._file.flush()
+        self._unsaved.clear()
+
+    def close(self):
+        """
+        Flush and close the index file.
+        """
+        self.flush()
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is not None:
+            self.rollback()
+        self.close()
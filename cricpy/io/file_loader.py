@@ -1,29 +1,306 @@
+import heapq
+import json
+import logging
 import os
+import time
+import zlib
+from collections import namedtuple
+
 import yaml
 
-def load_yaml(filepath):
+from cricpy.profiling import profiled, stage
+
+logger = logging.getLogger(__name__)
+
+YAML_EXTENSIONS = ('.yaml', '.yml')
+MATCH_EXTENSIONS = YAML_EXTENSIONS + ('.json',)
+
+LoadError = namedtuple('LoadError', ['path', 'error'])
+
+
+class BallKey(float):
     """
-    Load a single Cricsheet YAML file and return a dictionary.
+    A Cricsheet ball number that remembers how it was written.
+
+    It compares and computes as the float YAML gives (``0.10 == 0.1``), while
+    ``text`` keeps the exact source (``'0.10'``), from which the parser reads
+    the over and ball integers.
+    """
+    __slots__ = ('text',)
+
+    def __new__(cls, value, text):
+        key = float.__new__(cls, value)
+        key.text = text
+        return key
+
+    def __reduce__(self):
+        return BallKey, (float(self), self.text)
+
+
+class MatchLoader(yaml.SafeLoader):
+    """
+    ``yaml.SafeLoader`` that loads ``<over>.<ball>`` floats as BallKey.
+    """
+
+
+def _construct_float(loader, node):
+    value = loader.construct_yaml_float(node)
+    over, dot, ball = node.value.partition('.')
+    if dot and over.isdigit() and ball.isdigit():
+        return BallKey(value, node.value)
+    return value
+
+
+MatchLoader.add_constructor('tag:yaml.org,2002:float', _construct_float)
+
+
+def _represent_ball_key(dumper, data):
+    return dumper.represent_scalar('tag:yaml.org,2002:float', data.text)
+
+
+# so loaded matches dump back as the plain ball numbers they were read from
+yaml.SafeDumper.add_representer(BallKey, _represent_ball_key)
+yaml.Dumper.add_representer(BallKey, _represent_ball_key)
+
+
+def yaml_loads(text):
+    """
+    Decode the text of a Cricsheet YAML file, keeping ball keys exact.
+    """
+    return yaml.load(text, Loader=MatchLoader)
+
+
+class LoadStats:
+    """
+    Counters for a loading run: files and bytes read, time spent loading,
+    the files that failed and the slowest files seen.
+
+    Pass the same instance to several ``load_*`` calls to accumulate a run,
+    or combine per-worker instances with ``merge``.
+    """
+
+    def __init__(self, keep_slowest=10):
+        self.keep_slowest = keep_slowest
+        self.files_read = 0
+        self.bytes_read = 0
+        self.load_time = 0.0
+        self.failed = []
+        self._slowest = []
+
+    def record(self, path, nbytes, seconds, error=None):
+        """
+        Record one attempted file load.
+        """
+        self.files_read += 1
+        self.bytes_read += nbytes
+        self.load_time += seconds
+        if error is not None:
+            self.failed.append(LoadError(path, error))
+        if self.keep_slowest:
+            entry = (seconds, str(path))
+            if len(self._slowest) < self.keep_slowest:
+                heapq.heappush(self._slowest, entry)
+            elif entry > self._slowest[0]:
+                heapq.heapreplace(self._slowest, entry)
+
+    def merge(self, other):
+        """
+        Fold the counters of another LoadStats into this one.
+        """
+        self.files_read += other.files_read
+        self.bytes_read += other.bytes_read
+        self.load_time += other.load_time
+        self.failed.extend(other.failed)
+        for seconds, path in other._slowest:
+            self._slowest.append((seconds, path))
+        self._slowest = heapq.nlargest(self.keep_slowest, self._slowest)
+        heapq.heapify(self._slowest)
+        return self
+
+    @property
+    def failed_count(self):
+        return len(self.failed)
+
+    @property
+    def slowest_files(self):
+        """
+        List of (path, seconds) for the slowest files, slowest first.
+        """
+        return [(path, seconds) for seconds, path in sorted(self._slowest, reverse=True)]
+
+    def as_dict(self):
+        return {
+            'files_read': self.files_read,
+            'bytes_read': self.bytes_read,
+            'load_time': self.load_time,
+            'failed': [(str(e.path), repr(e.error)) for e in self.failed],
+            'slowest_files': self.slowest_files,
+        }
+
+    def __repr__(self):
+        return (
+            f'LoadStats(files_read={self.files_read}, bytes_read={self.bytes_read}, '
+            f'load_time={self.load_time:.3f}, failed={self.failed_count})'
+        )
+
+
+def _load(filepath, decode, decode_stage, on_error, stats, dedup=None):
+    """
+    Read and decode one file, routing failures to ``on_error`` (or the
+    module logger) and timings to ``stats``. Files that ``dedup`` (a
+    ``cricpy.io.dedup.FingerprintIndex``) recognises as duplicates give None.
     """
+    start = time.perf_counter()
+    nbytes = 0
     try:
-        with open(filepath, 'r', encoding='utf-8') as f:
-            data = yaml.safe_load(f)
-        return data
+        with stage('read'):
+            with open(filepath, 'r', encoding='utf-8') as f:
+                nbytes = os.fstat(f.fileno()).st_size
+                text = f.read()
+        if dedup is not None and not dedup.accept_text(filepath, text):
+            data = None
+        else:
+            with stage(decode_stage):
+                data = decode(text)
+            if dedup is not None and data and not dedup.accept_match(filepath, data):
+                data = None
+            elif dedup is not None and not data:
+                dedup.discard(filepath)
     except Exception as e:
-        print(f"[ERROR] Failed to load file: {filepath} — {e}")
+        if dedup is not None:
+            dedup.discard(filepath)
+        if stats is not None:
+            stats.record(filepath, nbytes, time.perf_counter() - start, error=e)
+        if on_error is not None:
+            logger.debug("Failed to load file: %s — %s", filepath, e)
+            on_error(filepath, e)
+        else:
+            logger.error("Failed to load file: %s — %s", filepath, e)
         return None
+    if stats is not None:
+        stats.record(filepath, nbytes, time.perf_counter() - start)
+    return data
+
+
+@profiled('load_yaml')
+def load_yaml(filepath, on_error=None, stats=None):
+    """
+    Load a single Cricsheet YAML file and return a dictionary.
+
+    On failure None is returned and ``on_error(filepath, exception)`` is
+    called; without a callback the failure is logged to ``cricpy.io.file_loader``.
+    A LoadStats passed as ``stats`` records the attempt.
+    """
+    return _load(filepath, yaml_loads, 'yaml.decode', on_error, stats)
+
+
+@profiled('load_json')
+def load_json(filepath, on_error=None, stats=None):
+    """
+    Load a single Cricsheet JSON file and return a dictionary.
+
+    Failures are reported as for ``load_yaml``.
+    """
+    return _load(filepath, json.loads, 'json.decode', on_error, stats)
+
+
+def load_match(filepath, on_error=None, stats=None, dedup=None):
+    """
+    Load a single Cricsheet match file, choosing the YAML or JSON loader
+    from the file extension.
+
+    With ``dedup`` (a ``cricpy.io.dedup.FingerprintIndex``) None is returned
+    for a match the index has already seen, and the match is added to it.
+    """
+    if dedup is not None:
+        if str(filepath).endswith('.json'):
+            return _load(filepath, json.loads, 'json.decode', on_error, stats, dedup)
+        return _load(filepath, yaml_loads, 'yaml.decode', on_error, stats, dedup)
+    if str(filepath).endswith('.json'):
+        return load_json(filepath, on_error=on_error, stats=stats)
+    return load_yaml(filepath, on_error=on_error, stats=stats)
+
+
+def shard_of(filename, num_shards):
+    """
+    Return the shard (0 <= shard < num_shards) a file belongs to.
+
+    The assignment hashes the file's base name with CRC-32, so it is the same
+    on every machine, Python version and run, whatever folder holds the file.
+    """
+    name = os.path.basename(str(filename))
+    return zlib.crc32(name.encode('utf-8')) % num_shards
+
+
+def _check_shard(shard_index, num_shards):
+    if shard_index is None and num_shards is None:
+        return False
+    if shard_index is None or num_shards is None:
+        raise ValueError('shard_index and num_shards must be given together')
+    if num_shards < 1 or not 0 <= shard_index < num_shards:
+        raise ValueError(f'invalid shard {shard_index} of {num_shards}')
+    return True
+
+
+def iter_match_files(folder_path, extensions=MATCH_EXTENSIONS, shard_index=None, num_shards=None):
+    """
+    Yield the paths of match files in a folder, in sorted filename order.
+
+    With ``shard_index`` and ``num_shards`` only the files assigned to that
+    shard by ``shard_of`` are yielded.
+    """
+    sharded = _check_shard(shard_index, num_shards)
+    for filename in sorted(os.listdir(folder_path)):
+        if filename.endswith(extensions):
+            if sharded and shard_of(filename, num_shards) != shard_index:
+                continue
+            yield os.path.join(folder_path, filename)
 
 
-def load_all_yaml(folder_path):
+def match_id_from_path(path):
+    """
+    Return the match id of a match file: its filename without extension.
+    """
+    return os.path.splitext(os.path.basename(str(path)))[0]
+
+
+def iter_matches(folder_path, on_error=None, stats=None, extensions=MATCH_EXTENSIONS,
+                 shard_index=None, num_shards=None, dedup=None):
+    """
+    Lazily load the YAML and JSON match files in a folder, yielding
+    (match_id, match_dict) pairs in sorted filename order.
+
+    Files that fail to load (or are empty) are skipped after being reported
+    as for ``load_yaml``. Only one match is held in memory at a time.
+    ``shard_index``/``num_shards`` restrict loading to one shard, and
+    matches that ``dedup`` has already seen are skipped (see ``load_match``).
+    """
+    for path in iter_match_files(folder_path, extensions, shard_index, num_shards):
+        data = load_match(path, on_error=on_error, stats=stats, dedup=dedup)
+        if data:
+            yield match_id_from_path(path), data
+
+
+@profiled('load_all_yaml')
+def load_all_yaml(folder_path, on_error=None, stats=None, shard_index=None, num_shards=None,
+                  dedup=None):
     """
     Load all YAML files from a folder.
     Returns a list of (filename, match_dict) tuples.
+
+    ``on_error`` and ``stats`` are passed to ``load_yaml`` for every file.
+    With ``shard_index`` and ``num_shards`` only the files of that shard
+    (see ``shard_of``) are loaded, and with ``dedup`` duplicate matches are
+    skipped before their deliveries are decoded (see ``load_match``).
     """
+    sharded = _check_shard(shard_index, num_shards)
     matches = []
     for filename in os.listdir(folder_path):
         if filename.endswith(".yaml") or filename.endswith(".yml"):
+            if sharded and shard_of(filename, num_shards) != shard_index:
+                continue
             path = os.path.join(folder_path, filename)
-            data = load_yaml(path)
+            data = load_match(path, on_error=on_error, stats=stats, dedup=dedup)
             if data:
                 matches.append((filename, data))
     return matches
@@ -0,0 +1,249 @@
+"""
+Deterministic sharded ingest across machines, with a merge step.
+
+Every node sees the same archive snapshot and ingests the files that
+``shard_of`` assigns to its shard into a shard folder: a regular corpus
+(see ``cricpy.io.corpus``) plus a ``shard.json`` manifest recording the
+shard, the source files it holds and the files that failed. Once all shard
+folders are gathered, ``merge_shards`` consolidates them into one corpus
+with the same content and match order as a single-node
+``build_corpus(iter_matches(src))``.
+
+    # on node i of n
+    ingest_shard('/archive', f'/scratch/{shard_dirname(i, n)}', i, n)
+    # afterwards, anywhere
+    merge_shards(glob.glob('/scratch/shard-*'), '/data/corpus')
+"""
+import json
+import os
+import shutil
+
+import numpy as np
+
+from cricpy.io.corpus import (
+    FORMAT_VERSION, MANIFEST, MATCHES, SIDE_TABLES, STRINGS, Corpus, _column_spec, build_corpus,
+)
+from cricpy.io.file_loader import iter_match_files, load_match, match_id_from_path
+from cricpy.parsers.cricsheet_parser import STRING_COLUMNS
+
+SHARD_MANIFEST = 'shard.json'
+_WRITE_ROWS = 1 << 16
+
+
+def shard_dirname(shard_index, num_shards):
+    """
+    Conventional folder name for a shard, e.g. ``shard-00003-of-00008``.
+    """
+    return f'shard-{shard_index:05d}-of-{num_shards:05d}'
+
+
+def ingest_shard(src, out_dir, shard_index, num_shards, overwrite=False):
+    """
+    Ingest the files of one shard of ``src`` into the shard folder ``out_dir``.
+
+    Returns the shard manifest as a dict. Files that fail to load are listed
+    under ``failed`` instead of stopping the run.
+    """
+    sources = []
+    failed = []
+
+    def matches():
+        for path in iter_match_files(src, shard_index=shard_index, num_shards=num_shards):
+            errors = []
+            data = load_match(path, on_error=lambda _, e: errors.append(e))
+            source = os.path.basename(path)
+            if errors or not data:
+                error = f'{type(errors[0]).__name__}: {errors[0]}' if errors else 'empty file'
+                failed.append({'source': source, 'error': error})
+                continue
+            sources.append(source)
+            yield match_id_from_path(path), data
+
+    corpus = build_corpus(matches(), out_dir, overwrite=overwrite)
+    manifest = {
+        'shard_index': shard_index,
+        'num_shards': num_shards,
+        'assignment': 'crc32(basename) % num_shards',
+        'source': os.path.abspath(src),
+        'n_matches': corpus.manifest['n_matches'],
+        'n_deliveries': len(corpus),
+        'sources': sources,
+        'failed': failed,
+    }
+    with open(os.path.join(out_dir, SHARD_MANIFEST), 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2)
+    return manifest
+
+
+def read_shard_manifest(shard_dir):
+    """
+    Return the ``shard.json`` manifest of a shard folder.
+    """
+    path = os.path.join(shard_dir, SHARD_MANIFEST)
+    if not os.path.exists(path):
+        raise FileNotFoundError(f'not a shard (no {SHARD_MANIFEST}): {shard_dir}')
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def _check_shards(manifests, require_complete):
+    counts = {m['num_shards'] for m in manifests}
+    if len(counts) != 1:
+        raise ValueError(f'shards come from different shardings: num_shards {sorted(counts)}')
+    num_shards = counts.pop()
+    indices = [m['shard_index'] for m in manifests]
+    if len(set(indices)) != len(indices):
+        raise ValueError(f'duplicate shards: {sorted(indices)}')
+    missing = sorted(set(range(num_shards)) - set(indices))
+    if require_complete and missing:
+        raise ValueError(f'missing shards {missing} of {num_shards}')
+
+
+class _ColumnFile:
+    """
+    Buffered writer appending array slices to one raw column file.
+    """
+
+    def __init__(self, path, dtype):
+        self.dtype = np.dtype(dtype)
+        self.file = open(path, 'wb')
+        self.parts = []
+        self.rows = 0
+
+    def write(self, values):
+        self.parts.append(np.asarray(values, dtype=self.dtype))
+        self.rows += len(values)
+        if self.rows >= _WRITE_ROWS:
+            self.flush()
+
+    def flush(self):
+        if self.parts:
+            np.concatenate(self.parts).tofile(self.file)
+        self.parts = []
+        self.rows = 0
+
+    def close(self):
+        self.flush()
+        self.file.close()
+
+
+def merge_shards(shard_dirs, out_path, overwrite=False, require_complete=True):
+    """
+    Merge shard folders into a single corpus at ``out_path``.
+
+    Matches are ordered by source filename, so the result matches a
+    single-node build. String dictionaries are merged and codes remapped;
+    side-table rows are re-keyed to the merged delivery rows. Raises
+    ValueError for shards from different shardings, duplicated shards or,
+    with ``require_complete``, missing shards. Returns the merged Corpus.
+    """
+    manifests = [read_shard_manifest(d) for d in shard_dirs]
+    _check_shards(manifests, require_complete)
+    corpora = [Corpus(d) for d in shard_dirs]
+
+    strings, codes, remaps = [], {}, []
+    for corpus in corpora:
+        remap = np.empty(len(corpus.strings) + 1, dtype=np.int32)
+        for i, value in enumerate(corpus.strings):
+            code = codes.get(value)
+            if code is None:
+                code = codes[value] = len(strings)
+                strings.append(value)
+            remap[i] = code
+        remap[-1] = -1
+        remaps.append(remap)
+
+    records = []
+    for corpus in corpora:
+        with open(os.path.join(corpus.path, MATCHES), encoding='utf-8') as f:
+            records.append(json.load(f))
+    order = sorted(
+        (manifest['sources'][i], k, i)
+        for k, manifest in enumerate(manifests)
+        for i in range(len(records[k]))
+    )
+    seen = set()
+    for source, _, _ in order:
+        if source in seen:
+            raise ValueError(f'source file {source} appears in more than one shard')
+        seen.add(source)
+
+    if os.path.exists(out_path):
+        if not overwrite and os.listdir(out_path):
+            raise FileExistsError(f'corpus folder is not empty: {out_path}')
+        shutil.rmtree(out_path)
+    os.makedirs(out_path)
+
+    delivery_columns = list(corpora[0].manifest['columns']) if corpora else ['match_index']
+    merged_matches = []
+    starts = []
+    row = 0
+    for new_index, (_, k, i) in enumerate(order):
+        record = dict(records[k][i])
+        n = record['stop'] - record['start']
+        record['start'], record['stop'] = row, row + n
+        merged_matches.append(record)
+        starts.append(row)
+        row += n
+    n_deliveries = row
+
+    for name in delivery_columns:
+        out = _ColumnFile(os.path.join(out_path, f'{name}.bin'), _column_spec(name)['dtype'])
+        for new_index, (_, k, i) in enumerate(order):
+            start, stop = records[k][i]['start'], records[k][i]['stop']
+            if name == 'match_index':
+                out.write(np.full(stop - start, new_index))
+            elif name in STRING_COLUMNS:
+                out.write(remaps[k][corpora[k].column(name)[start:stop]])
+            else:
+                out.write(corpora[k].column(name)[start:stop])
+        out.close()
+
+    tables = {}
+    for table, columns in SIDE_TABLES.items():
+        bounds = [
+            np.searchsorted(c.column('match_index', table), np.arange(len(records[k]) + 1))
+            for k, c in enumerate(corpora)
+        ]
+        n_rows = 0
+        for name in columns:
+            out = _ColumnFile(os.path.join(out_path, f'{table}.{name}.bin'),
+                              _column_spec(name)['dtype'])
+            n_rows = 0
+            for new_index, (_, k, i) in enumerate(order):
+                lo, hi = bounds[k][i], bounds[k][i + 1]
+                values = corpora[k].column(name, table)[lo:hi]
+                if name == 'match_index':
+                    values = np.full(hi - lo, new_index)
+                elif name == 'row':
+                    values = values.astype(np.int64) - records[k][i]['start'] + starts[new_index]
+                elif name in STRING_COLUMNS:
+                    values = remaps[k][values]
+                out.write(values)
+                n_rows += hi - lo
+            out.close()
+        tables[table] = {
+            'n_rows': int(n_rows),
+            'columns': {name: _column_spec(name) for name in columns},
+        }
+
+    with open(os.path.join(out_path, STRINGS), 'w', encoding='utf-8') as f:
+        json.dump(strings, f, ensure_ascii=False)
+    with open(os.path.join(out_path, MATCHES), 'w', encoding='utf-8') as f:
+        json.dump(merged_matches, f, ensure_ascii=False, default=str)
+    manifest = {
+        'version': FORMAT_VERSION,
+        'n_deliveries': n_deliveries,
+        'n_matches': len(merged_matches),
+        'byteorder': 'little',
+        'columns': {name: _column_spec(name) for name in delivery_columns},
+        'tables': tables,
+        'merged_from': [
+            {'shard_index': m['shard_index'], 'num_shards': m['num_shards'],
+             'failed': m['failed']}
+            for m in sorted(manifests, key=lambda m: m['shard_index'])
+        ],
+    }
+    with open(os.path.join(out_path, MANIFEST), 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2)
+    return Corpus(out_path)
@@ -0,0 +1,218 @@
+"""
+Compact binary wire format for ball-by-ball deliveries.
+
+A message holds the deliveries of one match: a fixed header, a string
+dictionary and one fixed-width little-endian record per delivery:
+
+    header       magic b'CRKW', version, record size, record count,
+                 dictionary size, string count and the match id's
+                 dictionary code
+    dictionary   UTF-8 strings separated by NUL bytes
+    records      RECORD_DTYPE, RECORD_SIZE bytes each
+
+Names (innings, teams, players, extras and dismissal kinds) are int16 codes
+into the message's dictionary (-1 = None), so a delivery takes 22 bytes.
+Decoding maps the records straight onto the buffer with
+``numpy.frombuffer``; nothing is copied until the columns are used.
+Messages are self-delimiting, so a stream is just messages written back to
+back.
+
+    payload = to_wire(match_dict, match_id='1082591')
+    message = read_wire(payload)
+    message.records['runs_total'].sum()
+    df = message.to_pandas()                # the parse_match columns
+
+    write_wire(iter_matches('matches/'), 'deliveries.crw')
+    for message in iter_wire(open('deliveries.crw', 'rb').read()):
+        ...
+"""
+import struct
+
+import numpy as np
+import pandas as pd
+
+from cricpy.parsers.cricsheet_parser import COLUMNS, delivery_columns
+
+MAGIC = b'CRKW'
+WIRE_VERSION = 2
+HEADER = struct.Struct('<4sBxHIIIi')
+RECORD_DTYPE = np.dtype([
+    ('inning', '<i2'),
+    ('batting_team', '<i2'),
+    ('over', '<u2'),
+    ('ball_in_over', 'u1'),
+    ('delivery_index', '<u2'),
+    ('batsman', '<i2'),
+    ('bowler', '<i2'),
+    ('runs_total', 'u1'),
+    ('runs_batter', 'u1'),
+    ('runs_extras', 'u1'),
+    ('extras_type', '<i2'),
+    ('dismissal', '<i2'),
+    ('fielder', '<i2'),
+])
+RECORD_SIZE = RECORD_DTYPE.itemsize
+WIRE_STRING_COLUMNS = tuple(name for name in RECORD_DTYPE.names
+                            if RECORD_DTYPE[name] == np.dtype('<i2'))
+_MAX_STRINGS = np.iinfo(np.int16).max + 1
+
+
+class WireMessage:
+    """
+    One decoded message: ``match_id``, the ``strings`` dictionary and the
+    ``records`` structured array (a read-only view of the source buffer).
+    """
+
+    def __init__(self, match_id, strings, records):
+        self.match_id = match_id
+        self.strings = strings
+        self.records = records
+
+    def __len__(self):
+        return len(self.records)
+
+    def column(self, name):
+        """
+        Return a column as an array; name columns are decoded to a
+        Categorical.
+        """
+        values = self.records[name]
+        if name in WIRE_STRING_COLUMNS:
+            categories = pd.Index(self.strings, dtype=object)
+            return pd.Categorical.from_codes(values, categories=categories)
+        return values
+
+    def balls(self):
+        """
+        Rebuild the ``ball`` column as the parser does, ``float('<over>.<ball>')``,
+        so the 10th ball of an over is 0.1 more than its over, not 1.0.
+        """
+        pairs = self.records['over'].astype(np.int64) * 256 + self.records['ball_in_over']
+        unique, inverse = np.unique(pairs, return_inverse=True)
+        values = np.array([float(f'{p >> 8}.{p & 255}') for p in unique.tolist()])
+        return values[inverse.reshape(-1)]
+
+    def to_pandas(self):
+        """
+        Return the deliveries as a DataFrame with the ``parse_match``
+        columns.
+        """
+        data = {}
+        for name in COLUMNS:
+            data[name] = self.balls() if name == 'ball' else self.column(name)
+        return pd.DataFrame(data)
+
+
+def _encode_records(columns):
+    """
+    Pack a mapping of parse_match columns into records plus the dictionary
+    shared by the name columns.
+    """
+    n = len(columns['over'])
+    names = np.empty(n * len(WIRE_STRING_COLUMNS), dtype=object)
+    for i, name in enumerate(WIRE_STRING_COLUMNS):
+        names[i * n:(i + 1) * n] = np.asarray(columns[name], dtype=object)
+    codes, strings = pd.factorize(names)
+    if len(strings) > _MAX_STRINGS:
+        raise ValueError(f'too many distinct names for one message ({len(strings)})')
+
+    records = np.empty(n, dtype=RECORD_DTYPE)
+    for i, name in enumerate(WIRE_STRING_COLUMNS):
+        records[name] = codes[i * n:(i + 1) * n]
+    for name in RECORD_DTYPE.names:
+        if name in WIRE_STRING_COLUMNS:
+            continue
+        values = np.asarray(columns[name], dtype=np.int64)
+        limit = np.iinfo(RECORD_DTYPE[name]).max
+        if n and (values.min() < 0 or values.max() > limit):
+            raise ValueError(f'{name} out of range for the wire format (0-{limit})')
+        records[name] = values
+    return records, [str(s) for s in strings]
+
+
+def encode_columns(columns, match_id=None):
+    """
+    Encode deliveries given as a mapping of ``parse_match`` columns (a dict
+    of lists or a DataFrame) as one wire message.
+    """
+    records, strings = _encode_records(columns)
+    id_code = -1
+    if match_id is not None:
+        match_id = str(match_id)
+        if match_id not in strings:
+            strings.append(match_id)
+        id_code = strings.index(match_id)
+    dictionary = '\0'.join(strings).encode('utf-8')
+    header = HEADER.pack(MAGIC, WIRE_VERSION, RECORD_SIZE, len(records), len(dictionary),
+                         len(strings), id_code)
+    return b''.join([header, dictionary, records.tobytes()])
+
+
+def to_wire(match_dict, match_id=None):
+    """
+    Encode the deliveries of a Cricsheet match dictionary as one wire message.
+    """
+    return encode_columns(delivery_columns(match_dict), match_id)
+
+
+def _read_message(buffer, offset):
+    """
+    Decode the message starting at ``offset``; returns it and the offset
+    just past it.
+    """
+    if len(buffer) - offset < HEADER.size:
+        raise ValueError('truncated wire message header')
+    (magic, version, record_size, n_records, dictionary_size, n_strings,
+     id_code) = HEADER.unpack_from(buffer, offset)
+    if magic != MAGIC:
+        raise ValueError('not a cricpy wire message')
+    if version != WIRE_VERSION or record_size != RECORD_SIZE:
+        raise ValueError(f'unsupported wire format version {version} (record size {record_size})')
+    start = offset + HEADER.size
+    records_start = start + dictionary_size
+    end = records_start + n_records * RECORD_SIZE
+    if end > len(buffer):
+        raise ValueError('truncated wire message')
+    dictionary = bytes(buffer[start:records_start]).decode('utf-8')
+    # the count tells an empty dictionary from one holding only ''
+    strings = dictionary.split('\0') if n_strings else []
+    if len(strings) != n_strings:
+        raise ValueError(f'wire dictionary holds {len(strings)} strings, expected {n_strings}')
+    records = np.frombuffer(buffer, dtype=RECORD_DTYPE, count=n_records, offset=records_start)
+    match_id = strings[id_code] if id_code >= 0 else None
+    return WireMessage(match_id, strings, records), end
+
+
+def read_wire(buffer):
+    """
+    Decode a single wire message from a bytes-like object.
+    """
+    message, end = _read_message(buffer, 0)
+    if end != len(buffer):
+        raise ValueError(f'{len(buffer) - end} bytes after the wire message')
+    return message
+
+
+def iter_wire(buffer):
+    """
+    Yield the messages of a stream of back-to-back wire messages. Pass a
+    ``mmap`` of a file to decode it without reading it into memory.
+    """
+    offset = 0
+    while offset < len(buffer):
+        message, offset = _read_message(buffer, offset)
+        yield message
+
+
+def write_wire(matches, path):
+    """
+    Write one message per (match_id, match_dict) pair to ``path``; returns
+    the number of deliveries written.
+    """
+    total = 0
+    with open(path, 'wb') as f:
+        for match_id, match_dict in matches:
+            columns = delivery_columns(match_dict)
+            f.write(encode_columns(columns, match_id))
+            total += len(columns['over'])
+    return total
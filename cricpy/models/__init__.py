@@ -0,0 +1,28 @@
+"""
+Predictive models built on parsed deliveries.
+
+Names are imported on first access so importing the package stays cheap.
+"""
+import importlib
+
+_LAZY_ATTRIBUTES = {
+    'OutcomeModel': 'cricpy.models.simulate',
+    'Simulation': 'cricpy.models.simulate',
+    'fit_outcome_model': 'cricpy.models.simulate',
+    'simulate_innings': 'cricpy.models.simulate',
+}
+
+__all__ = list(_LAZY_ATTRIBUTES)
+
+
+def __getattr__(name):
+    module = _LAZY_ATTRIBUTES.get(name)
+    if module is None:
+        raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+    value = getattr(importlib.import_module(module), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_ATTRIBUTES))
@@ -0,0 +1,285 @@
+"""
+Monte Carlo simulation of the remainder of an innings.
+
+An OutcomeModel holds, for every (over, wickets down) state, the
+probability of each delivery outcome: 0-6 runs off a legal ball, a wicket,
+or a wide/no-ball worth 1-7 runs. It is estimated from historical
+deliveries, with sparse states shrunk towards the per-over and overall
+distributions.
+
+``simulate_innings`` then plays thousands of innings in parallel as NumPy
+arrays: each step draws one delivery for every innings still in progress
+by inverse-CDF lookup in the state's cumulative probabilities, so the
+Python loop runs once per delivery rather than once per delivery per
+simulation. ``engine='numba'`` runs a compiled per-simulation loop instead
+(requires numba). A given seed reproduces its result exactly with the same
+engine; the two engines draw differently and agree in distribution.
+
+    model = fit_outcome_model(corpus.to_pandas(), max_overs=20)
+    sim = simulate_innings(model, 20000, runs=85, wickets=3, balls=60, target=171, seed=7)
+    sim.win_probability, sim.quantiles()
+"""
+import numpy as np
+import pandas as pd
+
+from cricpy._optional import import_optional
+
+MAX_WICKETS = 10
+OUTCOMES = ['0', '1', '2', '3', '4', '5', '6', 'W'] + [f'x{runs}' for runs in range(1, 8)]
+OUTCOME_RUNS = np.array([0, 1, 2, 3, 4, 5, 6, 0, 1, 2, 3, 4, 5, 6, 7], dtype=np.int64)
+OUTCOME_LEGAL = np.array([1] * 8 + [0] * 7, dtype=np.int64)
+OUTCOME_WICKET = np.array([0] * 7 + [1] + [0] * 7, dtype=np.int64)
+ENGINES = ('numpy', 'numba')
+GUIDE_SIZE = 1024
+NOT_WICKETS = ('retired hurt', 'retired not out')
+
+_numba_kernel = None
+
+
+class OutcomeModel:
+    """
+    Delivery outcome probabilities per (over, wickets down).
+
+    ``probs`` has shape ``(max_overs, MAX_WICKETS, len(OUTCOMES))`` and
+    ``counts`` the number of historical deliveries behind each state.
+    """
+
+    def __init__(self, probs, counts=None):
+        self.probs = np.asarray(probs, dtype=np.float64)
+        if self.probs.ndim != 3 or self.probs.shape[1:] != (MAX_WICKETS, len(OUTCOMES)):
+            raise ValueError(f'probs must have shape (overs, {MAX_WICKETS}, {len(OUTCOMES)})')
+        self.counts = counts
+
+    @property
+    def max_overs(self):
+        return self.probs.shape[0]
+
+    def cumulative(self):
+        cum = np.cumsum(self.probs, axis=-1)
+        cum[..., -1] = 1.0
+        return cum
+
+
+def _outcome_codes(deliveries):
+    """
+    Outcome index (into OUTCOMES) of each delivery.
+    """
+    runs = np.asarray(deliveries['runs_total'], dtype=np.int64)
+    extras_type = deliveries['extras_type']
+    illegal = np.asarray(extras_type.isin(['wides', 'noballs']), dtype=bool)
+    dismissal = deliveries['dismissal']
+    wicket = np.asarray(dismissal.notna() & ~dismissal.isin(NOT_WICKETS), dtype=bool)
+    codes = np.minimum(runs, 6)
+    codes = np.where(illegal, 7 + np.clip(runs, 1, 7), codes)
+    return np.where(wicket, 7, codes), wicket
+
+
+def _wickets_down(deliveries, wicket):
+    """
+    Wickets fallen in the innings before each delivery.
+    """
+    keys = [name for name in ('match_id', 'inning') if name in deliveries]
+    fallen = pd.Series(wicket.astype(np.int64), index=deliveries.index)
+    if keys:
+        before = fallen.groupby([deliveries[k] for k in keys], sort=False, observed=True).cumsum()
+    else:
+        before = fallen.cumsum()
+    return np.asarray(before, dtype=np.int64) - fallen.to_numpy()
+
+
+def _shrink(counts, prior, smoothing):
+    total = counts.sum(axis=-1, keepdims=True)
+    return (counts + smoothing * prior) / (total + smoothing)
+
+
+def fit_outcome_model(deliveries, max_overs=20, smoothing=20.0):
+    """
+    Estimate an OutcomeModel from a DataFrame of deliveries in delivery
+    order (``parse_match`` frames concatenated, or ``Corpus.to_pandas()``).
+
+    It needs the ``over``, ``runs_total``, ``extras_type`` and ``dismissal``
+    columns; wickets down are counted per ``match_id`` and ``inning`` when
+    those columns are present. Deliveries from overs past ``max_overs`` are
+    ignored, so filter the frame to one format (and innings, if wanted)
+    first. ``smoothing`` is the weight, in deliveries, of the per-over
+    distribution in each (over, wickets) state, and of the overall
+    distribution in each over.
+    """
+    outcome, wicket = _outcome_codes(deliveries)
+    wickets_down = np.minimum(_wickets_down(deliveries, wicket), MAX_WICKETS - 1)
+    over = np.asarray(deliveries['over'], dtype=np.int64)
+    keep = over < max_overs
+    n_outcomes = len(OUTCOMES)
+    flat = (over[keep] * MAX_WICKETS + wickets_down[keep]) * n_outcomes + outcome[keep]
+    counts = np.bincount(flat, minlength=max_overs * MAX_WICKETS * n_outcomes).reshape(
+        max_overs, MAX_WICKETS, n_outcomes).astype(np.float64)
+    if not counts.any():
+        raise ValueError('no deliveries to fit the model on')
+
+    overall = counts.sum(axis=(0, 1))
+    overall /= overall.sum()
+    per_over = _shrink(counts.sum(axis=1), overall, smoothing)
+    probs = _shrink(counts, per_over[:, None, :], smoothing)
+    return OutcomeModel(probs, counts.sum(axis=-1).astype(np.int64))
+
+
+class Simulation:
+    """
+    Final runs, wickets and legal balls of each simulated innings.
+    """
+
+    def __init__(self, runs, wickets, balls, target=None):
+        self.runs = runs
+        self.wickets = wickets
+        self.balls = balls
+        self.target = target
+
+    def __len__(self):
+        return len(self.runs)
+
+    @property
+    def win_probability(self):
+        """
+        Share of simulations reaching ``target`` (None without a target).
+        """
+        if self.target is None:
+            return None
+        return float(np.mean(self.runs >= self.target))
+
+    @property
+    def tie_probability(self):
+        if self.target is None:
+            return None
+        return float(np.mean(self.runs == self.target - 1))
+
+    def runs_distribution(self):
+        """
+        Probability of each final score, indexed by runs.
+        """
+        counts = np.bincount(self.runs)
+        scores = np.flatnonzero(counts)
+        return pd.Series(counts[scores] / len(self.runs), index=scores, name='probability')
+
+    def quantiles(self, q=(0.05, 0.25, 0.5, 0.75, 0.95)):
+        return pd.Series(np.quantile(self.runs, q), index=list(q), name='runs')
+
+    def summary(self):
+        return {
+            'simulations': len(self),
+            'mean_runs': float(self.runs.mean()),
+            'std_runs': float(self.runs.std()),
+            'mean_wickets': float(self.wickets.mean()),
+            'all_out_probability': float(np.mean(self.wickets >= MAX_WICKETS)),
+            'win_probability': self.win_probability,
+        }
+
+
+def _guide_table(cum):
+    """
+    Guide table for inverse-CDF sampling (Chen, 1974): for every state and
+    every bucket ``[j, j + 1) / GUIDE_SIZE`` of the uniform draw, the first
+    outcome the draw can map to, plus the most steps any bucket needs to
+    reach its outcome. A draw is then a table lookup and a few comparisons
+    instead of a binary search.
+    """
+    states = cum.shape[0] * cum.shape[1]
+    n_outcomes = cum.shape[2]
+    # offsetting each state's row by its state number makes the whole table
+    # one sorted array, so a single searchsorted serves every state
+    flat = (cum.reshape(states, n_outcomes) + np.arange(states)[:, None]).ravel()
+    edges = np.arange(states)[:, None] + np.arange(GUIDE_SIZE + 1) / GUIDE_SIZE
+    first = np.searchsorted(flat, edges) - np.arange(states)[:, None] * n_outcomes
+    np.clip(first, 0, n_outcomes - 1, out=first)
+    return first[:, :-1], int((first[:, 1:] - first[:, :-1]).max())
+
+
+def _simulate_numpy(cum, n_sims, runs, wickets, balls, max_balls, target, rng):
+    out_runs = np.full(n_sims, runs, dtype=np.int64)
+    out_wickets = np.full(n_sims, wickets, dtype=np.int64)
+    out_balls = np.full(n_sims, balls, dtype=np.int64)
+    last_over, n_outcomes = cum.shape[0] - 1, cum.shape[2]
+    guide, corrections = _guide_table(cum)
+    cum = cum.ravel()
+    live = np.arange(n_sims)
+    r, w, b = out_runs.copy(), out_wickets.copy(), out_balls.copy()
+    while True:
+        done = (b >= max_balls) | (w >= MAX_WICKETS)
+        if target is not None:
+            done |= r >= target
+        if done.any():
+            ended = live[done]
+            out_runs[ended], out_wickets[ended], out_balls[ended] = r[done], w[done], b[done]
+            keep = ~done
+            live, r, w, b = live[keep], r[keep], w[keep], b[keep]
+        if not live.size:
+            return out_runs, out_wickets, out_balls
+        state = np.minimum(b // 6, last_over) * MAX_WICKETS + w
+        u = rng.random(live.size)
+        k = guide[state, (u * GUIDE_SIZE).astype(np.int64)]
+        for _ in range(corrections):
+            k += u > cum[state * n_outcomes + k]
+        r += OUTCOME_RUNS[k]
+        w += OUTCOME_WICKET[k]
+        b += OUTCOME_LEGAL[k]
+
+
+def _get_numba_kernel():
+    global _numba_kernel
+    if _numba_kernel is not None:
+        return _numba_kernel
+    numba = import_optional('numba', extra='numba', feature="engine='numba'")
+
+    @numba.njit
+    def kernel(cum, outcome_runs, outcome_wicket, outcome_legal, n_sims, runs, wickets, balls,
+               max_balls, target, seed):
+        np.random.seed(seed)
+        last_over = cum.shape[0] - 1
+        n_outcomes = cum.shape[2]
+        out_runs = np.empty(n_sims, dtype=np.int64)
+        out_wickets = np.empty(n_sims, dtype=np.int64)
+        out_balls = np.empty(n_sims, dtype=np.int64)
+        for i in range(n_sims):
+            r, w, b = runs, wickets, balls
+            while b < max_balls and w < 10 and (target < 0 or r < target):
+                u = np.random.random()
+                over = min(b // 6, last_over)
+                k = 0
+                while k < n_outcomes - 1 and u > cum[over, w, k]:
+                    k += 1
+                r += outcome_runs[k]
+                w += outcome_wicket[k]
+                b += outcome_legal[k]
+            out_runs[i], out_wickets[i], out_balls[i] = r, w, b
+        return out_runs, out_wickets, out_balls
+
+    _numba_kernel = kernel
+    return kernel
+
+
+def simulate_innings(model, n_sims=10000, runs=0, wickets=0, balls=0, target=None, max_overs=None,
+                     seed=None, engine='numpy'):
+    """
+    Simulate ``n_sims`` completions of an innings standing at ``runs`` for
+    ``wickets`` after ``balls`` legal deliveries, and return a Simulation.
+
+    An innings ends after ``max_overs`` (default: the model's overs), at
+    ten wickets, or on reaching ``target`` (the runs needed to win) in a
+    chase. ``seed`` is passed to ``numpy.random.default_rng``.
+    """
+    if engine not in ENGINES:
+        raise ValueError(f'engine must be one of {ENGINES}, got {engine!r}')
+    if n_sims < 1:
+        raise ValueError('n_sims must be at least 1')
+    if not 0 <= wickets <= MAX_WICKETS:
+        raise ValueError(f'wickets must be between 0 and {MAX_WICKETS}')
+    max_balls = 6 * (max_overs or model.max_overs)
+    cum = model.cumulative()
+    rng = np.random.default_rng(seed)
+    if engine == 'numba':
+        kernel = _get_numba_kernel()
+        results = kernel(cum, OUTCOME_RUNS, OUTCOME_WICKET, OUTCOME_LEGAL, n_sims, runs, wickets,
+                         balls, max_balls, -1 if target is None else target,
+                         int(rng.integers(2 ** 32)))
+    else:
+        results = _simulate_numpy(cum, n_sims, runs, wickets, balls, max_balls, target, rng)
+    return Simulation(*results, target=target)
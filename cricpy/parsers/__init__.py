@@ -0,0 +1,39 @@
+"""
+Parsers turning Cricsheet match dictionaries into tabular data.
+
+Names are imported on first access so importing the package stays cheap.
+"""
+import importlib
+
+_LAZY_ATTRIBUTES = {
+    'parse_match': 'cricpy.parsers.cricsheet_parser',
+    'parse_info': 'cricpy.parsers.cricsheet_parser',
+    'parse_wickets': 'cricpy.parsers.cricsheet_parser',
+    'split_ball': 'cricpy.parsers.cricsheet_parser',
+    'delivery_columns': 'cricpy.parsers.cricsheet_parser',
+    'dismissal_columns': 'cricpy.parsers.cricsheet_parser',
+    'MatchTables': 'cricpy.parsers.cricsheet_parser',
+    'iter_record_batches': 'cricpy.parsers.cricsheet_parser',
+    'arrow_schema': 'cricpy.parsers.cricsheet_parser',
+    'to_polars': 'cricpy.parsers.cricsheet_parser',
+    'LiveMatch': 'cricpy.parsers.live',
+    'LiveMatchFile': 'cricpy.parsers.live',
+    'validate_match': 'cricpy.parsers.validation',
+    'check_match': 'cricpy.parsers.validation',
+    'MatchValidationError': 'cricpy.parsers.validation',
+}
+
+__all__ = list(_LAZY_ATTRIBUTES)
+
+
+def __getattr__(name):
+    module = _LAZY_ATTRIBUTES.get(name)
+    if module is None:
+        raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+    value = getattr(importlib.import_module(module), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_ATTRIBUTES))
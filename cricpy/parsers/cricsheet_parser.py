@@ -1,34 +1,511 @@
+from collections import namedtuple
+
 import pandas as pd
 
-def parse_match(match_dict):
+from cricpy._optional import import_optional
+from cricpy.io.file_loader import BallKey
+from cricpy.profiling import profiled, stage
+
+COLUMNS = [
+    'inning', 'batting_team', 'ball', 'over', 'ball_in_over', 'delivery_index',
+    'batsman', 'bowler', 'runs_total', 'runs_batter', 'runs_extras', 'extras_type',
+    'dismissal', 'fielder',
+]
+EXTRAS_KINDS = ('wides', 'noballs', 'byes', 'legbyes', 'penalty')
+FULL_COLUMNS = ['delivery_id'] + COLUMNS + [
+    'non_striker',
+    'extras_wides', 'extras_noballs', 'extras_byes', 'extras_legbyes', 'extras_penalty',
+    'wicket_count', 'player_out',
+    'review_by', 'review_umpire', 'review_batter', 'review_decision',
+    'replacement_in', 'replacement_out', 'replacement_reason',
+]
+WICKET_COLUMNS = [
+    'delivery_id', 'inning', 'ball', 'wicket_number', 'bowler', 'player_out', 'kind', 'fielders',
+]
+WICKET_TABLE_COLUMNS = ['delivery_id', 'wicket_number', 'player_out', 'kind']
+FIELDER_COLUMNS = ['delivery_id', 'wicket_number', 'fielder', 'substitute']
+STRING_COLUMNS = frozenset([
+    'inning', 'batting_team', 'batsman', 'bowler', 'extras_type', 'dismissal', 'fielder',
+    'non_striker', 'player_out', 'kind', 'fielders',
+    'review_by', 'review_umpire', 'review_batter', 'review_decision',
+    'replacement_in', 'replacement_out', 'replacement_reason',
+])
+BOOL_COLUMNS = frozenset(['substitute'])
+_PARSED_COLUMNS = frozenset(FULL_COLUMNS + WICKET_COLUMNS + FIELDER_COLUMNS)
+SCHEMAS = ('narrow', 'full')
+OUTPUTS = ('pandas', 'arrow', 'polars')
+
+MatchTables = namedtuple('MatchTables', ['deliveries', 'wickets', 'fielders'])
+
+
+def _ordinal(n):
     """
-    Parse Cricsheet match dictionary into delivery-level DataFrame.
+    Return the English ordinal for n (1st, 2nd, 3rd, 4th, ...).
+    """
+    if 10 <= n % 100 <= 20:
+        suffix = 'th'
+    else:
+        suffix = {1: 'st', 2: 'nd', 3: 'rd'}.get(n % 10, 'th')
+    return f'{n}{suffix}'
+
+
+def split_ball(ball_number):
+    """
+    Return the exact (over, ball) integers of a ball number such as 19.6.
+
+    Ball keys loaded by ``load_yaml`` keep their source text, so ``0.10``
+    gives (0, 10) rather than (0, 1); plain floats are read from their repr.
     """
-    deliveries = []
-    innings = match_dict.get('innings', [])
+    text = getattr(ball_number, 'text', None) or str(ball_number)
+    over, _, ball = text.partition('.')
+    return int(over), int(ball or 0)
 
-    for inning in innings:
+
+def _normalise_json_delivery(delivery):
+    """
+    Map a delivery from the Cricsheet JSON layout onto the YAML field names.
+    """
+    runs = delivery.get('runs', {})
+    ball_info = {
+        'batsman': delivery.get('batter'),
+        'bowler': delivery.get('bowler'),
+        'non_striker': delivery.get('non_striker'),
+        'runs': {
+            'batsman': runs.get('batter', 0),
+            'extras': runs.get('extras', 0),
+            'total': runs.get('total', 0),
+        },
+    }
+    for key in ('extras', 'review', 'replacements'):
+        if delivery.get(key):
+            ball_info[key] = delivery[key]
+    wickets = delivery.get('wickets')
+    if wickets:
+        wicket = dict(wickets[0])
+        if 'fielders' in wicket:
+            wicket['fielders'] = _fielder_names(wicket)
+        ball_info['wicket'] = wicket
+        ball_info['wickets'] = wickets
+    return ball_info
+
+
+def _fielder_names(wicket):
+    """
+    Names of the fielders credited in a wicket, in either layout.
+    """
+    if 'fielders' in wicket:
+        return [f.get('name') if isinstance(f, dict) else f for f in wicket['fielders']]
+    if wicket.get('fielder'):
+        return [wicket['fielder']]
+    return []
+
+
+def _fielder_entries(wicket):
+    """
+    (name, substitute) pairs for the fielders credited in a wicket.
+
+    Substitutes are flagged by ``substitute: true`` in the JSON layout and by
+    a " (sub)" suffix on the name in the YAML layout; the suffix is dropped.
+    """
+    entries = []
+    if 'fielders' in wicket:
+        for f in wicket['fielders']:
+            if isinstance(f, dict):
+                entries.append((f.get('name'), bool(f.get('substitute', False))))
+            elif isinstance(f, str) and f.endswith(' (sub)'):
+                entries.append((f[:-len(' (sub)')], True))
+            else:
+                entries.append((f, False))
+    elif wicket.get('fielder'):
+        entries.append((wicket['fielder'], False))
+    return entries
+
+
+def _wickets(ball_info):
+    """
+    All wickets that fell on a delivery, as a list of dicts.
+    """
+    wickets = ball_info.get('wickets')
+    if wickets is not None:
+        return wickets
+    wicket = ball_info.get('wicket')
+    if not wicket:
+        return []
+    return wicket if isinstance(wicket, list) else [wicket]
+
+
+def _replacements(ball_info):
+    """
+    All player replacements recorded on a delivery, as a list of dicts.
+    """
+    replacements = ball_info.get('replacements')
+    if not replacements:
+        return []
+    if isinstance(replacements, dict):
+        replacements = [replacements]
+    items = []
+    for entry in replacements:
+        if 'match' in entry or 'role' in entry:
+            items.extend(entry.get('match', []))
+            items.extend(entry.get('role', []))
+        else:
+            items.append(entry)
+    return items
+
+
+def _iter_deliveries(match_dict):
+    """
+    Yield (inning_name, batting_team, ball_number, ball_info) for every delivery.
+
+    Both Cricsheet layouts are accepted: the YAML one, where each inning is
+    keyed by its name and deliveries by ball number, and the JSON one, where
+    each inning carries ``team`` and a list of ``overs``.
+    """
+    for index, inning in enumerate(match_dict.get('innings', [])):
+        if 'team' in inning:
+            inning_name = f'{_ordinal(index + 1)} innings'
+            batting_team = inning.get('team', 'Unknown')
+            for over in inning.get('overs', []):
+                over_number = over.get('over', 0)
+                for n, delivery in enumerate(over.get('deliveries', []), 1):
+                    text = f'{over_number}.{n}'
+                    ball_number = BallKey(float(text), text)
+                    yield inning_name, batting_team, ball_number, _normalise_json_delivery(delivery)
+            continue
         for inning_name, inning_data in inning.items():
             batting_team = inning_data.get('team', 'Unknown')
             for delivery in inning_data.get('deliveries', []):
                 for ball_number, ball_info in delivery.items():
-                    row = {
-                        'inning': inning_name,
-                        'batting_team': batting_team,
-                        'ball': ball_number,
-                        'batsman': ball_info.get('batsman'),
-                        'bowler': ball_info.get('bowler'),
-                        'runs_total': ball_info.get('runs', {}).get('total', 0),
-                        'runs_batter': ball_info.get('runs', {}).get('batsman', 0),
-                        'runs_extras': ball_info.get('runs', {}).get('extras', 0),
-                        'extras_type': list(ball_info.get('extras', {}).keys())[0] if ball_info.get('extras') else None,
-                        'dismissal': ball_info.get('wicket', {}).get('kind'),
-                        'fielder': (
-                            ', '.join(ball_info['wicket'].get('fielders', []))
-                            if 'fielders' in ball_info.get('wicket', {})
-                            else ball_info.get('wicket', {}).get('fielder')
-                        )
-                    }
-                    deliveries.append(row)
-
-    return pd.DataFrame(deliveries)
+                    yield inning_name, batting_team, ball_number, ball_info
+
+
+def parse_info(match_dict):
+    """
+    Flatten the ``info`` section of a match into a dict of scalar metadata:
+    match type, gender, season, date, teams, venue, toss and result.
+    """
+    info = match_dict.get('info') or {}
+    dates = info.get('dates') or []
+    teams = list(info.get('teams') or []) + [None, None]
+    toss = info.get('toss') or {}
+    outcome = info.get('outcome') or {}
+    by = outcome.get('by') or {}
+
+    season = info.get('season')
+    if season is None and dates:
+        season = str(dates[0])[:4]
+
+    return {
+        'match_type': info.get('match_type'),
+        'gender': info.get('gender'),
+        'season': str(season) if season is not None else None,
+        'date': str(dates[0]) if dates else None,
+        'team1': teams[0],
+        'team2': teams[1],
+        'venue': info.get('venue'),
+        'city': info.get('city'),
+        'toss_winner': toss.get('winner'),
+        'toss_decision': toss.get('decision'),
+        'winner': outcome.get('winner'),
+        'result': outcome.get('result'),
+        'win_by_runs': by.get('runs'),
+        'win_by_wickets': by.get('wickets'),
+        'overs': info.get('overs'),
+    }
+
+
+@profiled('parse_match')
+def parse_match(match_dict, output='pandas', schema='narrow', normalize=False, validate=False):
+    """
+    Parse Cricsheet match dictionary into delivery-level DataFrame.
+
+    ``ball`` is the ball number as written (19.6); ``over`` and
+    ``ball_in_over`` are its exact integer parts (``0.10`` is ball 10, not
+    ball 1) and ``delivery_index`` counts deliveries from 0 within each
+    innings, so ordering and per-over grouping need no float arithmetic.
+
+    ``output='arrow'`` returns a ``pyarrow.RecordBatch`` instead, with
+    dictionary-encoded string columns (requires pyarrow), and
+    ``output='polars'`` a ``polars.DataFrame`` built straight from the
+    column buffers (requires polars).
+
+    ``schema='full'`` adds a ``delivery_id`` key and the other columns of
+    ``FULL_COLUMNS``: non-striker, runs per extras kind (including penalty
+    runs), the number of wickets and first player out, DRS review and player
+    replacement details. Every wicket of a delivery is available from
+    ``parse_wickets``, keyed by the same ``delivery_id``.
+
+    ``normalize=True`` returns a ``MatchTables(deliveries, wickets, fielders)``
+    bundle instead: the deliveries (always with ``delivery_id``), one row per
+    wicket (``WICKET_TABLE_COLUMNS``) and one row per fielder credited in a
+    wicket (``FIELDER_COLUMNS``), joined on ``delivery_id`` and
+    ``wicket_number``.
+
+    ``validate=True`` checks the match structure first (see
+    ``cricpy.parsers.validation``) and raises MatchValidationError for a
+    malformed match instead of failing somewhere inside the parser.
+    """
+    if output not in OUTPUTS:
+        raise ValueError(f"output must be one of {OUTPUTS}, got {output!r}")
+    if schema not in SCHEMAS:
+        raise ValueError(f"schema must be one of {SCHEMAS}, got {schema!r}")
+    if validate:
+        from cricpy.parsers.validation import check_match
+
+        with stage('parse_match.validate'):
+            check_match(match_dict)
+    with stage('parse_match.rows'):
+        columns = delivery_columns(match_dict, schema)
+        if normalize:
+            if 'delivery_id' not in columns:
+                ids = {'delivery_id': list(range(len(columns['ball'])))}
+                ids.update(columns)
+                columns = ids
+            wickets, fielders = dismissal_columns(match_dict)
+    with stage('parse_match.frame'):
+        convert = {'pandas': _to_frame, 'arrow': _to_record_batch, 'polars': to_polars}[output]
+        if normalize:
+            return MatchTables(convert(columns), convert(wickets), convert(fielders))
+        return convert(columns)
+
+
+def _to_frame(columns):
+    return pd.DataFrame(columns, columns=list(columns))
+
+
+def dismissal_columns(match_dict):
+    """
+    Build the normalized wicket and fielder tables of a match as two dicts
+    of column lists (``WICKET_TABLE_COLUMNS`` and ``FIELDER_COLUMNS``).
+    """
+    wickets = {name: [] for name in WICKET_TABLE_COLUMNS}
+    fielders = {name: [] for name in FIELDER_COLUMNS}
+    for i, (_, _, _, ball_info) in enumerate(_iter_deliveries(match_dict)):
+        if 'wicket' not in ball_info and 'wickets' not in ball_info:
+            continue
+        for n, wicket in enumerate(_wickets(ball_info), 1):
+            wickets['delivery_id'].append(i)
+            wickets['wicket_number'].append(n)
+            wickets['player_out'].append(wicket.get('player_out'))
+            wickets['kind'].append(wicket.get('kind'))
+            for name, substitute in _fielder_entries(wicket):
+                fielders['delivery_id'].append(i)
+                fielders['wicket_number'].append(n)
+                fielders['fielder'].append(name)
+                fielders['substitute'].append(substitute)
+    return wickets, fielders
+
+
+def delivery_columns(match_dict, schema='narrow'):
+    """
+    Parse a match into a dict of column lists (the columns of ``parse_match``),
+    in delivery order, without building a DataFrame.
+    """
+    columns = _narrow_columns(match_dict)
+    if schema == 'full':
+        extended = _extended_columns(match_dict)
+        columns = {name: extended[name] if name in extended else columns[name]
+                   for name in FULL_COLUMNS}
+    return columns
+
+
+def _extended_columns(match_dict):
+    """
+    Build the columns that ``schema='full'`` adds to the narrow ones.
+
+    Kept as a separate pass so the narrow default pays nothing for them.
+    """
+    columns = {name: [] for name in FULL_COLUMNS if name not in COLUMNS}
+    delivery_id = columns['delivery_id']
+    non_striker = columns['non_striker']
+    extras_cols = [columns[f'extras_{kind}'] for kind in EXTRAS_KINDS]
+    wicket_count, player_out = columns['wicket_count'], columns['player_out']
+    review_keys = ('by', 'umpire', 'batter', 'decision')
+    review_cols = [columns[f'review_{key}'] for key in review_keys]
+    replacement_keys = ('in', 'out', 'reason')
+    replacement_cols = [columns[f'replacement_{key}'] for key in replacement_keys]
+
+    for i, (_, _, _, ball_info) in enumerate(_iter_deliveries(match_dict)):
+        delivery_id.append(i)
+        non_striker.append(ball_info.get('non_striker'))
+
+        extras = ball_info.get('extras') or {}
+        for kind, column in zip(EXTRAS_KINDS, extras_cols):
+            column.append(extras.get(kind, 0))
+
+        wickets = _wickets(ball_info)
+        wicket_count.append(len(wickets))
+        player_out.append(wickets[0].get('player_out') if wickets else None)
+
+        review = ball_info.get('review') or {}
+        for key, column in zip(review_keys, review_cols):
+            column.append(review.get(key))
+
+        replacements = _replacements(ball_info)
+        for key, column in zip(replacement_keys, replacement_cols):
+            values = [str(r[key]) for r in replacements if r.get(key) is not None]
+            column.append(', '.join(values) if values else None)
+
+    return columns
+
+
+def parse_wickets(match_dict):
+    """
+    Return every wicket of a match as a DataFrame, one row per wicket.
+
+    Rows are keyed by ``delivery_id`` (the delivery's position in
+    ``parse_match(..., schema='full')``) and ``wicket_number`` for
+    deliveries on which more than one wicket fell. ``fielders`` holds the
+    credited fielders joined with ', '.
+    """
+    columns = {name: [] for name in WICKET_COLUMNS}
+    for i, (inning_name, _, ball_number, ball_info) in enumerate(_iter_deliveries(match_dict)):
+        for n, wicket in enumerate(_wickets(ball_info), 1):
+            fielders = _fielder_names(wicket)
+            columns['delivery_id'].append(i)
+            columns['inning'].append(inning_name)
+            columns['ball'].append(ball_number)
+            columns['wicket_number'].append(n)
+            columns['bowler'].append(ball_info.get('bowler'))
+            columns['player_out'].append(wicket.get('player_out'))
+            columns['kind'].append(wicket.get('kind'))
+            columns['fielders'].append(', '.join(fielders) if fielders else None)
+    return pd.DataFrame(columns, columns=WICKET_COLUMNS)
+
+
+def _narrow_columns(match_dict):
+    """
+    Build the default ``parse_match`` columns.
+    """
+    inning_col, team_col, ball_col = [], [], []
+    over_col, ball_in_over_col, index_col = [], [], []
+    batsman_col, bowler_col = [], []
+    total_col, batter_col, extras_col = [], [], []
+    extras_type_col, dismissal_col, fielder_col = [], [], []
+
+    current_inning, delivery_index = None, 0
+    for inning_name, batting_team, ball_number, ball_info in _iter_deliveries(match_dict):
+        runs = ball_info.get('runs', {})
+        extras = ball_info.get('extras')
+        wickets = _wickets(ball_info)
+        wicket = wickets[0] if wickets else {}
+        if inning_name != current_inning:
+            current_inning, delivery_index = inning_name, 0
+        over, ball = split_ball(ball_number)
+
+        inning_col.append(inning_name)
+        team_col.append(batting_team)
+        ball_col.append(ball_number)
+        over_col.append(over)
+        ball_in_over_col.append(ball)
+        index_col.append(delivery_index)
+        delivery_index += 1
+        batsman_col.append(ball_info.get('batsman'))
+        bowler_col.append(ball_info.get('bowler'))
+        total_col.append(runs.get('total', 0))
+        batter_col.append(runs.get('batsman', 0))
+        extras_col.append(runs.get('extras', 0))
+        extras_type_col.append(next(iter(extras)) if extras else None)
+        dismissal_col.append(wicket.get('kind'))
+        fielder_col.append(
+            ', '.join(_fielder_names(wicket)) if 'fielders' in wicket else wicket.get('fielder')
+        )
+
+    return {
+        'inning': inning_col,
+        'batting_team': team_col,
+        'ball': ball_col,
+        'over': over_col,
+        'ball_in_over': ball_in_over_col,
+        'delivery_index': index_col,
+        'batsman': batsman_col,
+        'bowler': bowler_col,
+        'runs_total': total_col,
+        'runs_batter': batter_col,
+        'runs_extras': extras_col,
+        'extras_type': extras_type_col,
+        'dismissal': dismissal_col,
+        'fielder': fielder_col,
+    }
+
+
+def _arrow_type(pa, column):
+    if column in STRING_COLUMNS or column == 'match_id':
+        return pa.dictionary(pa.int32(), pa.string())
+    if column in BOOL_COLUMNS:
+        return pa.bool_()
+    if column == 'ball':
+        return pa.float64()
+    return pa.int64()
+
+
+def arrow_schema(match_id=False):
+    """
+    Return the ``pyarrow.Schema`` of Arrow delivery batches.
+    """
+    pa = import_optional('pyarrow', extra='arrow', feature='Arrow output')
+    names = (['match_id'] if match_id else []) + COLUMNS
+    return pa.schema([pa.field(name, _arrow_type(pa, name)) for name in names])
+
+
+def _to_record_batch(columns):
+    pa = import_optional('pyarrow', extra='arrow', feature='Arrow output')
+    names = list(columns)
+    arrays = [pa.array(columns[name], type=_arrow_type(pa, name)) for name in names]
+    return pa.RecordBatch.from_arrays(arrays, names=names)
+
+
+def _polars_type(pl, column):
+    if column in STRING_COLUMNS:
+        return pl.Utf8
+    if column in BOOL_COLUMNS:
+        return pl.Boolean
+    if column == 'ball':
+        return pl.Float64
+    if column in _PARSED_COLUMNS:
+        return pl.Int64
+    return None
+
+
+def to_polars(columns):
+    """
+    Build a ``polars.DataFrame`` from a dict of column lists such as
+    ``delivery_columns`` returns; the types of columns the parser does not
+    produce (``match_id``, ``parse_info`` fields) are inferred.
+    """
+    pl = import_optional('polars', extra='polars', feature='Polars output')
+    return pl.DataFrame([pl.Series(name, values, dtype=_polars_type(pl, name))
+                         for name, values in columns.items()])
+
+
+def iter_record_batches(matches, max_rows=65536):
+    """
+    Parse an iterable of (match_id, match_dict) pairs, such as the output of
+    ``load_all_yaml``, into a stream of ``pyarrow.RecordBatch`` objects.
+
+    Each batch carries a leading ``match_id`` column and holds whole matches,
+    closing once it reaches ``max_rows`` deliveries. Empty batches are not
+    yielded. The batches share ``arrow_schema(match_id=True)`` and can be
+    written with ``pyarrow.ipc.new_stream`` or handed to Polars/DuckDB.
+    """
+    import_optional('pyarrow', extra='arrow', feature='Arrow output')
+    pending = None
+    rows = 0
+    for match_id, match_dict in matches:
+        columns = delivery_columns(match_dict)
+        n = len(columns['ball'])
+        if not n:
+            continue
+        if pending is None:
+            pending = {'match_id': []}
+            pending.update((name, []) for name in COLUMNS)
+        pending['match_id'].extend([match_id] * n)
+        for name in COLUMNS:
+            pending[name].extend(columns[name])
+        rows += n
+        if rows >= max_rows:
+            yield _to_record_batch(pending)
+            pending = None
+            rows = 0
+    if pending is not None:
+        yield _to_record_batch(pending)
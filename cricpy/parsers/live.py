@@ -0,0 +1,393 @@
+"""
+Incremental parsing of matches in progress.
+
+A LiveMatch takes deliveries one at a time and keeps the delivery columns
+of ``parse_match``, running innings totals and the batting, bowling and
+innings aggregates up to date with a constant amount of work per ball, so a
+growing match never has to be reparsed.
+
+LiveMatchFile follows a YAML match file that is being appended to: each
+``refresh`` reads only the bytes written since the previous one and parses
+the new deliveries. The text before ``innings:`` is decoded once for the
+match ``info``.
+
+    live = LiveMatchFile('live/1234.yaml')
+    while in_progress:
+        new_rows = live.refresh()          # number of deliveries added
+        state = live.state()               # runs, wickets, balls, target, ...
+        time.sleep(5)
+    live.refresh(final=True)               # the last delivery, once the file is complete
+    df = live.frame()
+
+A consumer that reads the rows after every ball can ask for only the new
+ones, ``live.frame(since=seen)``, which costs the same however long the
+match is.
+
+Deliveries in the JSON layout (a feed of ``batter``/``bowler``/``runs``
+records) are added with ``add_json``; a JSON match file cannot be appended
+to while staying valid, so there is no file follower for it.
+"""
+import os
+import re
+
+import pandas as pd
+import yaml
+
+from cricpy.io.file_loader import BallKey, yaml_loads
+from cricpy.parsers.cricsheet_parser import (
+    COLUMNS, _normalise_json_delivery, _ordinal, _wickets, split_ball,
+)
+from cricpy.stats.rolling import BOWLER_EXTRAS, NOT_BOWLER_WICKETS
+from cricpy.stats.scorecard import NOT_WICKETS
+
+CUMULATIVE_COLUMNS = ['innings_runs', 'innings_wickets', 'innings_balls']
+LIVE_COLUMNS = COLUMNS + CUMULATIVE_COLUMNS
+INNINGS_COLUMNS = ['inning', 'batting_team', 'runs', 'wickets', 'balls', 'extras', 'run_rate']
+BATTING_COLUMNS = ['inning', 'batsman', 'runs', 'balls', 'fours', 'sixes', 'out']
+BOWLING_COLUMNS = ['inning', 'bowler', 'balls', 'runs', 'wickets']
+
+_BALL_ITEM = re.compile(r'^( *)- (\d+\.\d+)\s*:')
+_INNINGS_ITEM = re.compile(r'^( *)- (.+?)\s*:\s*$')
+_TEAM = re.compile(r'^( *)team\s*:')
+
+
+def _rows_frame(columns, start, stop):
+    """
+    DataFrame of rows ``start:stop`` of the live columns, indexed by row.
+    """
+    return pd.DataFrame({name: columns[name][start:stop] for name in LIVE_COLUMNS},
+                        columns=LIVE_COLUMNS, index=pd.RangeIndex(start, stop))
+
+
+class LiveMatch:
+    """
+    Deliveries and aggregates of a match, updated one delivery at a time.
+    """
+
+    def __init__(self, info=None):
+        self.info = dict(info or {})
+        self._columns = {name: [] for name in LIVE_COLUMNS}
+        self._innings = {}
+        self._batting = {}
+        self._bowling = {}
+        self._current = None
+        self._frame = None
+
+    def __len__(self):
+        return len(self._columns['ball'])
+
+    def _start_innings(self, inning, team):
+        self._innings[inning] = {
+            'batting_team': team, 'runs': 0, 'wickets': 0, 'balls': 0, 'extras': 0,
+            'start': len(self), 'over': None, 'ball_in_over': 0,
+        }
+        self._current = inning
+
+    def _set_team(self, inning, team):
+        """
+        Record the batting team of an innings whose deliveries came first.
+        """
+        totals = self._innings.get(inning)
+        if totals is None:
+            self._start_innings(inning, team)
+            return
+        if totals['batting_team'] == team:
+            return
+        totals['batting_team'] = team
+        column = self._columns['batting_team']
+        for row in range(totals['start'], len(self)):
+            if self._columns['inning'][row] == inning:
+                column[row] = team
+        self._frame = None
+
+    def add(self, inning, team, ball, ball_info):
+        """
+        Add one delivery in the YAML layout (``ball`` is its ball number, as
+        a float, string or BallKey) to the named innings.
+        """
+        if isinstance(ball, str):
+            ball = BallKey(float(ball), ball)
+        if inning not in self._innings:
+            self._start_innings(inning, team)
+        totals = self._innings[inning]
+        self._current = inning
+
+        runs = ball_info.get('runs', {})
+        extras = ball_info.get('extras')
+        wicket = ball_info.get('wicket', {})
+        if isinstance(wicket, list):
+            wicket = wicket[0] if wicket else {}
+        extras_type = next(iter(extras)) if extras else None
+        total = runs.get('total', 0)
+        batter_runs = runs.get('batsman', 0)
+        batsman = ball_info.get('batsman')
+        bowler = ball_info.get('bowler')
+        legal = extras_type not in ('wides', 'noballs')
+        wickets = [w for w in _wickets(ball_info) if w.get('kind') not in NOT_WICKETS]
+
+        totals['runs'] += total
+        totals['extras'] += runs.get('extras', 0)
+        totals['wickets'] += len(wickets)
+        totals['balls'] += int(legal)
+
+        batting = self._batting.get((inning, batsman))
+        if batting is None:
+            batting = self._batting[(inning, batsman)] = [0, 0, 0, 0, False]
+        batting[0] += batter_runs
+        batting[1] += int(extras_type != 'wides')
+        batting[2] += int(batter_runs == 4)
+        batting[3] += int(batter_runs == 6)
+        for w in wickets:
+            out = self._batting.get((inning, w.get('player_out', batsman)))
+            if out is None:
+                out = self._batting[(inning, w.get('player_out', batsman))] = [0, 0, 0, 0, False]
+            out[4] = True
+
+        bowling = self._bowling.get((inning, bowler))
+        if bowling is None:
+            bowling = self._bowling[(inning, bowler)] = [0, 0, 0]
+        bowling[0] += int(legal)
+        bowling[1] += total - sum((extras or {}).get(kind, 0) for kind in BOWLER_EXTRAS)
+        bowling[2] += sum(1 for w in wickets if w.get('kind') not in NOT_BOWLER_WICKETS)
+
+        over, ball_in_over = split_ball(ball)
+        columns = self._columns
+        columns['delivery_index'].append(len(self) - totals['start'])
+        columns['inning'].append(inning)
+        columns['batting_team'].append(totals['batting_team'])
+        columns['ball'].append(ball)
+        columns['over'].append(over)
+        columns['ball_in_over'].append(ball_in_over)
+        columns['batsman'].append(batsman)
+        columns['bowler'].append(bowler)
+        columns['runs_total'].append(total)
+        columns['runs_batter'].append(batter_runs)
+        columns['runs_extras'].append(runs.get('extras', 0))
+        columns['extras_type'].append(extras_type)
+        columns['dismissal'].append(wicket.get('kind'))
+        columns['fielder'].append(
+            ', '.join(wicket['fielders']) if 'fielders' in wicket else wicket.get('fielder')
+        )
+        columns['innings_runs'].append(totals['runs'])
+        columns['innings_wickets'].append(totals['wickets'])
+        columns['innings_balls'].append(totals['balls'])
+
+    def add_json(self, team, over, delivery):
+        """
+        Add one delivery in the JSON layout, bowled in ``over`` (0-based) by
+        the innings of ``team``. A new batting team starts a new innings.
+        """
+        current = self._innings.get(self._current)
+        if current is None or current['batting_team'] != team:
+            inning = f'{_ordinal(len(self._innings) + 1)} innings'
+            self._start_innings(inning, team)
+            current = self._innings[inning]
+        if current['over'] != over:
+            current['over'], current['ball_in_over'] = over, 0
+        current['ball_in_over'] += 1
+        text = f"{over}.{current['ball_in_over']}"
+        ball_info = _normalise_json_delivery(delivery)
+        self.add(self._current, team, BallKey(float(text), text), ball_info)
+
+    def frame(self, since=0):
+        """
+        Return the deliveries so far as a DataFrame: the ``parse_match``
+        columns plus the innings runs, wickets and legal balls after each
+        delivery. Only the deliveries added since the previous call are
+        converted and appended to the cached frame.
+
+        ``since=n`` returns just the rows from the n-th delivery on (indexed
+        from n) and builds nothing else. Rows already returned keep their
+        batting team if it is only named later in the file.
+        """
+        n = len(self)
+        if since:
+            return _rows_frame(self._columns, min(since, n), n)
+        frame = self._frame
+        if frame is None or not len(frame):
+            frame = _rows_frame(self._columns, 0, n)
+        elif len(frame) < n:
+            frame = pd.concat([frame, _rows_frame(self._columns, len(frame), n)])
+        self._frame = frame
+        return frame
+
+    def innings(self):
+        """
+        Return one row per innings with its total so far.
+        """
+        records = []
+        for inning, t in self._innings.items():
+            run_rate = 6.0 * t['runs'] / t['balls'] if t['balls'] else float('nan')
+            records.append([inning, t['batting_team'], t['runs'], t['wickets'], t['balls'],
+                            t['extras'], run_rate])
+        return pd.DataFrame(records, columns=INNINGS_COLUMNS)
+
+    def batting(self):
+        return pd.DataFrame([[inning, batsman] + values
+                             for (inning, batsman), values in self._batting.items()],
+                            columns=BATTING_COLUMNS)
+
+    def bowling(self):
+        return pd.DataFrame([[inning, bowler] + values
+                             for (inning, bowler), values in self._bowling.items()],
+                            columns=BOWLING_COLUMNS)
+
+    def state(self):
+        """
+        The state of the current innings as a dict: ``inning``,
+        ``batting_team``, ``runs``, ``wickets``, ``balls``, and for a chase
+        in a limited-overs match ``target``, ``required_runs``,
+        ``balls_remaining`` and ``required_rate``. ``runs``, ``wickets``,
+        ``balls`` and ``target`` can be passed straight to
+        ``cricpy.models.simulate_innings``.
+        """
+        if self._current is None:
+            return None
+        t = self._innings[self._current]
+        state = {
+            'inning': self._current, 'batting_team': t['batting_team'],
+            'runs': t['runs'], 'wickets': t['wickets'], 'balls': t['balls'],
+        }
+        overs = self.info.get('overs')
+        if overs:
+            state['balls_remaining'] = max(6 * overs - t['balls'], 0)
+        names = list(self._innings)
+        if overs and len(names) == 2 and names[1] == self._current:
+            target = self._innings[names[0]]['runs'] + 1
+            state['target'] = target
+            state['required_runs'] = max(target - t['runs'], 0)
+            remaining = state['balls_remaining']
+            state['required_rate'] = (6.0 * state['required_runs'] / remaining
+                                      if remaining else float('nan'))
+        return state
+
+
+class LiveMatchFile(LiveMatch):
+    """
+    LiveMatch fed from a YAML match file that grows as the match goes on.
+
+    ``refresh`` reads from the byte offset where the previous call stopped.
+    The newest delivery is held back until the next one starts (or until
+    ``refresh(final=True)``), since the writer may not have flushed all of
+    its lines yet. With ``wait_for_next=False`` it is parsed as soon as its
+    runs are complete, for writers that flush whole deliveries. A file that
+    shrinks or whose header changes is treated as replaced and read again
+    from the start.
+    """
+
+    def __init__(self, path, wait_for_next=True):
+        self.path = path
+        self.wait_for_next = wait_for_next
+        self._reset()
+
+    def _reset(self):
+        LiveMatch.__init__(self)
+        self._offset = 0
+        self._header = None
+        self._in_innings = False
+        self._innings_indent = None
+        self._inning = None
+        self._team = None
+
+    def refresh(self, final=False):
+        """
+        Parse the deliveries appended since the last call; returns how many
+        were added. ``final=True`` also parses the newest delivery, once the
+        file is complete.
+        """
+        with open(self.path, 'rb') as f:
+            if self._header is not None and f.read(len(self._header)) != self._header:
+                self._reset()
+            elif os.path.getsize(self.path) < self._offset:
+                self._reset()
+            f.seek(self._offset)
+            data = f.read()
+        end = data.rfind(b'\n') + 1
+        if not end:
+            return 0
+        lines = data[:end].decode('utf-8').splitlines(True)
+        before = len(self)
+        if not self._in_innings:
+            lines = self._read_header(lines)
+            if lines is None:
+                return 0
+            header = len(self._header)
+            self._offset += header
+            end -= header
+        self._offset += end - self._parse(lines, final or not self.wait_for_next)
+        return len(self) - before
+
+    def _read_header(self, lines):
+        """
+        Decode the match header once ``innings:`` has been written; returns
+        the remaining lines, or None to wait for more.
+        """
+        for i, line in enumerate(lines):
+            if line.startswith('innings:'):
+                header = yaml_loads(''.join(lines[:i])) or {}
+                self.info = header.get('info') or {}
+                self._header = ''.join(lines[:i + 1]).encode('utf-8')
+                self._in_innings = True
+                return lines[i + 1:]
+        return None
+
+    def _parse(self, lines, take_last):
+        """
+        Add the complete deliveries in ``lines``; returns the number of
+        bytes at the end left unparsed.
+        """
+        item, item_indent = [], None
+        held = 0
+        for line in lines:
+            indent = len(line) - len(line.lstrip(' '))
+            if item and (indent > item_indent or not line.strip()):
+                item.append(line)
+                continue
+            if item:
+                self._add_item(item)
+                item = []
+            ball = _BALL_ITEM.match(line)
+            if ball:
+                item, item_indent = [line], len(ball.group(1))
+                continue
+            team = _TEAM.match(line)
+            if team:
+                self._team = yaml_loads(line.strip())['team']
+                if self._inning is not None:
+                    self._set_team(self._inning, self._team)
+                continue
+            inning = _INNINGS_ITEM.match(line)
+            if inning and self._innings_indent in (None, len(inning.group(1))):
+                self._innings_indent = len(inning.group(1))
+                self._inning, self._team = yaml_loads(inning.group(2)), None
+        if item and not (take_last and self._add_item(item, last=True)):
+            held = sum(len(line.encode('utf-8')) for line in item)
+        return held
+
+    def _add_item(self, item, last=False):
+        """
+        Decode and add one delivery; the last one in the file is skipped
+        (returning False) while it is still incomplete.
+        """
+        indent = len(item[0]) - len(item[0].lstrip(' '))
+        try:
+            delivery = yaml_loads(''.join(line[indent:] for line in item))[0]
+        except yaml.YAMLError:
+            if last:
+                return False
+            raise
+        for ball, ball_info in delivery.items():
+            if last and not _has_runs(ball_info):
+                return False
+            self.add(self._inning, self._team, ball, ball_info)
+        return True
+
+
+def _has_runs(ball_info):
+    """
+    Whether a delivery has all of its runs written.
+    """
+    if not isinstance(ball_info, dict):
+        return False
+    runs = ball_info.get('runs')
+    return isinstance(runs, dict) and all(key in runs for key in ('batsman', 'extras', 'total'))
@@ -0,0 +1,309 @@
+"""
+Opt-in timing instrumentation for the load -> parse pipeline.
+
+Instrumented stages record wall time, CPU time and, optionally, memory
+allocated (via tracemalloc) while a Profiler is active:
+
+    from cricpy.profiling import profile
+
+    with profile(trace_memory=True, chrome_trace='trace.json') as prof:
+        for filename, match in load_all_yaml('matches/'):
+            parse_match(match)
+    print(prof.report())
+
+Setting the environment variable ``CRICPY_PROFILE=1`` (or ``true``, ``yes``,
+``on``) profiles the whole process and prints the report to stderr at exit;
+``0``, ``false`` and other values leave it off. ``CRICPY_PROFILE_MEMORY=1``
+adds tracemalloc accounting and ``CRICPY_PROFILE_TRACE=<path>`` writes a
+Chrome trace (chrome://tracing, Perfetto) alongside it.
+
+When no profiler is active an instrumented call costs one global lookup;
+the per-delivery loops are never instrumented.
+"""
+import atexit
+import json
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from functools import wraps
+
+_active = None
+
+
+class StageStats:
+    """
+    Accumulated measurements for one named stage.
+    """
+
+    __slots__ = ('name', 'count', 'wall', 'cpu', 'alloc_bytes', 'peak_bytes')
+
+    def __init__(self, name):
+        self.name = name
+        self.count = 0
+        self.wall = 0.0
+        self.cpu = 0.0
+        self.alloc_bytes = 0
+        self.peak_bytes = 0
+
+    def as_dict(self):
+        return {
+            'count': self.count,
+            'wall': self.wall,
+            'cpu': self.cpu,
+            'alloc_bytes': self.alloc_bytes,
+            'peak_bytes': self.peak_bytes,
+        }
+
+
+class _Frame:
+    __slots__ = ('name', 'wall', 'cpu', 'mem', 'peak')
+
+    def __init__(self, name, wall, cpu, mem):
+        self.name = name
+        self.wall = wall
+        self.cpu = cpu
+        self.mem = mem
+        self.peak = mem
+
+
+class Profiler:
+    """
+    Collects per-stage measurements while active.
+
+    Stage times are inclusive: ``load_all_yaml`` includes the ``load_yaml``
+    calls it makes. CPU time is per thread. Memory figures are process-wide
+    and are only meaningful when stages are not running on several threads.
+    """
+
+    def __init__(self, trace_memory=False, chrome_trace=None):
+        self.trace_memory = trace_memory
+        self.chrome_trace = chrome_trace
+        self.stages = {}
+        self.events = []
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._started_tracemalloc = False
+        self._previous = None
+        self._origin = time.perf_counter()
+
+    def start(self):
+        """
+        Make this the active profiler.
+        """
+        global _active
+        if self.trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracemalloc = True
+        self._previous = _active
+        self._origin = time.perf_counter()
+        _active = self
+        return self
+
+    def stop(self):
+        """
+        Deactivate this profiler and write the Chrome trace if one was requested.
+        """
+        global _active
+        _active = self._previous
+        self._previous = None
+        if self._started_tracemalloc:
+            tracemalloc.stop()
+            self._started_tracemalloc = False
+        if self.chrome_trace:
+            self.write_chrome_trace(self.chrome_trace)
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+
+    def _stack(self):
+        stack = getattr(self._local, 'stack', None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def _enter(self, name):
+        stack = self._stack()
+        mem = 0
+        if self.trace_memory and tracemalloc.is_tracing():
+            mem, peak = tracemalloc.get_traced_memory()
+            if stack:
+                stack[-1].peak = max(stack[-1].peak, peak)
+            if hasattr(tracemalloc, 'reset_peak'):
+                tracemalloc.reset_peak()
+        frame = _Frame(name, time.perf_counter(), time.thread_time(), mem)
+        stack.append(frame)
+        return frame
+
+    def _exit(self, frame):
+        wall_end = time.perf_counter()
+        cpu = time.thread_time() - frame.cpu
+        wall = wall_end - frame.wall
+        stack = self._stack()
+        stack.pop()
+
+        alloc = peak = 0
+        if self.trace_memory and tracemalloc.is_tracing():
+            mem, traced_peak = tracemalloc.get_traced_memory()
+            frame.peak = max(frame.peak, traced_peak)
+            alloc = mem - frame.mem
+            peak = frame.peak - frame.mem
+            if stack:
+                stack[-1].peak = max(stack[-1].peak, frame.peak)
+
+        with self._lock:
+            stats = self.stages.get(frame.name)
+            if stats is None:
+                stats = self.stages[frame.name] = StageStats(frame.name)
+            stats.count += 1
+            stats.wall += wall
+            stats.cpu += cpu
+            stats.alloc_bytes += alloc
+            stats.peak_bytes = max(stats.peak_bytes, peak)
+            if self.chrome_trace:
+                self.events.append({
+                    'name': frame.name,
+                    'ph': 'X',
+                    'ts': (frame.wall - self._origin) * 1e6,
+                    'dur': wall * 1e6,
+                    'pid': os.getpid(),
+                    'tid': threading.get_ident(),
+                    'args': {'cpu_ms': cpu * 1e3, 'alloc_bytes': alloc},
+                })
+
+    def as_dict(self):
+        """
+        Return {stage name: measurements} for every stage seen.
+        """
+        with self._lock:
+            return {name: stats.as_dict() for name, stats in self.stages.items()}
+
+    def report(self):
+        """
+        Return a text table of the stages, slowest (by wall time) first.
+        """
+        with self._lock:
+            stages = sorted(self.stages.values(), key=lambda s: s.wall, reverse=True)
+        lines = [
+            f"{'stage':<28}{'calls':>9}{'wall s':>11}{'cpu s':>11}"
+            f"{'alloc MiB':>12}{'peak MiB':>11}"
+        ]
+        for s in stages:
+            lines.append(
+                f'{s.name:<28}{s.count:>9}{s.wall:>11.4f}{s.cpu:>11.4f}'
+                f'{s.alloc_bytes / 2 ** 20:>12.2f}{s.peak_bytes / 2 ** 20:>11.2f}'
+            )
+        return '\n'.join(lines)
+
+    def write_chrome_trace(self, path):
+        """
+        Write the recorded stage events in Chrome trace-event JSON format.
+        """
+        with self._lock:
+            events = list(self.events)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({'traceEvents': events, 'displayTimeUnit': 'ms'}, f)
+
+
+def profile(trace_memory=False, chrome_trace=None):
+    """
+    Create a Profiler for use as a context manager.
+
+    ``chrome_trace`` is a path that receives a Chrome trace when the
+    profiler stops.
+    """
+    return Profiler(trace_memory=trace_memory, chrome_trace=chrome_trace)
+
+
+def active_profiler():
+    """
+    Return the active Profiler, or None.
+    """
+    return _active
+
+
+class _NullStage:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NULL_STAGE = _NullStage()
+
+
+class _Stage:
+    __slots__ = ('profiler', 'name', 'frame')
+
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+        self.frame = None
+
+    def __enter__(self):
+        self.frame = self.profiler._enter(self.name)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.profiler._exit(self.frame)
+        return False
+
+
+def stage(name):
+    """
+    Context manager timing a block as stage ``name`` when profiling is active.
+    """
+    profiler = _active
+    if profiler is None:
+        return _NULL_STAGE
+    return _Stage(profiler, name)
+
+
+def profiled(name):
+    """
+    Decorator timing every call of a function as stage ``name``.
+    """
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            profiler = _active
+            if profiler is None:
+                return func(*args, **kwargs)
+            frame = profiler._enter(name)
+            try:
+                return func(*args, **kwargs)
+            finally:
+                profiler._exit(frame)
+        return wrapper
+    return decorator
+
+
+def _env_flag(name):
+    """
+    Whether environment variable ``name`` is set to 1, true, yes or on.
+    """
+    return os.environ.get(name, '').strip().lower() in ('1', 'true', 'yes', 'on')
+
+
+def _enable_from_environment():
+    profiler = Profiler(
+        trace_memory=_env_flag('CRICPY_PROFILE_MEMORY'),
+        chrome_trace=os.environ.get('CRICPY_PROFILE_TRACE') or None,
+    ).start()
+
+    def _report():
+        profiler.stop()
+        sys.stderr.write(profiler.report() + '\n')
+
+    atexit.register(_report)
+
+
+if _env_flag('CRICPY_PROFILE'):
+    _enable_from_environment()
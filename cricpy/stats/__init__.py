@@ -0,0 +1,39 @@
+"""
+Aggregations and analytics over parsed deliveries.
+
+Names are imported on first access so importing the package stays cheap.
+"""
+import importlib
+
+_LAZY_ATTRIBUTES = {
+    'Reducer': 'cricpy.stats.chunked',
+    'GroupAggregate': 'cricpy.stats.chunked',
+    'aggregate_chunked': 'cricpy.stats.chunked',
+    'iter_chunks': 'cricpy.stats.chunked',
+    'batting_summary': 'cricpy.stats.chunked',
+    'bowling_summary': 'cricpy.stats.chunked',
+    'batting_form': 'cricpy.stats.rolling',
+    'bowling_form': 'cricpy.stats.rolling',
+    'rolling_sums': 'cricpy.stats.rolling',
+    'Scorecards': 'cricpy.stats.scorecard',
+    'scorecards': 'cricpy.stats.scorecard',
+    'corpus_scorecards': 'cricpy.stats.scorecard',
+    'VenueIndex': 'cricpy.stats.venues',
+    'PlayerSimilarity': 'cricpy.stats.similarity',
+    'batting_features': 'cricpy.stats.similarity',
+}
+
+__all__ = list(_LAZY_ATTRIBUTES)
+
+
+def __getattr__(name):
+    module = _LAZY_ATTRIBUTES.get(name)
+    if module is None:
+        raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+    value = getattr(importlib.import_module(module), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_ATTRIBUTES))
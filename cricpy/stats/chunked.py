@@ -0,0 +1,300 @@
+"""
+Out-of-core aggregation over match archives larger than memory.
+
+Matches are streamed from any iterable of (match_id, match_dict) pairs
+(``iter_matches``, ``aiter_matches`` collected per chunk, a generator over a
+zip, ...), parsed ``chunk_size`` matches at a time into one DataFrame, and
+each chunk is reduced to a small partial result. Partials are combined as
+they arrive and the chunk is dropped, so peak memory is bounded by the
+chunk size plus the size of the partial results (the number of groups),
+not by the archive size.
+
+    results = aggregate_chunked(
+        iter_matches('all_matches/'),
+        {'batting': batting_summary(), 'teams': GroupAggregate(['match_type', 'batting_team'],
+                                                                runs=('runs_total', 'sum'))},
+        chunk_size=500,
+    )
+
+With ``backend='polars'`` the chunks are Polars DataFrames built from the
+column buffers and the GroupAggregate partials are computed and combined
+with Polars' lazy, multithreaded group-by; the final results are the same
+pandas DataFrames as with the default backend.
+"""
+import pandas as pd
+
+from cricpy._optional import import_optional
+from cricpy.parsers.cricsheet_parser import (
+    delivery_columns, dismissal_columns, parse_info, to_polars,
+)
+from cricpy.stats.rolling import BOWLER_EXTRAS, NOT_BOWLER_WICKETS
+from cricpy.stats.scorecard import NOT_WICKETS
+
+_COMBINE = {'sum': 'sum', 'count': 'sum', 'min': 'min', 'max': 'max'}
+AGGREGATIONS = ('sum', 'count', 'min', 'max', 'mean')
+BACKENDS = ('pandas', 'polars')
+
+
+def _polars():
+    return import_optional('polars', extra='polars', feature="backend='polars'")
+
+
+class Reducer:
+    """
+    A combinable aggregation: ``map`` turns a chunk of deliveries into a
+    partial result, ``combine`` merges two partials (it must be associative)
+    and ``finalize`` turns the merged partial into the result. Chunks are
+    pandas or Polars DataFrames depending on the backend.
+    """
+
+    def map(self, df):
+        raise NotImplementedError
+
+    def combine(self, left, right):
+        raise NotImplementedError
+
+    def finalize(self, partial):
+        return partial
+
+
+class GroupAggregate(Reducer):
+    """
+    Grouped aggregation with combinable statistics.
+
+    Each keyword argument names an output column as ``(column, how)`` with
+    ``how`` one of 'sum', 'count', 'min', 'max' or 'mean' (carried as a sum
+    and a count until ``finalize``).
+    """
+
+    def __init__(self, by, **aggregations):
+        if not aggregations:
+            raise ValueError('at least one aggregation is required')
+        for name, (column, how) in aggregations.items():
+            if how not in AGGREGATIONS:
+                raise ValueError(
+                    f'{name}: unsupported aggregation {how!r}; use one of {AGGREGATIONS}')
+        self.by = [by] if isinstance(by, str) else list(by)
+        self.aggregations = aggregations
+        self._partial_spec = {}
+        for name, (column, how) in aggregations.items():
+            if how == 'mean':
+                self._partial_spec[f'{name}__sum'] = (column, 'sum')
+                self._partial_spec[f'{name}__count'] = (column, 'count')
+            else:
+                self._partial_spec[name] = (column, how)
+
+    def map(self, df):
+        if not isinstance(df, pd.DataFrame):
+            pl = _polars()
+            return df.lazy().group_by(self.by).agg([
+                getattr(pl.col(column), how)().alias(name)
+                for name, (column, how) in self._partial_spec.items()
+            ]).collect()
+        grouped = df.groupby(self.by, sort=False, observed=True, dropna=False)
+        return grouped.agg(**self._partial_spec)
+
+    def combine(self, left, right):
+        if not isinstance(left, pd.DataFrame):
+            pl = _polars()
+            return pl.concat([left, right]).lazy().group_by(self.by).agg([
+                getattr(pl.col(name), _COMBINE[how])().alias(name)
+                for name, (_, how) in self._partial_spec.items()
+            ]).collect()
+        merged = pd.concat([left, right])
+        rules = {name: _COMBINE[how] for name, (_, how) in self._partial_spec.items()}
+        return merged.groupby(level=list(range(merged.index.nlevels)), sort=False,
+                              dropna=False).agg(rules)
+
+    def finalize(self, partial):
+        if not isinstance(partial, pd.DataFrame):
+            # partials hold one row per group, so a plain dict conversion is cheap
+            partial = pd.DataFrame(partial.to_dict(as_series=False)).set_index(self.by)
+        result = pd.DataFrame(index=partial.index)
+        for name, (_, how) in self.aggregations.items():
+            if how == 'mean':
+                result[name] = partial[f'{name}__sum'] / partial[f'{name}__count']
+            else:
+                result[name] = partial[name]
+        return result.sort_index()
+
+
+class _BattingSummary(GroupAggregate):
+    """
+    GroupAggregate that credits each dismissal to the player out, who is
+    not always the striker (a run out at the non-striker's end).
+    """
+
+    def map(self, df):
+        return super().map(_credit_outs(df))
+
+
+def _credit_outs(df):
+    """
+    Move ``is_out`` from the striker to the player out: a delivery whose
+    player out is not the striker gets an extra row for that player that
+    carries only the dismissal.
+    """
+    zeroed = ('runs_batter', 'is_legal_for_batter', 'is_four', 'is_six')
+    if not isinstance(df, pd.DataFrame):
+        pl = _polars()
+        moved = (pl.col('is_out') == 1) & pl.col('player_out').is_not_null() & (
+            pl.col('player_out') != pl.col('batsman'))
+        extra = df.filter(moved).with_columns(
+            pl.col('player_out').alias('batsman'), *[pl.col(c) * 0 for c in zeroed])
+        striker = df.with_columns(
+            pl.when(moved.fill_null(False)).then(0).otherwise(pl.col('is_out'))
+            .cast(df.schema['is_out']).alias('is_out'))
+        return pl.concat([striker, extra])
+    moved = (df['is_out'] == 1) & df['player_out'].notna() & (df['player_out'] != df['batsman'])
+    if not moved.any():
+        return df
+    extra = df[moved].copy()
+    extra['batsman'] = extra['player_out']
+    extra[list(zeroed)] = 0
+    striker = df.assign(is_out=df['is_out'].where(~moved, 0))
+    return pd.concat([striker, extra], ignore_index=True)
+
+
+def batting_summary(by=('batsman',)):
+    """
+    Runs, balls faced (excluding wides), fours, sixes and dismissals per batter.
+
+    Dismissals are credited to the player out and exclude ``NOT_WICKETS``
+    (retired hurt or not out).
+    """
+    return _BattingSummary(
+        by,
+        runs=('runs_batter', 'sum'),
+        balls=('is_legal_for_batter', 'sum'),
+        fours=('is_four', 'sum'),
+        sixes=('is_six', 'sum'),
+        outs=('is_out', 'sum'),
+    )
+
+
+def bowling_summary(by=('bowler',)):
+    """
+    Deliveries, runs conceded and wickets per bowler.
+
+    Runs conceded exclude byes, leg-byes and penalty runs, and wickets
+    exclude run outs and retirements, as in ``rolling.bowling_form`` and
+    the scorecards.
+    """
+    return GroupAggregate(
+        by,
+        deliveries=('ball', 'count'),
+        runs=('runs_conceded', 'sum'),
+        wickets=('is_bowler_wicket', 'sum'),
+    )
+
+
+def add_flag_columns(df):
+    """
+    Add the helper columns used by the summary reducers.
+    """
+    if not isinstance(df, pd.DataFrame):
+        pl = _polars()
+        is_out = pl.col('dismissal').is_not_null() & ~pl.col('dismissal').is_in(NOT_WICKETS)
+        return df.with_columns(
+            pl.col('extras_type').ne_missing('wides').cast(pl.Int8).alias('is_legal_for_batter'),
+            (pl.col('runs_batter') == 4).cast(pl.Int8).alias('is_four'),
+            (pl.col('runs_batter') == 6).cast(pl.Int8).alias('is_six'),
+            pl.col('dismissal').is_not_null().cast(pl.Int8).alias('is_wicket'),
+            is_out.cast(pl.Int8).alias('is_out'),
+            (is_out & ~pl.col('dismissal').is_in(NOT_BOWLER_WICKETS)).cast(pl.Int8)
+            .alias('is_bowler_wicket'),
+            (pl.col('runs_total') - pl.when(pl.col('extras_type').is_in(BOWLER_EXTRAS))
+             .then(pl.col('runs_extras')).otherwise(0)).alias('runs_conceded'),
+        )
+    extras_type = df['extras_type']
+    dismissal = df['dismissal']
+    is_out = dismissal.notna() & ~dismissal.isin(NOT_WICKETS)
+    df['is_legal_for_batter'] = (extras_type != 'wides').astype('int8')
+    df['is_four'] = (df['runs_batter'] == 4).astype('int8')
+    df['is_six'] = (df['runs_batter'] == 6).astype('int8')
+    df['is_wicket'] = dismissal.notna().astype('int8')
+    df['is_out'] = is_out.astype('int8')
+    df['is_bowler_wicket'] = (is_out & ~dismissal.isin(NOT_BOWLER_WICKETS)).astype('int8')
+    df['runs_conceded'] = df['runs_total'] - df['runs_extras'].where(
+        extras_type.isin(BOWLER_EXTRAS), 0)
+    return df
+
+
+def _player_out(match_dict, n):
+    """
+    The first player out on each delivery, for schemas without the column.
+    """
+    player_out = [None] * n
+    wickets = dismissal_columns(match_dict)[0]
+    for i, number, name in zip(wickets['delivery_id'], wickets['wicket_number'],
+                               wickets['player_out']):
+        if number == 1:
+            player_out[i] = name
+    return player_out
+
+
+def iter_chunks(matches, chunk_size=256, info_columns=('match_type', 'season'), schema='narrow',
+                backend='pandas'):
+    """
+    Yield DataFrames of the deliveries of up to ``chunk_size`` matches,
+    with ``match_id``, the requested ``parse_info`` fields, ``player_out``
+    and the flag columns of ``add_flag_columns``. ``backend='polars'`` yields Polars
+    DataFrames (requires polars).
+    """
+    if chunk_size < 1:
+        raise ValueError('chunk_size must be at least 1')
+    if backend not in BACKENDS:
+        raise ValueError(f'backend must be one of {BACKENDS}, got {backend!r}')
+    frame = to_polars if backend == 'polars' else pd.DataFrame
+    info_columns = list(info_columns)
+    buffers = None
+    count = 0
+    for match_id, match_dict in matches:
+        columns = delivery_columns(match_dict, schema)
+        n = len(columns['ball'])
+        if 'player_out' not in columns:
+            columns['player_out'] = _player_out(match_dict, n)
+        if buffers is None:
+            buffers = {name: [] for name in ['match_id'] + info_columns + list(columns)}
+        info = parse_info(match_dict)
+        buffers['match_id'].extend([match_id] * n)
+        for name in info_columns:
+            buffers[name].extend([info[name]] * n)
+        for name, values in columns.items():
+            buffers[name].extend(values)
+        count += 1
+        if count >= chunk_size:
+            yield add_flag_columns(frame(buffers))
+            buffers = None
+            count = 0
+    if buffers is not None:
+        yield add_flag_columns(frame(buffers))
+
+
+def aggregate_chunked(matches, reducers, chunk_size=256, info_columns=('match_type', 'season'),
+                      schema='narrow', backend='pandas'):
+    """
+    Run ``reducers`` over all deliveries of ``matches`` chunk by chunk.
+
+    ``reducers`` is a Reducer or a dict of them; the result has the same
+    shape. Reducers see the chunk frames produced by ``iter_chunks`` with
+    the given ``backend``.
+    """
+    single = isinstance(reducers, Reducer)
+    named = {None: reducers} if single else dict(reducers)
+    partials = {}
+    for chunk in iter_chunks(matches, chunk_size, info_columns, schema, backend):
+        for name, reducer in named.items():
+            partial = reducer.map(chunk)
+            if name in partials:
+                partial = reducer.combine(partials[name], partial)
+            partials[name] = partial
+        del chunk
+
+    results = {}
+    for name, reducer in named.items():
+        if name in partials:
+            results[name] = reducer.finalize(partials[name])
+        else:
+            results[name] = None
+    return results[None] if single else results
@@ -0,0 +1,173 @@
+"""
+Rolling form metrics (last N innings, matches or overs) for all players at once.
+
+Deliveries are first reduced to one row per player and unit (batting
+innings, bowling match or over) with a single groupby. The units are then
+sorted by player and match date, and every window sum is the difference of
+two cumulative sums, clipped at the start of the player's history, so the
+cost is one sort plus a few array operations regardless of the number of
+players.
+
+The delivery frame needs ``match_id`` and the match date, either as a
+``date`` column (``iter_chunks(..., info_columns=('date',))``) or from
+``dates``, a mapping or Series of match_id to date (such as
+``corpus.matches.set_index('match_id')['date']``). Batting dismissals are
+credited to the ``player_out`` column when the frame has one
+(``schema='full'`` or ``iter_chunks``), otherwise to the striker.
+
+    form = batting_form(deliveries, window=10)
+    latest = form.groupby('batsman').tail(1)
+"""
+import numpy as np
+import pandas as pd
+
+BOWLER_EXTRAS = ('byes', 'legbyes', 'penalty')
+NOT_BOWLER_WICKETS = ('run out', 'retired hurt', 'retired out', 'obstructing the field')
+NOT_WICKETS = ('retired hurt', 'retired not out')
+UNITS = ('match', 'over')
+
+
+def rolling_sums(keys, values, window):
+    """
+    Trailing window sums over consecutive rows of the same key.
+
+    ``keys`` (length n) must be sorted so each key's rows are contiguous,
+    in time order; ``values`` is an (n,) or (n, k) array. Returns
+    ``(sums, counts)``: the sum of each row's last ``window`` rows of its key
+    (itself included) and how many rows that window held.
+    """
+    if window < 1:
+        raise ValueError('window must be at least 1')
+    keys = np.asarray(keys)
+    values = np.asarray(values, dtype=float)
+    n = len(keys)
+    position = np.arange(n)
+    new_key = np.ones(n, dtype=bool)
+    new_key[1:] = keys[1:] != keys[:-1]
+    key_start = np.maximum.accumulate(np.where(new_key, position, 0))
+    low = np.maximum(position - window + 1, key_start)
+
+    cumulative = np.zeros((n + 1,) + values.shape[1:])
+    np.cumsum(values, axis=0, out=cumulative[1:])
+    return cumulative[position + 1] - cumulative[low], position + 1 - low
+
+
+def _with_dates(deliveries, dates):
+    if dates is not None:
+        mapped = deliveries['match_id'].map(dates)
+        return deliveries.assign(date=np.asarray(mapped, dtype=object))
+    if 'date' not in deliveries.columns:
+        raise ValueError("deliveries need a 'date' column, or pass dates=")
+    return deliveries
+
+
+def _sort_codes(values):
+    """
+    Integer codes that sort like ``values``, so sorting needs no string compares.
+    """
+    return pd.factorize(values, sort=True)[0]
+
+
+def _rolling_table(units, by, window, sums):
+    """
+    Sort per-unit rows by player and time, then add ``window_<column>``
+    sums for ``sums`` and the number of units in each window.
+    """
+    units = units.reset_index()
+    players = _sort_codes(units[by])
+    order = np.lexsort((units['first_row'].to_numpy(), _sort_codes(units['match_id']),
+                        _sort_codes(units['date']), players))
+    units = units.iloc[order].reset_index(drop=True)
+    totals, counts = rolling_sums(players[order], units[sums].to_numpy(), window)
+    for i, column in enumerate(sums):
+        units[f'window_{column}'] = totals[:, i]
+    units['window_size'] = counts
+    return units.drop(columns='first_row')
+
+
+def _ratio(numerator, denominator, scale=1.0):
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(denominator > 0, scale * numerator / denominator, np.nan)
+
+
+def batting_form(deliveries, window=10, dates=None):
+    """
+    Rolling batting form over each batter's last ``window`` innings.
+
+    Returns one row per batting innings, ordered by batter and date, with the
+    innings' runs, balls (excluding wides) and dismissal, the window totals
+    and the window ``average`` (runs per dismissal) and ``strike_rate``.
+    Retirements (``NOT_WICKETS``) are not dismissals; a batter run out
+    without facing a ball still gets an innings row.
+    """
+    df = _with_dates(deliveries, dates)
+    dismissal = df['dismissal']
+    is_out = (dismissal.notna() & ~dismissal.isin(NOT_WICKETS)).to_numpy()
+    batsman = np.asarray(df['batsman'], dtype=object)
+    player_out = batsman
+    if 'player_out' in df.columns:
+        named = np.asarray(df['player_out'], dtype=object)
+        player_out = np.where(pd.isna(named), batsman, named)
+    moved = is_out & (player_out != batsman)
+    frame = pd.DataFrame({
+        'batsman': batsman,
+        'match_id': df['match_id'].to_numpy(),
+        'inning': df['inning'].to_numpy(),
+        'date': df['date'].to_numpy(),
+        'runs': df['runs_batter'].to_numpy(),
+        'balls': (df['extras_type'] != 'wides').to_numpy().astype('int64'),
+        'outs': (is_out & ~moved).astype('int64'),
+        'first_row': np.arange(len(df)),
+    })
+    if moved.any():
+        # the player out (a non-striker run out) gets a row carrying only the dismissal
+        extra = frame[moved].assign(batsman=player_out[moved], runs=0, balls=0, outs=1)
+        frame = pd.concat([frame, extra], ignore_index=True)
+    units = frame.groupby(['batsman', 'match_id', 'inning'], sort=False, observed=True).agg(
+        date=('date', 'first'), first_row=('first_row', 'first'),
+        runs=('runs', 'sum'), balls=('balls', 'sum'), outs=('outs', 'sum'),
+    )
+    form = _rolling_table(units, 'batsman', window, ['runs', 'balls', 'outs'])
+    form['average'] = _ratio(form['window_runs'], form['window_outs'])
+    form['strike_rate'] = _ratio(form['window_runs'], form['window_balls'], 100.0)
+    return form
+
+
+def bowling_form(deliveries, window=10, unit='match', dates=None):
+    """
+    Rolling bowling form over each bowler's last ``window`` matches, or
+    overs with ``unit='over'``.
+
+    Runs conceded exclude byes, leg-byes and penalty runs, legal balls exclude wides and
+    no-balls, and wickets exclude run outs and retirements. Returns one row
+    per unit with the window totals, ``economy`` (runs per six legal balls)
+    and ``bowling_average``.
+    """
+    if unit not in UNITS:
+        raise ValueError(f'unit must be one of {UNITS}, got {unit!r}')
+    df = _with_dates(deliveries, dates)
+    extras_type = df['extras_type']
+    conceded = df['runs_total'] - np.where(extras_type.isin(BOWLER_EXTRAS), df['runs_extras'], 0)
+    dismissal = df['dismissal']
+    frame = pd.DataFrame({
+        'bowler': df['bowler'],
+        'match_id': df['match_id'],
+        'date': df['date'],
+        'runs': conceded,
+        'balls': (~extras_type.isin(('wides', 'noballs'))).astype('int64'),
+        'wickets': (dismissal.notna() & ~dismissal.isin(NOT_BOWLER_WICKETS)).astype('int64'),
+        'first_row': np.arange(len(df)),
+    })
+    keys = ['bowler', 'match_id']
+    if unit == 'over':
+        frame['inning'] = df['inning']
+        frame['over'] = df['over']
+        keys += ['inning', 'over']
+    units = frame.groupby(keys, sort=False, observed=True).agg(
+        date=('date', 'first'), first_row=('first_row', 'first'),
+        runs=('runs', 'sum'), balls=('balls', 'sum'), wickets=('wickets', 'sum'),
+    )
+    form = _rolling_table(units, 'bowler', window, ['runs', 'balls', 'wickets'])
+    form['economy'] = _ratio(form['window_runs'], form['window_balls'], 6.0)
+    form['bowling_average'] = _ratio(form['window_runs'], form['window_wickets'])
+    return form
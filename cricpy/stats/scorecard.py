@@ -0,0 +1,316 @@
+"""
+Batch scorecards for many matches at once.
+
+Instead of parsing and summarising match by match, ``scorecards`` takes the
+deliveries of any number of matches in one frame (``corpus.to_pandas()``,
+concatenated ``iter_chunks`` output, ...) and builds every card with one
+groupby per table, keyed by ``match_id`` and ``inning``:
+
+    innings          total, wickets, overs and extras per innings
+    batting          runs, balls, fours, sixes, strike rate and dismissal per batter
+    bowling          overs, maidens, runs, wickets, wides, no-balls, economy per bowler
+    extras           runs per extras kind per innings
+    fall_of_wickets  score, over and player for each wicket
+    results          result line per match (needs match metadata)
+
+Cards are written as one Parquet file per table (``write_parquet``) or as
+one JSON document per match (``write_json``).
+
+    cards = corpus_scorecards(open_corpus('corpus/'))
+    write_json(cards, 'site/scorecards/')
+"""
+import json
+import os
+from collections import defaultdict, namedtuple
+
+import numpy as np
+import pandas as pd
+
+from cricpy._optional import import_optional
+from cricpy.parsers.cricsheet_parser import EXTRAS_KINDS
+from cricpy.stats.rolling import BOWLER_EXTRAS, NOT_BOWLER_WICKETS, NOT_WICKETS
+
+RESULT_COLUMNS = [
+    'match_id', 'date', 'team1', 'team2', 'venue', 'toss_winner', 'toss_decision',
+    'winner', 'result', 'win_by_runs', 'win_by_wickets',
+]
+
+Scorecards = namedtuple(
+    'Scorecards', ['innings', 'batting', 'bowling', 'extras', 'fall_of_wickets', 'results'],
+)
+
+_KEYS = ['match_id', 'inning']
+
+
+def _overs(balls):
+    """
+    Render legal ball counts in cricket notation (23 -> '3.5').
+    """
+    balls = np.asarray(balls, dtype=np.int64)
+    overs = pd.Series(balls // 6).astype(str)
+    return overs.str.cat(pd.Series(balls % 6).astype(str), sep='.').values
+
+
+def _ratio(numerator, denominator, scale=1.0):
+    numerator = np.asarray(numerator, dtype=float)
+    denominator = np.asarray(denominator, dtype=float)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(denominator > 0, scale * numerator / denominator, np.nan)
+
+
+def _delivery_flags(deliveries):
+    """
+    One frame with the per-delivery quantities every card is summed from.
+    """
+    df = deliveries
+    extras_type = df['extras_type']
+    dismissal = df['dismissal']
+    is_wicket = dismissal.notna() & ~dismissal.isin(NOT_WICKETS)
+    if 'over' in df.columns:
+        over, ball_in_over = df['over'].to_numpy(), df['ball_in_over'].to_numpy()
+    else:
+        over = np.floor(df['ball'].to_numpy()).astype(np.int64)
+        ball_in_over = np.rint((df['ball'].to_numpy() - over) * 10).astype(np.int64)
+    runs_total = df['runs_total'].to_numpy()
+    if all(f'extras_{kind}' in df.columns for kind in EXTRAS_KINDS):
+        # per-kind runs (schema='full') also cover deliveries with several kinds
+        extras = {kind: df[f'extras_{kind}'].fillna(0).to_numpy().astype(np.int64)
+                  for kind in EXTRAS_KINDS}
+        conceded = runs_total - sum(extras[kind] for kind in BOWLER_EXTRAS)
+        wide, noball = extras['wides'] > 0, extras['noballs'] > 0
+    else:
+        extras = {kind: np.where(extras_type == kind, df['runs_extras'], 0)
+                  for kind in EXTRAS_KINDS}
+        charged = ~extras_type.isin(BOWLER_EXTRAS)
+        conceded = np.where(charged, runs_total, runs_total - df['runs_extras'])
+        wide = (extras_type == 'wides').to_numpy()
+        noball = (extras_type == 'noballs').to_numpy()
+    flags = pd.DataFrame({
+        'match_id': df['match_id'],
+        'inning': df['inning'],
+        'batting_team': df['batting_team'],
+        'batsman': df['batsman'],
+        'bowler': df['bowler'],
+        'row': np.arange(len(df)),
+        'over': over,
+        'ball_in_over': ball_in_over,
+        'runs_total': runs_total,
+        'runs_batter': df['runs_batter'].to_numpy(),
+        'runs_extras': df['runs_extras'].to_numpy(),
+        'conceded': conceded,
+        'batter_ball': (~wide).astype(np.int64),
+        'legal_ball': (~(wide | noball)).astype(np.int64),
+        'four': (df['runs_batter'] == 4).to_numpy().astype(np.int64),
+        'six': (df['runs_batter'] == 6).to_numpy().astype(np.int64),
+        'wicket': is_wicket.to_numpy().astype(np.int64),
+        'bowler_wicket': ((is_wicket & ~dismissal.isin(NOT_BOWLER_WICKETS))
+                          .to_numpy().astype(np.int64)),
+    })
+    for kind in EXTRAS_KINDS:
+        flags[kind] = extras[kind]
+    flags['wide_balls'] = wide.astype(np.int64)
+    flags['noball_balls'] = noball.astype(np.int64)
+    return flags
+
+
+def _innings_card(flags):
+    card = flags.groupby(_KEYS, sort=False, observed=True).agg(
+        batting_team=('batting_team', 'first'), first_row=('row', 'first'),
+        runs=('runs_total', 'sum'), wickets=('wicket', 'sum'),
+        balls=('legal_ball', 'sum'), extras=('runs_extras', 'sum'),
+    ).reset_index()
+    card['overs'] = _overs(card['balls'])
+    card['run_rate'] = _ratio(card['runs'], card['balls'], 6.0)
+    return card.sort_values('first_row', kind='stable').drop(columns='first_row')
+
+
+def _dismissals(deliveries, flags):
+    """
+    The wicket deliveries, with the player out, how and by whom.
+    """
+    out = np.asarray(deliveries['batsman'], dtype=object)
+    if 'player_out' in deliveries.columns:
+        player_out = np.asarray(deliveries['player_out'], dtype=object)
+        out = np.where(pd.isna(player_out), out, player_out)
+    wickets = flags.loc[flags['wicket'] == 1, _KEYS + ['row', 'bowler', 'bowler_wicket']]
+    rows = wickets['row'].to_numpy()
+    return pd.DataFrame({
+        'match_id': np.asarray(wickets['match_id'], dtype=object),
+        'inning': np.asarray(wickets['inning'], dtype=object),
+        'player': out[rows],
+        'row': rows,
+        'how_out': np.asarray(deliveries['dismissal'], dtype=object)[rows],
+        'dismissed_by': np.where(wickets['bowler_wicket'].to_numpy() == 1,
+                                 np.asarray(wickets['bowler'], dtype=object), None),
+        'fielder': np.asarray(deliveries['fielder'], dtype=object)[rows],
+    })
+
+
+def _batting_card(flags, dismissals):
+    card = flags.groupby(_KEYS + ['batsman'], sort=False, observed=True).agg(
+        first_row=('row', 'first'), runs=('runs_batter', 'sum'), balls=('batter_ball', 'sum'),
+        fours=('four', 'sum'), sixes=('six', 'sum'),
+    ).reset_index().rename(columns={'batsman': 'player'})
+    for column in ('match_id', 'inning', 'player'):
+        card[column] = card[column].astype(object)
+    card = card.merge(dismissals, on=_KEYS + ['player'], how='outer')
+    card['first_row'] = card[['first_row', 'row']].min(axis=1)
+    for column in ('runs', 'balls', 'fours', 'sixes'):
+        card[column] = card[column].fillna(0).astype(np.int64)
+    card['out'] = card['how_out'].notna()
+    card['strike_rate'] = _ratio(card['runs'], card['balls'], 100.0)
+    card = card.sort_values('first_row', kind='stable').drop(columns=['first_row', 'row'])
+    return card[_KEYS + ['player', 'runs', 'balls', 'fours', 'sixes', 'strike_rate',
+                         'out', 'how_out', 'dismissed_by', 'fielder']].reset_index(drop=True)
+
+
+def _bowling_card(flags):
+    by = _KEYS + ['bowler']
+    overs = flags.groupby(by + ['over'], sort=False, observed=True).agg(
+        balls=('legal_ball', 'sum'), runs=('conceded', 'sum'))
+    maidens = ((overs['balls'] >= 6) & (overs['runs'] == 0)).groupby(level=by, sort=False).sum()
+    card = flags.groupby(by, sort=False, observed=True).agg(
+        first_row=('row', 'first'), balls=('legal_ball', 'sum'), runs=('conceded', 'sum'),
+        wickets=('bowler_wicket', 'sum'), wides=('wide_balls', 'sum'),
+        noballs=('noball_balls', 'sum'),
+    )
+    card['maidens'] = maidens.reindex(card.index).fillna(0).astype(np.int64).values
+    card = card.reset_index().rename(columns={'bowler': 'player'})
+    card['overs'] = _overs(card['balls'])
+    card['economy'] = _ratio(card['runs'], card['balls'], 6.0)
+    card = card.sort_values('first_row', kind='stable').drop(columns='first_row')
+    return card[_KEYS + ['player', 'overs', 'balls', 'maidens', 'runs', 'wickets', 'economy',
+                         'wides', 'noballs']].reset_index(drop=True)
+
+
+def _extras_card(flags):
+    card = flags.groupby(_KEYS, sort=False, observed=True).agg(
+        first_row=('row', 'first'), **{kind: (kind, 'sum') for kind in EXTRAS_KINDS})
+    card['total'] = card[list(EXTRAS_KINDS)].sum(axis=1)
+    return card.reset_index().sort_values('first_row', kind='stable').drop(columns='first_row')
+
+
+def _fall_of_wickets(flags, dismissals):
+    score = flags.groupby(_KEYS, sort=False, observed=True)['runs_total'].cumsum().to_numpy()
+    fow = dismissals[_KEYS + ['player', 'row']].copy()
+    fow['wicket'] = fow.groupby(_KEYS, sort=False, observed=True).cumcount() + 1
+    rows = fow['row'].to_numpy()
+    fow['score'] = score[rows]
+    fow['over'] = (pd.Series(flags['over'].to_numpy()[rows]).astype(str) + '.'
+                   + pd.Series(flags['ball_in_over'].to_numpy()[rows]).astype(str)).values
+    return fow[_KEYS + ['wicket', 'score', 'over', 'player']].reset_index(drop=True)
+
+
+def _results(matches):
+    results = pd.DataFrame({c: matches[c] if c in matches.columns else None
+                            for c in RESULT_COLUMNS})
+    winner = results['winner'].astype(object)
+    runs = pd.to_numeric(results['win_by_runs'], errors='coerce')
+    wickets = pd.to_numeric(results['win_by_wickets'], errors='coerce')
+    margin = np.where(runs.notna(), ' won by ' + runs.fillna(0).astype(int).astype(str) + ' runs',
+                      np.where(wickets.notna(),
+                               ' won by ' + wickets.fillna(0).astype(int).astype(str) + ' wickets',
+                               ' won'))
+    result = results['result'].astype(object)
+    summary = np.where(winner.notna(), winner.astype(str) + margin,
+                       result.where(result.notna(), 'no result'))
+    results['summary'] = summary
+    return results.reset_index(drop=True)
+
+
+def scorecards(deliveries, matches=None):
+    """
+    Build the scorecards of every match in ``deliveries``.
+
+    ``deliveries`` needs ``match_id`` and the ``parse_match`` columns, in
+    match and delivery order. With ``schema='full'`` columns, ``player_out``
+    credits run-outs of the non-striker correctly and the ``extras_<kind>``
+    runs charge deliveries with several extras kinds (a no-ball and byes)
+    correctly. ``matches`` is the match
+    metadata (``corpus.matches`` or ``parse_info`` records with
+    ``match_id``) for the results table. Returns a Scorecards tuple of
+    DataFrames.
+    """
+    deliveries = deliveries.reset_index(drop=True)
+    flags = _delivery_flags(deliveries)
+    dismissals = _dismissals(deliveries, flags)
+    results = None
+    if matches is not None:
+        results = _results(pd.DataFrame(matches))
+    return Scorecards(
+        innings=_innings_card(flags),
+        batting=_batting_card(flags, dismissals),
+        bowling=_bowling_card(flags),
+        extras=_extras_card(flags),
+        fall_of_wickets=_fall_of_wickets(flags, dismissals),
+        results=results,
+    )
+
+
+def corpus_scorecards(corpus):
+    """
+    Build the scorecards of every match in a corpus, using its wickets table
+    for the player out and its match table for results.
+    """
+    deliveries = corpus.to_pandas()
+    wickets = corpus.table('wickets')
+    first = wickets[wickets['wicket_number'] == 1]
+    player_out = np.full(len(deliveries), None, dtype=object)
+    player_out[first['row'].to_numpy()] = first['player_out'].astype(object).to_numpy()
+    deliveries['player_out'] = player_out
+    return scorecards(deliveries, corpus.matches)
+
+
+def write_parquet(cards, path):
+    """
+    Write each scorecard table to ``<path>/<table>.parquet``.
+    """
+    import_optional('pyarrow', extra='parquet', feature='Parquet scorecards')
+    os.makedirs(path, exist_ok=True)
+    for name, table in cards._asdict().items():
+        if table is not None:
+            table.to_parquet(os.path.join(path, f'{name}.parquet'), index=False)
+
+
+def _records(table):
+    """
+    JSON-ready row dicts (None for missing values).
+    """
+    table = table.astype(object).where(table.notna(), None)
+    return table.to_dict('records')
+
+
+def write_json(cards, path):
+    """
+    Write one ``<path>/<match_id>.json`` document per match, holding its
+    result and, per innings, the batting, bowling, extras and fall of
+    wickets. Returns the number of files written.
+    """
+    os.makedirs(path, exist_ok=True)
+    documents = {}
+    for record in _records(cards.innings):
+        match_id = str(record.pop('match_id'))
+        document = documents.setdefault(match_id, {'match_id': match_id, 'innings': []})
+        document['innings'].append(dict(record, batting=[], bowling=[], extras=None,
+                                        fall_of_wickets=[]))
+
+    index = defaultdict(dict)
+    for document in documents.values():
+        for innings in document['innings']:
+            index[document['match_id']][innings['inning']] = innings
+    for name in ('batting', 'bowling', 'fall_of_wickets'):
+        for record in _records(getattr(cards, name)):
+            innings = index[str(record.pop('match_id'))][record.pop('inning')]
+            innings[name].append(record)
+    for record in _records(cards.extras):
+        index[str(record.pop('match_id'))][record.pop('inning')]['extras'] = record
+    if cards.results is not None:
+        for record in _records(cards.results):
+            document = documents.get(str(record['match_id']))
+            if document is not None:
+                document['result'] = {k: v for k, v in record.items() if k != 'match_id'}
+
+    for match_id, document in documents.items():
+        with open(os.path.join(path, f'{match_id}.json'), 'w', encoding='utf-8') as f:
+            json.dump(document, f, ensure_ascii=False, default=str)
+    return len(documents)
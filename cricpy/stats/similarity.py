@@ -0,0 +1,278 @@
+"""
+Similarity search over batting profiles.
+
+``batting_features`` reduces deliveries to one row of profile features per
+batter with a single groupby:
+
+    <phase>_strike_rate     runs per 100 balls in the phase
+    <phase>_boundary_pct    share of balls hit for four or six
+    <phase>_dot_pct         share of balls scored off without a run
+    <phase>_balls_share     share of the batter's balls faced in the phase
+    dismissal_<kind>        share of dismissals that were caught, bowled, ...
+    balls_per_dismissal
+
+PlayerSimilarity standardises the features and scales every row to unit
+length, so the cosine similarity of one player to all others is a single
+matrix-vector product and the top k come from ``argpartition``. Restricting
+a query to one phase uses that phase's columns of the same matrix. The raw
+features are cached as an ``.npz`` file and rebuilt when the corpus changes.
+
+    sim = PlayerSimilarity.build(open_corpus('t20_corpus/'), cache='batting.npz')
+    sim.most_similar('AB de Villiers', k=10, phase='death')
+"""
+import os
+
+import numpy as np
+import pandas as pd
+
+from cricpy.io.corpus import MANIFEST
+from cricpy.stats.venues import PHASE_NAMES, PHASES
+
+CACHE_VERSION = 2
+DISMISSAL_KINDS = ('caught', 'bowled', 'lbw', 'run out', 'stumped')
+NOT_DISMISSALS = ('retired hurt', 'retired not out')
+_COLUMNS = ['batsman', 'over', 'runs_batter', 'extras_type', 'dismissal']
+
+
+def _ratio(numerator, denominator, scale=1.0):
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(denominator > 0, scale * numerator / denominator, np.nan)
+
+
+def batting_features(deliveries, phases=PHASES['T20'], min_balls=60):
+    """
+    Return the profile features of every batter who faced at least
+    ``min_balls`` balls, indexed by name, plus a ``balls`` column.
+
+    ``phases`` are the (start, stop) over ranges of the powerplay, middle
+    and death phases (default: T20); deliveries outside them count towards
+    the dismissal features only. Dismissals are credited to ``player_out``
+    when the deliveries have that column (the full schema) and to the
+    striker otherwise.
+    """
+    over = np.asarray(deliveries['over'], dtype=np.int64)
+    phase = np.full(len(over), -1, dtype=np.int64)
+    for i, (start, stop) in enumerate(phases):
+        phase[(over >= start) & (over < stop)] = i
+    runs = np.asarray(deliveries['runs_batter'], dtype=np.int64)
+    faced = np.asarray(deliveries['extras_type'].astype(object) != 'wides', dtype=np.int64)
+    dismissal = deliveries['dismissal'].astype(object)
+    out = np.asarray(dismissal.notna() & ~dismissal.isin(NOT_DISMISSALS))
+    batsman = np.asarray(deliveries['batsman'].astype(object))
+
+    frame = pd.DataFrame({
+        'batsman': batsman,
+        'phase': phase,
+        'balls': faced,
+        'runs': runs * faced,
+        'boundaries': ((runs == 4) | (runs == 6)) * faced,
+        'dots': (runs == 0) * faced,
+    })
+    frame = frame[frame['batsman'].notna()]
+
+    player_out = batsman[out]
+    if 'player_out' in deliveries.columns:
+        named = np.asarray(deliveries['player_out'].astype(object))[out]
+        player_out = np.where(pd.isna(named), player_out, named)
+    kinds = np.asarray(dismissal)[out]
+    dismissals = pd.DataFrame({'batsman': player_out, 'outs': 1})
+    for kind in DISMISSAL_KINDS:
+        dismissals[kind] = np.asarray(kinds == kind, dtype=np.int64)
+    dismissals = dismissals[dismissals['batsman'].notna()]
+
+    by_phase = frame[frame['phase'] >= 0].groupby(['batsman', 'phase'])[
+        ['balls', 'runs', 'boundaries', 'dots']].sum().unstack('phase', fill_value=0)
+    totals = frame.groupby('batsman')[['balls']].sum()
+    totals = totals[totals['balls'] >= min_balls]
+    totals = totals.join(dismissals.groupby('batsman').sum()).fillna(0)
+    by_phase = by_phase.reindex(totals.index, fill_value=0)
+
+    balls = totals['balls'].to_numpy(dtype=float)
+    outs = totals['outs'].to_numpy(dtype=float)
+    features = {}
+    for i, name in enumerate(PHASE_NAMES[:len(phases)]):
+        sums = {column: (by_phase[(column, i)].to_numpy(dtype=float) if (column, i) in by_phase
+                         else np.zeros(len(totals)))
+                for column in ('balls', 'runs', 'boundaries', 'dots')}
+        features[f'{name}_strike_rate'] = _ratio(sums['runs'], sums['balls'], 100.0)
+        features[f'{name}_boundary_pct'] = _ratio(sums['boundaries'], sums['balls'])
+        features[f'{name}_dot_pct'] = _ratio(sums['dots'], sums['balls'])
+        features[f'{name}_balls_share'] = _ratio(sums['balls'], balls)
+    named = 0.0
+    for kind in DISMISSAL_KINDS:
+        share = _ratio(totals[kind].to_numpy(dtype=float), outs)
+        features[f"dismissal_{kind.replace(' ', '_')}"] = share
+        named = named + np.nan_to_num(share)
+    features['dismissal_other'] = np.where(outs > 0, 1.0 - named, np.nan)
+    features['balls_per_dismissal'] = _ratio(balls, outs)
+    result = pd.DataFrame(features, index=totals.index)
+    result['balls'] = totals['balls'].astype(np.int64)
+    result.index.name = 'batsman'
+    return result
+
+
+def _unit_rows(values):
+    """
+    Standardise columns (missing values become the column mean) and scale
+    rows to unit length.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    with np.errstate(invalid='ignore'):
+        mean = np.nanmean(values, axis=0)
+        std = np.nanstd(values, axis=0)
+    mean = np.nan_to_num(mean)
+    std = np.where(np.nan_to_num(std) > 0, std, 1.0)
+    scaled = np.nan_to_num((values - mean) / std)
+    norms = np.linalg.norm(scaled, axis=1, keepdims=True)
+    return (scaled / np.where(norms > 0, norms, 1.0)).astype(np.float32)
+
+
+def _corpus_deliveries(corpus):
+    """
+    The columns ``batting_features`` needs from a corpus, with
+    ``player_out`` taken from its wickets table.
+    """
+    deliveries = corpus.to_pandas(_COLUMNS)
+    player_out = np.full(len(deliveries), None, dtype=object)
+    wickets = corpus.table('wickets')
+    first = wickets[wickets['wicket_number'] == 1]
+    player_out[first['row'].to_numpy()] = np.asarray(first['player_out'].astype(object))
+    deliveries['player_out'] = player_out
+    return deliveries
+
+
+class PlayerSimilarity:
+    """
+    Cosine-similarity index over a table of player features.
+    """
+
+    def __init__(self, features):
+        self.features = features
+        self.players = features.index
+        self.columns = [c for c in features.columns if c != 'balls']
+        self._positions = pd.Series(np.arange(len(features)), index=features.index)
+        self._matrices = {}
+
+    def __len__(self):
+        return len(self.features)
+
+    def _columns_for(self, phase):
+        if phase is None:
+            return self.columns
+        columns = [c for c in self.columns if c.startswith(f'{phase}_')]
+        if not columns:
+            raise ValueError(f'unknown phase {phase!r}')
+        return columns
+
+    def matrix(self, phase=None):
+        """
+        The normalised (players x features) float32 matrix, for all features
+        or one phase's; computed once per phase.
+        """
+        matrix = self._matrices.get(phase)
+        if matrix is None:
+            matrix = self._matrices[phase] = _unit_rows(self.features[self._columns_for(phase)])
+        return matrix
+
+    def most_similar(self, player, k=10, phase=None):
+        """
+        Return the ``k`` players most similar to ``player`` (excluding the
+        player), as a DataFrame of similarity and balls faced.
+        """
+        if player not in self._positions.index:
+            raise KeyError(player)
+        matrix = self.matrix(phase)
+        i = self._positions[player]
+        scores = matrix @ matrix[i]
+        scores[i] = -np.inf
+        k = min(k, len(scores) - 1)
+        if k <= 0:
+            return pd.DataFrame({'similarity': [], 'balls': []})
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top], kind='stable')]
+        return pd.DataFrame({
+            'similarity': scores[top],
+            'balls': self.features['balls'].to_numpy()[top],
+        }, index=self.players[top])
+
+    def neighbours(self, k=10, phase=None, block=4096):
+        """
+        Return ``(indices, scores)``, two (players x k) arrays holding every
+        player's ``k`` nearest neighbours, best first, computed in blocks of
+        ``block`` rows of the similarity matrix.
+        """
+        matrix = self.matrix(phase)
+        n = len(matrix)
+        k = min(k, n - 1)
+        indices = np.empty((n, k), dtype=np.int64)
+        scores = np.empty((n, k), dtype=np.float32)
+        for start in range(0, n, block):
+            rows = np.arange(start, min(start + block, n))
+            sims = matrix[rows] @ matrix.T
+            sims[np.arange(len(rows)), rows] = -np.inf
+            top = np.argpartition(-sims, k - 1, axis=1)[:, :k]
+            top_scores = np.take_along_axis(sims, top, axis=1)
+            order = np.argsort(-top_scores, axis=1, kind='stable')
+            indices[rows] = np.take_along_axis(top, order, axis=1)
+            scores[rows] = np.take_along_axis(top_scores, order, axis=1)
+        return indices, scores
+
+    def save(self, path, source_key=''):
+        """
+        Write the raw features to an ``.npz`` file.
+        """
+        tmp = f'{path}.tmp.npz'
+        np.savez(
+            tmp,
+            version=np.array(CACHE_VERSION),
+            source_key=np.array(source_key),
+            players=np.array(self.players, dtype=str),
+            columns=np.array(list(self.features.columns), dtype=str),
+            values=self.features.to_numpy(dtype=np.float64),
+        )
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path, source_key=None):
+        """
+        Read features written by ``save``; returns None when the file is
+        missing, from another version, or (with ``source_key``) built from
+        other data.
+        """
+        if not os.path.exists(path):
+            return None
+        with np.load(path, allow_pickle=False) as data:
+            if int(data['version']) != CACHE_VERSION:
+                return None
+            if source_key is not None and str(data['source_key']) != source_key:
+                return None
+            features = pd.DataFrame(data['values'], columns=list(data['columns']),
+                                    index=pd.Index(list(data['players']), name='batsman'))
+        features['balls'] = features['balls'].astype(np.int64)
+        return cls(features)
+
+    @classmethod
+    def build(cls, source, cache=None, phases=PHASES['T20'], min_balls=60):
+        """
+        Build the index from a Corpus or a deliveries DataFrame, reusing
+        ``cache`` when it was built with the same settings from the same
+        corpus (same size and manifest time). A DataFrame source is only
+        identified by its length, so give each frame its own cache file.
+        """
+        key = None
+        if cache is not None:
+            key = f'{phases}|{min_balls}'
+            if hasattr(source, 'manifest'):
+                manifest_time = os.path.getmtime(os.path.join(source.path, MANIFEST))
+                key += (f"|{source.manifest['n_deliveries']}|{source.manifest['n_matches']}"
+                        f'|{manifest_time}')
+            else:
+                key += f'|{len(source)}'
+            cached = cls.load(cache, key)
+            if cached is not None:
+                return cached
+        deliveries = _corpus_deliveries(source) if hasattr(source, 'to_pandas') else source
+        index = cls(batting_features(deliveries, phases, min_balls))
+        if cache is not None:
+            index.save(cache, key)
+        return index
@@ -0,0 +1,237 @@
+"""
+Venue and conditions index with precomputed par scores.
+
+A VenueIndex keeps a handful of integer counters per (venue, match type),
+updated one match at a time, so it can be filled during the ingest pass
+(``build_corpus(..., venues=index)``) and extended later with new matches
+without revisiting old ones. The counters give:
+
+    par score            average first-innings total (and its spread)
+    chase success        share of decided matches won by the side batting second
+    toss outcomes        how often the toss winner bats first, and how often it
+                         then wins, per decision
+    phase run rates      runs per over in the powerplay, middle and death overs
+                         (T20 and ODI formats)
+
+The index is saved as a small JSON file and ``par_score`` is a dict lookup.
+
+    index = VenueIndex.load('venues.json')      # empty if the file is missing
+    for match_id, match in iter_matches('new_matches/'):
+        index.add(match_id, match)
+    index.save('venues.json')
+    index.par_score('Wankhede Stadium', 'T20')
+"""
+import json
+import math
+import os
+
+import pandas as pd
+
+from cricpy.parsers.cricsheet_parser import delivery_columns
+
+FORMAT_VERSION = 1
+PHASE_NAMES = ('powerplay', 'middle', 'death')
+PHASES = {
+    'T20': ((0, 6), (6, 15), (15, 20)),
+    'IT20': ((0, 6), (6, 15), (15, 20)),
+    'ODI': ((0, 10), (10, 40), (40, 50)),
+    'ODM': ((0, 10), (10, 40), (40, 50)),
+}
+COUNTERS = [
+    'matches', 'first_innings', 'first_innings_runs', 'first_innings_runs_sq',
+    'decided', 'chases_won', 'toss_bat', 'toss_bat_won', 'toss_field', 'toss_field_won',
+] + [f'{phase}_{kind}' for phase in PHASE_NAMES for kind in ('runs', 'balls')]
+
+
+def _innings_totals(columns):
+    """
+    (batting_team, runs) of the first two innings, in order.
+    """
+    totals = []
+    index = {}
+    for inning, team, runs in zip(columns['inning'], columns['batting_team'],
+                                  columns['runs_total']):
+        position = index.get(inning)
+        if position is None:
+            if len(totals) == 2:
+                break
+            position = index[inning] = len(totals)
+            totals.append([team, 0])
+        totals[position][1] += runs
+    return totals
+
+
+def _phase_of(phases, over):
+    for i, (start, stop) in enumerate(phases):
+        if start <= over < stop:
+            return i
+    return None
+
+
+class VenueIndex:
+    """
+    Incrementally updated per-venue, per-format aggregates.
+    """
+
+    def __init__(self):
+        self._counters = {}
+        self._match_ids = set()
+
+    def __len__(self):
+        return len(self._match_ids)
+
+    def __contains__(self, match_id):
+        return str(match_id) in self._match_ids
+
+    def _row(self, venue, match_type):
+        key = (venue, match_type)
+        row = self._counters.get(key)
+        if row is None:
+            row = self._counters[key] = dict.fromkeys(COUNTERS, 0)
+        return row
+
+    def add(self, match_id, match_dict, columns=None):
+        """
+        Add one match; returns False (and changes nothing) if ``match_id``
+        is already indexed. ``columns`` may pass the match's
+        ``delivery_columns`` when the caller has already built them.
+        """
+        match_id = str(match_id)
+        if match_id in self._match_ids:
+            return False
+        self._match_ids.add(match_id)
+        info = match_dict.get('info') or {}
+        venue = info.get('venue')
+        if venue is None:
+            return True
+        match_type = info.get('match_type')
+        row = self._row(venue, match_type)
+        row['matches'] += 1
+        if columns is None:
+            columns = delivery_columns(match_dict)
+
+        totals = _innings_totals(columns)
+        if totals:
+            runs = totals[0][1]
+            row['first_innings'] += 1
+            row['first_innings_runs'] += runs
+            row['first_innings_runs_sq'] += runs * runs
+
+        outcome = info.get('outcome') or {}
+        winner = outcome.get('winner')
+        if winner is not None and len(totals) == 2:
+            row['decided'] += 1
+            row['chases_won'] += int(winner == totals[1][0])
+
+        toss = info.get('toss') or {}
+        decision = toss.get('decision')
+        if decision in ('bat', 'field'):
+            row[f'toss_{decision}'] += 1
+            if winner is not None and winner == toss.get('winner'):
+                row[f'toss_{decision}_won'] += 1
+
+        phases = PHASES.get(match_type)
+        if phases:
+            for over, runs, extras_type in zip(columns['over'], columns['runs_total'],
+                                               columns['extras_type']):
+                phase = _phase_of(phases, over)
+                if phase is None:
+                    continue
+                name = PHASE_NAMES[phase]
+                row[f'{name}_runs'] += runs
+                if extras_type not in ('wides', 'noballs'):
+                    row[f'{name}_balls'] += 1
+        return True
+
+    def merge(self, other):
+        """
+        Fold an index built from other matches (e.g. another shard) into
+        this one; raises ValueError if the two share any match.
+        """
+        overlap = self._match_ids & other._match_ids
+        if overlap:
+            raise ValueError(f'{len(overlap)} matches are in both indexes')
+        self._match_ids |= other._match_ids
+        for key, counters in other._counters.items():
+            row = self._row(*key)
+            for name, value in counters.items():
+                row[name] += value
+        return self
+
+    def par_score(self, venue, match_type):
+        """
+        Average first-innings total at a venue in a format, or None if unknown.
+        """
+        row = self._counters.get((venue, match_type))
+        if not row or not row['first_innings']:
+            return None
+        return row['first_innings_runs'] / row['first_innings']
+
+    def summary(self):
+        """
+        Return one row per (venue, match_type) with the derived metrics.
+        """
+        records = []
+        for (venue, match_type), c in self._counters.items():
+            n = c['first_innings']
+            mean = c['first_innings_runs'] / n if n else math.nan
+            variance = c['first_innings_runs_sq'] / n - mean * mean if n else math.nan
+            tosses = c['toss_bat'] + c['toss_field']
+            record = {
+                'venue': venue,
+                'match_type': match_type,
+                'matches': c['matches'],
+                'par_score': mean,
+                'first_innings_std': math.sqrt(max(variance, 0.0)) if n else math.nan,
+                'chase_success_rate': c['chases_won'] / c['decided'] if c['decided'] else math.nan,
+                'toss_bat_rate': c['toss_bat'] / tosses if tosses else math.nan,
+                'toss_bat_win_rate': (c['toss_bat_won'] / c['toss_bat']
+                                      if c['toss_bat'] else math.nan),
+                'toss_field_win_rate': (c['toss_field_won'] / c['toss_field']
+                                        if c['toss_field'] else math.nan),
+            }
+            for phase in PHASE_NAMES:
+                balls = c[f'{phase}_balls']
+                record[f'{phase}_run_rate'] = (6.0 * c[f'{phase}_runs'] / balls
+                                               if balls else math.nan)
+            records.append(record)
+        columns = ['venue', 'match_type', 'matches', 'par_score', 'first_innings_std',
+                   'chase_success_rate', 'toss_bat_rate', 'toss_bat_win_rate',
+                   'toss_field_win_rate'] + [f'{phase}_run_rate' for phase in PHASE_NAMES]
+        return pd.DataFrame(records, columns=columns).sort_values(
+            ['venue', 'match_type'], key=lambda s: s.astype(str)).reset_index(drop=True)
+
+    def save(self, path):
+        """
+        Write the index as JSON, atomically replacing ``path``.
+        """
+        data = {
+            'version': FORMAT_VERSION,
+            'counters': COUNTERS,
+            'match_ids': sorted(self._match_ids),
+            'venues': [[venue, match_type] + [c[name] for name in COUNTERS]
+                       for (venue, match_type), c in self._counters.items()],
+        }
+        tmp = f'{path}.tmp'
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, separators=(',', ':'))
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path):
+        """
+        Read an index written by ``save``; a missing file gives an empty index.
+        """
+        index = cls()
+        if not os.path.exists(path):
+            return index
+        with open(path, encoding='utf-8') as f:
+            data = json.load(f)
+        if data.get('version') != FORMAT_VERSION:
+            raise ValueError(f"unsupported venue index version: {data.get('version')}")
+        names = data['counters']
+        index._match_ids = set(data['match_ids'])
+        for entry in data['venues']:
+            row = index._row(entry[0], entry[1])
+            row.update(zip(names, entry[2:]))
+        return index
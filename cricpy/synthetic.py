@@ -0,0 +1,565 @@
+"""
+Seedable generator of synthetic Cricsheet matches and corpora.
+
+Matches are played ball by ball from per-format outcome probabilities:
+strike rotation, bowlers' over limits, wides, no-balls, byes and leg
+byes, wickets of every common kind with fielders, chases that stop at the
+target, and Test matches of up to four innings that can end in a draw or an
+innings win. Squads are fixed per team and every player and umpire is in
+the match's registry, so player-level analysis behaves as on real data.
+
+Every match is generated from its own ``random.Random`` seeded with
+``(seed, index)``, so a corpus is reproduced exactly by its seed and any
+match can be regenerated on its own, in any order or process.
+
+    from cricpy.synthetic import iter_synthetic_matches, write_synthetic_corpus
+
+    for match_id, match in iter_synthetic_matches(100, seed=7, formats=('T20', 'ODI')):
+        ...
+    write_synthetic_corpus('synthetic/', 10000, seed=7)                     # YAML files
+    write_synthetic_corpus('synthetic.zip', 10000, seed=7, file_format='zip')
+
+Match dictionaries come in the YAML layout (``layout='yaml'``, with BallKey
+ball numbers and ``datetime.date`` dates, as ``load_yaml`` returns them) or
+the JSON layout (``layout='json'``), and the files written are exactly what
+``load_match`` reads back.
+"""
+import bisect
+import datetime
+import json
+import os
+import random
+import zipfile
+import zlib
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from itertools import accumulate
+
+from cricpy.io.file_loader import BallKey
+from cricpy.parsers.cricsheet_parser import _ordinal
+
+FormatSpec = namedtuple('FormatSpec', [
+    'match_type', 'overs', 'balls_per_over', 'innings', 'bowler_overs', 'death_over', 'event',
+    'teams', 'team_type',
+])
+
+_NATIONS = ('Australia', 'Bangladesh', 'England', 'India', 'New Zealand', 'Pakistan',
+            'South Africa', 'Sri Lanka', 'West Indies', 'Afghanistan', 'Ireland', 'Zimbabwe')
+_FRANCHISES = ('Chennai Super Kings', 'Delhi Capitals', 'Kolkata Knight Riders',
+               'Mumbai Indians', 'Punjab Kings', 'Rajasthan Royals',
+               'Royal Challengers Bangalore', 'Sunrisers Hyderabad', 'Perth Scorchers',
+               'Sydney Sixers', 'Melbourne Stars', 'Brisbane Heat')
+_HUNDRED_TEAMS = ('Birmingham Phoenix', 'London Spirit', 'Manchester Originals',
+                  'Northern Superchargers', 'Oval Invincibles', 'Southern Brave',
+                  'Trent Rockets', 'Welsh Fire')
+
+FORMATS = {
+    'T20': FormatSpec('T20', 20, 6, 2, 4, 15, 'Synthetic T20 League', _FRANCHISES, 'club'),
+    'ODI': FormatSpec('ODI', 50, 6, 2, 10, 40, 'Synthetic ODI Series', _NATIONS, 'international'),
+    'Test': FormatSpec('Test', None, 6, 4, None, None, 'Synthetic Test Series', _NATIONS,
+                       'international'),
+    # The Hundred is recorded by Cricsheet as T20 matches of 20 five-ball overs
+    'Hundred': FormatSpec('T20', 20, 5, 2, 4, 15, 'The Synthetic Hundred', _HUNDRED_TEAMS,
+                          'club'),
+}
+FILE_FORMATS = ('yaml', 'json', 'zip')
+LAYOUTS = ('yaml', 'json')
+
+# legal-ball outcomes: runs off the bat, or a wicket
+_OUTCOMES = (0, 1, 2, 3, 4, 6, 'W')
+_WEIGHTS = {
+    'T20': ((36, 38, 8, 0.5, 11, 3.5, 4.5), (28, 36, 10, 0.5, 13, 7, 7.5)),
+    'ODI': ((52, 30, 6, 0.5, 8, 1, 2.7), (34, 36, 10, 0.5, 10, 4, 5.5)),
+    'Test': ((70, 15, 3.5, 0.8, 7.5, 0.5, 1.8),) * 2,
+}
+_WEIGHTS['Hundred'] = _WEIGHTS['T20']
+# per delivery, before the outcome is drawn
+_EXTRAS = (('wides', 0.03), ('noballs', 0.004), ('legbyes', 0.012), ('byes', 0.004))
+_WICKET_KINDS = (('caught', 55), ('bowled', 17), ('lbw', 12), ('run out', 8), ('stumped', 4),
+                 ('caught and bowled', 3), ('hit wicket', 1))
+_INITIALS = 'ABCDGHJKMNPRSTVW'
+_SURNAMES = (
+    'Ahmed', 'Ali', 'Anderson', 'Bairstow', 'Boult', 'Broad', 'Buttler', 'Chahal', 'Cummins',
+    'Das', 'de Kock', 'Dhawan', 'Elgar', 'Fernando', 'Finch', 'Gill', 'Hasan', 'Hazlewood',
+    'Head', 'Holder', 'Iyer', 'Jadeja', 'Karunaratne', 'Khan', 'Kohli', 'Latham', 'Lyon',
+    'Markram', 'Mendis', 'Mohammad', 'Nortje', 'Pant', 'Patel', 'Perera', 'Rabada', 'Rahul',
+    'Rashid', 'Root', 'Shakib', 'Sharma', 'Singh', 'Smith', 'Southee', 'Starc', 'Stokes',
+    'Taylor', 'Thakur', 'Warner', 'Williamson', 'Wood', 'Yadav', 'Zampa',
+)
+_VENUES = (
+    ('Eden Gardens', 'Kolkata'), ('Wankhede Stadium', 'Mumbai'), ("Lord's", 'London'),
+    ('Melbourne Cricket Ground', 'Melbourne'), ('Sydney Cricket Ground', 'Sydney'),
+    ('Newlands', 'Cape Town'), ('Galle International Stadium', 'Galle'),
+    ('Basin Reserve', 'Wellington'), ('Kensington Oval', 'Bridgetown'),
+    ('Gaddafi Stadium', 'Lahore'), ('Shere Bangla National Stadium', 'Mirpur'),
+    ('Edgbaston', 'Birmingham'), ('Old Trafford', 'Manchester'), ('Headingley', 'Leeds'),
+)
+_SQUAD_SIZE = 15
+_TEST_OVERS = 450
+
+_OUTCOME_CUMULATIVE = {
+    name: tuple(list(accumulate(w)) for w in tables) for name, tables in _WEIGHTS.items()
+}
+_KIND_CUMULATIVE = list(accumulate(w for _, w in _WICKET_KINDS))
+_KINDS = [kind for kind, _ in _WICKET_KINDS]
+
+
+@lru_cache(maxsize=None)
+def squad(team):
+    """
+    The fixed squad of a team: ``_SQUAD_SIZE`` distinct names in batting
+    order, the same in every match and every run.
+    """
+    rng = random.Random(zlib.crc32(team.encode('utf-8')))
+    names = []
+    while len(names) < _SQUAD_SIZE:
+        name = f'{rng.choice(_INITIALS)} {rng.choice(_SURNAMES)}'
+        if name not in names:
+            names.append(name)
+    return tuple(names)
+
+
+def _person_id(name):
+    return f'{zlib.crc32(name.encode("utf-8")):08x}'
+
+
+def _draw(rng, cumulative, values):
+    return values[bisect.bisect(cumulative, rng.random() * cumulative[-1])]
+
+
+class _Innings:
+    """
+    Ball-by-ball state of one innings; ``deliveries`` holds tuples of
+    (over, ball, batsman, bowler, non_striker, runs_batter, extras_kind,
+    extras_runs, wicket_kind, player_out, fielder).
+    """
+
+    def __init__(self, team, batting, fielding):
+        self.team = team
+        self.batting = batting
+        self.fielding = fielding
+        self.deliveries = []
+        self.runs = 0
+        self.wickets = 0
+        self.legal_balls = 0
+
+
+def _choose_bowler(rng, bowlers, overs_bowled, quota, previous):
+    # the front-line bowlers (the tail of the XI) bowl most overs, the part-timer the rest
+    candidates = [b for b in bowlers
+                  if b != previous and (quota is None or overs_bowled[b] < quota)]
+    weights = [1 if b == bowlers[0] else 3 for b in candidates]
+    return rng.choices(candidates, weights)[0]
+
+
+def _play_innings(rng, name, innings, target=None, ball_budget=None):
+    """
+    Play an innings of format ``name`` until all out, out of overs or
+    balls, the target is reached or (in a Test) a declaration.
+    """
+    spec = FORMATS[name]
+    tables = _OUTCOME_CUMULATIVE[name]
+    batting, fielding = innings.batting, innings.fielding
+    keeper = fielding[5]
+    bowlers = [fielding[4]] + list(fielding[6:])
+    overs_bowled = dict.fromkeys(bowlers, 0)
+    striker, non_striker, next_in = 0, 1, 2
+    bowler = None
+    over = 0
+    out = innings.deliveries.append
+    while True:
+        if spec.overs is not None and over >= spec.overs:
+            return
+        if ball_budget is not None and innings.legal_balls >= ball_budget:
+            return
+        if (spec.overs is None and target is None and over >= 100 and innings.runs > 400
+                and rng.random() < 0.05):
+            return
+        bowler = _choose_bowler(rng, bowlers, overs_bowled, spec.bowler_overs, bowler)
+        overs_bowled[bowler] += 1
+        table = tables[1] if spec.death_over is not None and over >= spec.death_over else tables[0]
+        legal = ball = 0
+        while legal < spec.balls_per_over:
+            ball += 1
+            runs_batter = extras_runs = 0
+            extras_kind = kind = player_out = fielder = None
+            u = rng.random()
+            for extra, p in _EXTRAS:
+                if u < p:
+                    extras_kind = extra
+                    break
+                u -= p
+            if extras_kind == 'wides':
+                extras_runs = 5 if rng.random() < 0.02 else 1
+            else:
+                legal += extras_kind != 'noballs'
+                outcome = _draw(rng, table, _OUTCOMES)
+                if extras_kind in ('byes', 'legbyes'):
+                    extras_runs = 4 if outcome in (4, 6) else 1
+                elif outcome == 'W' and extras_kind != 'noballs':
+                    kind = _draw(rng, _KIND_CUMULATIVE, _KINDS)
+                    player_out = batting[striker]
+                    if kind in ('caught', 'run out'):
+                        fielder = rng.choice([p for p in fielding if p != bowler])
+                        if kind == 'run out' and rng.random() < 0.3:
+                            player_out = batting[non_striker]
+                    elif kind == 'stumped':
+                        fielder = keeper
+                else:
+                    runs_batter = 0 if outcome == 'W' else outcome
+                    extras_runs = int(extras_kind == 'noballs')
+            out((over, ball, batting[striker], bowler, batting[non_striker], runs_batter,
+                 extras_kind, extras_runs, kind, player_out, fielder))
+            innings.runs += runs_batter + extras_runs
+            innings.legal_balls += extras_kind not in ('wides', 'noballs')
+            if (runs_batter + (extras_runs if extras_kind in ('byes', 'legbyes') else 0)) % 2:
+                striker, non_striker = non_striker, striker
+            if kind is not None:
+                innings.wickets += 1
+                if innings.wickets == 10:
+                    return
+                if player_out == batting[striker]:
+                    striker = next_in
+                else:
+                    non_striker = next_in
+                next_in += 1
+            if target is not None and innings.runs >= target:
+                return
+        striker, non_striker = non_striker, striker
+        over += 1
+
+
+def _outcome(spec, innings):
+    """
+    The ``outcome`` of a match from its innings.
+    """
+    totals = {}
+    for inn in innings:
+        totals[inn.team] = totals.get(inn.team, 0) + inn.runs
+    last = innings[-1]
+    other = innings[1].team if last.team == innings[0].team else innings[0].team
+    lead = totals[last.team] - totals[other]
+    if len(innings) == spec.innings and lead > 0:
+        return {'winner': last.team, 'by': {'wickets': 10 - last.wickets}}
+    if spec.overs is None:
+        if last.wickets < 10 or len(innings) < 3:
+            return {'result': 'draw'}
+        if len(innings) == 3 and lead < 0:
+            return {'winner': other, 'by': {'innings': 1, 'runs': -lead}}
+    if lead == 0:
+        return {'result': 'tie'}
+    return {'winner': other, 'by': {'runs': -lead}}
+
+
+def _play_match(rng, name):
+    """
+    Return (info, innings) of one match of format ``name``; ``info`` has
+    ``datetime.date`` dates.
+    """
+    spec = FORMATS[name]
+    team1, team2 = rng.sample(spec.teams, 2)
+    elevens = {team: [squad(team)[i] for i in sorted(rng.sample(range(_SQUAD_SIZE), 11))]
+               for team in (team1, team2)}
+    toss_winner = rng.choice((team1, team2))
+    decision = rng.choice(('bat', 'field'))
+    other = team2 if toss_winner == team1 else team1
+    batting_first = toss_winner if decision == 'bat' else other
+    bowling_first = other if batting_first == toss_winner else toss_winner
+
+    innings = []
+    if spec.innings == 2:
+        first = _Innings(batting_first, elevens[batting_first], elevens[bowling_first])
+        _play_innings(rng, name, first)
+        second = _Innings(bowling_first, elevens[bowling_first], elevens[batting_first])
+        _play_innings(rng, name, second, target=first.runs + 1)
+        innings = [first, second]
+    else:
+        # five days of 90 overs, less up to a third lost to weather
+        budget = 6 * (_TEST_OVERS - rng.randrange(_TEST_OVERS // 3))
+        order = (batting_first, bowling_first, batting_first, bowling_first)
+        totals = {batting_first: 0, bowling_first: 0}
+        for n, team in enumerate(order):
+            opponent = bowling_first if team == batting_first else batting_first
+            if n == 3:
+                if totals[batting_first] < totals[bowling_first]:
+                    break
+                target = totals[batting_first] - totals[bowling_first] + 1
+            else:
+                target = None
+            inn = _Innings(team, elevens[team], elevens[opponent])
+            _play_innings(rng, name, inn, target=target, ball_budget=budget)
+            budget -= inn.legal_balls
+            totals[team] += inn.runs
+            innings.append(inn)
+            if budget <= 0:
+                break
+
+    start = datetime.date(2008, 1, 1) + datetime.timedelta(days=rng.randrange(17 * 365))
+    days = 5 if spec.innings == 4 else 1
+    venue, city = rng.choice(_VENUES)
+    umpires = [f'{rng.choice(_INITIALS)} {rng.choice(_SURNAMES)}' for _ in range(2)]
+    people = [p for team in (team1, team2) for p in elevens[team]] + umpires
+    info = {
+        'balls_per_over': spec.balls_per_over,
+        'city': city,
+        'dates': [start + datetime.timedelta(days=d) for d in range(days)],
+        'event': {'name': spec.event},
+        'gender': 'male',
+        'match_type': spec.match_type,
+        'outcome': _outcome(spec, innings),
+        'players': {team: list(elevens[team]) for team in (team1, team2)},
+        'registry': {'people': {name: _person_id(name) for name in people}},
+        'season': str(start.year),
+        'team_type': spec.team_type,
+        'teams': [team1, team2],
+        'toss': {'decision': decision, 'winner': toss_winner},
+        'umpires': umpires,
+        'venue': venue,
+    }
+    if spec.overs is not None:
+        info['overs'] = spec.overs
+    return info, innings
+
+
+def _yaml_delivery(d):
+    over, ball, batsman, bowler, non_striker, runs_batter, extras_kind, extras_runs, kind, \
+        player_out, fielder = d
+    info = {
+        'batsman': batsman,
+        'bowler': bowler,
+        'non_striker': non_striker,
+        'runs': {'batsman': runs_batter, 'extras': extras_runs, 'total': runs_batter + extras_runs},
+    }
+    if extras_kind is not None:
+        info['extras'] = {extras_kind: extras_runs}
+    if kind is not None:
+        info['wicket'] = {'kind': kind, 'player_out': player_out}
+        if fielder is not None:
+            info['wicket']['fielders'] = [fielder]
+    text = f'{over}.{ball}'
+    return {BallKey(float(text), text): info}
+
+
+def _json_delivery(d):
+    _, _, batsman, bowler, non_striker, runs_batter, extras_kind, extras_runs, kind, \
+        player_out, fielder = d
+    info = {
+        'batter': batsman,
+        'bowler': bowler,
+        'non_striker': non_striker,
+        'runs': {'batter': runs_batter, 'extras': extras_runs, 'total': runs_batter + extras_runs},
+    }
+    if extras_kind is not None:
+        info['extras'] = {extras_kind: extras_runs}
+    if kind is not None:
+        wicket = {'player_out': player_out, 'kind': kind}
+        if fielder is not None:
+            wicket['fielders'] = [{'name': fielder}]
+        info['wickets'] = [wicket]
+    return info
+
+
+def _meta(info):
+    return {'data_version': '1.1.0', 'created': info['dates'][0], 'revision': 1}
+
+
+def _match_dict(info, innings, layout):
+    if layout == 'yaml':
+        return {
+            'meta': _meta(info),
+            'info': info,
+            'innings': [{f'{_ordinal(n + 1)} innings': {
+                'team': inn.team, 'deliveries': [_yaml_delivery(d) for d in inn.deliveries],
+            }} for n, inn in enumerate(innings)],
+        }
+    info = dict(info, dates=[str(d) for d in info['dates']])
+    json_innings = []
+    for inn in innings:
+        overs = []
+        for d in inn.deliveries:
+            if not overs or overs[-1]['over'] != d[0]:
+                overs.append({'over': d[0], 'deliveries': []})
+            overs[-1]['deliveries'].append(_json_delivery(d))
+        json_innings.append({'team': inn.team, 'overs': overs})
+    return {'meta': _meta(info), 'info': info, 'innings': json_innings}
+
+
+def _quote(name):
+    # a JSON string is a valid YAML double-quoted scalar
+    return json.dumps(name)
+
+
+def _scalar(value):
+    if isinstance(value, str):
+        return _quote(value)
+    if isinstance(value, datetime.date):
+        return value.isoformat()
+    return str(value)
+
+
+def _yaml_block(mapping, lines, indent=0):
+    """
+    Append the block-style YAML of a mapping of scalars, lists of scalars
+    and nested mappings to ``lines``.
+    """
+    pad = ' ' * indent
+    for key, value in mapping.items():
+        key = key if key.isidentifier() else _quote(key)
+        if isinstance(value, dict):
+            lines.append(f'{pad}{key}:')
+            _yaml_block(value, lines, indent + 2)
+        elif isinstance(value, list):
+            lines.append(f'{pad}{key}:' if value else f'{pad}{key}: []')
+            lines.extend(f'{pad}- {_scalar(item)}' for item in value)
+        else:
+            lines.append(f'{pad}{key}: {_scalar(value)}')
+
+
+def _yaml_text(info, innings):
+    """
+    Cricsheet YAML text of a match, formatted directly rather than through
+    PyYAML's emitter, which would take most of the generation time.
+    """
+    lines = []
+    _yaml_block({'meta': _meta(info), 'info': info}, lines)
+    lines.append('innings:')
+    for n, inn in enumerate(innings):
+        lines.append(f'- {_ordinal(n + 1)} innings:')
+        lines.append(f'    team: {_quote(inn.team)}')
+        if not inn.deliveries:
+            lines.append('    deliveries: []')
+            continue
+        lines.append('    deliveries:')
+        quoted = {name: _quote(name) for name in inn.batting + inn.fielding}
+        for (over, ball, batsman, bowler, non_striker, runs_batter, extras_kind, extras_runs,
+             kind, player_out, fielder) in inn.deliveries:
+            lines.append(
+                f'    - {over}.{ball}:\n'
+                f'        batsman: {quoted[batsman]}\n'
+                f'        bowler: {quoted[bowler]}\n'
+                f'        non_striker: {quoted[non_striker]}\n'
+                f'        runs:\n'
+                f'          batsman: {runs_batter}\n'
+                f'          extras: {extras_runs}\n'
+                f'          total: {runs_batter + extras_runs}'
+            )
+            if extras_kind is not None:
+                lines.append(f'        extras:\n          {extras_kind}: {extras_runs}')
+            if kind is not None:
+                lines.append(f'        wicket:\n          kind: {kind}\n'
+                             f'          player_out: {quoted[player_out]}')
+                if fielder is not None:
+                    lines.append(f'          fielders:\n          - {quoted[fielder]}')
+    return '\n'.join(lines) + '\n'
+
+
+def _match_rng(seed, index):
+    return random.Random(f'{seed}:{index}')
+
+
+def _formats_for(formats):
+    if isinstance(formats, str):
+        formats = (formats,)
+    weights = dict(formats) if isinstance(formats, dict) else dict.fromkeys(formats, 1)
+    for name in weights:
+        if name not in FORMATS:
+            raise ValueError(f'unknown format {name!r}; use one of {tuple(FORMATS)}')
+    return list(weights), list(accumulate(weights.values()))
+
+
+def _match_id(index):
+    # Cricsheet-like numeric ids, unique within a corpus
+    return str(1000000 + index)
+
+
+def _generate(seed, index, names, cumulative):
+    rng = _match_rng(seed, index)
+    return _play_match(rng, _draw(rng, cumulative, names))
+
+
+def synthetic_match(seed=0, index=0, formats=('T20',), layout='yaml'):
+    """
+    Return match ``index`` of the corpus generated with ``seed`` as a match
+    dictionary. ``formats`` is a format name, a sequence of names drawn
+    uniformly or a {name: weight} dict (see FORMATS).
+    """
+    if layout not in LAYOUTS:
+        raise ValueError(f'layout must be one of {LAYOUTS}, got {layout!r}')
+    info, innings = _generate(seed, index, *_formats_for(formats))
+    return _match_dict(info, innings, layout)
+
+
+def iter_synthetic_matches(n_matches, seed=0, formats=('T20',), layout='yaml', start=0):
+    """
+    Yield (match_id, match_dict) for matches ``start`` to
+    ``start + n_matches - 1`` of the corpus generated with ``seed``.
+    """
+    if layout not in LAYOUTS:
+        raise ValueError(f'layout must be one of {LAYOUTS}, got {layout!r}')
+    names, cumulative = _formats_for(formats)
+    for index in range(start, start + n_matches):
+        info, innings = _generate(seed, index, names, cumulative)
+        yield _match_id(index), _match_dict(info, innings, layout)
+
+
+def _match_text(seed, index, names, cumulative, file_format):
+    info, innings = _generate(seed, index, names, cumulative)
+    if file_format == 'json':
+        return json.dumps(_match_dict(info, innings, 'json'), separators=(',', ':'))
+    return _yaml_text(info, innings)
+
+
+def _render_chunk(task):
+    """
+    Worker entry point: (file name, text) of a range of matches.
+    """
+    seed, start, stop, names, cumulative, text_format = task
+    return [(f'{_match_id(index)}.{text_format}',
+             _match_text(seed, index, names, cumulative, text_format))
+            for index in range(start, stop)]
+
+
+def _iter_rendered(seed, n_matches, names, cumulative, text_format, workers, chunk_size=64):
+    tasks = [(seed, start, min(start + chunk_size, n_matches), names, cumulative, text_format)
+             for start in range(0, n_matches, chunk_size)]
+    if workers <= 1:
+        for task in tasks:
+            yield from _render_chunk(task)
+        return
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for chunk in executor.map(_render_chunk, tasks):
+            yield from chunk
+
+
+def write_synthetic_corpus(path, n_matches, seed=0, formats=('T20',), file_format='yaml',
+                           workers=1, compresslevel=1):
+    """
+    Write ``n_matches`` synthetic matches and return the paths written.
+
+    ``file_format='yaml'`` or ``'json'`` writes one ``<match_id>.<ext>``
+    file per match into the folder ``path``; ``'zip'`` writes a single zip
+    archive of YAML files at ``path``, deflated at ``compresslevel``.
+    Matches are rendered in ``workers`` processes; the output is the same
+    for any number of workers.
+    """
+    if file_format not in FILE_FORMATS:
+        raise ValueError(f'file_format must be one of {FILE_FORMATS}, got {file_format!r}')
+    names, cumulative = _formats_for(formats)
+    text_format = 'json' if file_format == 'json' else 'yaml'
+    rendered = _iter_rendered(seed, n_matches, names, cumulative, text_format, workers)
+    if file_format == 'zip':
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with zipfile.ZipFile(path, 'w', zipfile.ZIP_DEFLATED,
+                             compresslevel=compresslevel) as archive:
+            for name, text in rendered:
+                archive.writestr(name, text)
+        return [path]
+    os.makedirs(path, exist_ok=True)
+    paths = []
+    for name, text in rendered:
+        file_path = os.path.join(path, name)
+        with open(file_path, 'w', encoding='utf-8') as f:
+            f.write(text)
+        paths.append(file_path)
+    return paths
@@ -265,6 +265,20 @@ def create_many_yaml_files():
     return _create_files
 
 
+@pytest.fixture
+def synthetic_corpus(tmp_path):
+    """Factory fixture writing a reproducible synthetic corpus under tmp_path"""
+    from cricpy.synthetic import write_synthetic_corpus
+
+    def _write(count=100, seed=0, formats=('T20',), file_format='yaml'):
+        name = 'synthetic.zip' if file_format == 'zip' else 'synthetic'
+        write_synthetic_corpus(str(tmp_path / name), count, seed=seed, formats=formats,
+                               file_format=file_format)
+        return tmp_path / name
+
+    return _write
+
+
 # Utility functions for tests
 def assert_dataframe_columns(df, expected_columns):
     """Helper to assert DataFrame has expected columns"""
@@ -0,0 +1,93 @@
+"""
+Test suite for cricpy.io.async_loader module
+"""
+import asyncio
+import threading
+import time
+import pytest
+import yaml
+from cricpy.io.async_loader import aiter_matches, aload_all_yaml, read_bytes
+from cricpy.io.file_loader import LoadStats, load_all_yaml
+
+
+async def _collect(agen):
+    return [item async for item in agen]
+
+
+class TestAsyncLoader:
+    """Test cases for the asyncio loader"""
+
+    def test_aload_all_yaml_matches_sync_loader(self, sample_yaml_files):
+        """Test that the async loader returns what load_all_yaml returns"""
+        (sample_yaml_files / 'notes.txt').write_text('ignored')
+        result = asyncio.run(aload_all_yaml(str(sample_yaml_files)))
+        assert sorted(result, key=lambda item: item[0]) == \
+            sorted(load_all_yaml(str(sample_yaml_files)), key=lambda item: item[0])
+
+    def test_aiter_matches_order_and_errors(self, tmp_path):
+        """Test ordered output, JSON files and error reporting"""
+        for i in range(5):
+            (tmp_path / f'm{i}.yaml').write_text(yaml.dump({'match_id': i}))
+        (tmp_path / 'm5.json').write_text('{"match_id": 5}')
+        (tmp_path / 'bad.yaml').write_text('{ invalid ][')
+        errors = []
+        stats = LoadStats()
+
+        result = asyncio.run(_collect(aiter_matches(
+            str(tmp_path), max_in_flight=2, on_error=lambda p, e: errors.append(p), stats=stats)))
+
+        assert [match_id for match_id, _ in result] == ['m0', 'm1', 'm2', 'm3', 'm4', 'm5']
+        assert [m['match_id'] for _, m in result] == list(range(6))
+        assert errors == [str(tmp_path / 'bad.yaml')]
+        assert stats.files_read == 7
+        assert stats.failed_count == 1
+
+    def test_overlaps_slow_reads(self, tmp_path):
+        """Test that reads are overlapped, up to the in-flight window"""
+        for i in range(20):
+            (tmp_path / f'm{i:02d}.yaml').write_text(yaml.dump({'match_id': i}))
+        lock = threading.Lock()
+        overlapped = threading.Event()
+        in_flight = [0, 0]
+
+        def slow_reader(path):
+            with lock:
+                in_flight[0] += 1
+                in_flight[1] = max(in_flight[1], in_flight[0])
+                if in_flight[0] > 1:
+                    overlapped.set()
+            # a read only finishes once another one has started
+            overlapped.wait(timeout=10)
+            with lock:
+                in_flight[0] -= 1
+            return read_bytes(path)
+
+        result = asyncio.run(_collect(aiter_matches(str(tmp_path), max_in_flight=10,
+                                                    reader=slow_reader)))
+
+        assert len(result) == 20
+        assert overlapped.is_set()
+        assert 1 < in_flight[1] <= 10
+
+    @pytest.mark.performance
+    def test_latency_benchmark(self, tmp_path):
+        """Benchmark reads with injected latency against reading one at a time"""
+        for i in range(20):
+            (tmp_path / f'm{i:02d}.yaml').write_text(yaml.dump({'match_id': i}))
+
+        def slow_reader(path):
+            time.sleep(0.05)
+            return read_bytes(path)
+
+        start = time.perf_counter()
+        result = asyncio.run(_collect(aiter_matches(str(tmp_path), max_in_flight=10,
+                                                    reader=slow_reader)))
+        elapsed = time.perf_counter() - start
+        print(f'\n20 reads of 50 ms: {elapsed * 1e3:.0f} ms with 10 in flight')
+        assert len(result) == 20
+        assert elapsed < 20 * 0.05 / 2
+
+    def test_invalid_window(self, tmp_path):
+        """Test that the in-flight window must be positive"""
+        with pytest.raises(ValueError):
+            asyncio.run(aload_all_yaml(str(tmp_path), max_in_flight=0))
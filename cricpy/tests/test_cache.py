@@ -0,0 +1,117 @@
+"""
+Test suite for cricpy.cache module
+"""
+import os
+import threading
+import time
+import pytest
+import yaml
+from cricpy.cache import MatchCache
+
+
+def _write(path, match):
+    with open(path, 'w') as f:
+        yaml.dump(match, f)
+
+
+class TestMatchCache:
+    """Test cases for MatchCache"""
+
+    def test_hit_and_miss(self, tmp_path, sample_match_data):
+        """Test that a second lookup is served from the cache"""
+        path = tmp_path / 'm.yaml'
+        _write(path, sample_match_data)
+        cache = MatchCache()
+
+        first = cache.get(str(path))
+        second = cache.get(str(path))
+
+        assert first is second
+        assert len(first) == 2
+        stats = cache.stats()
+        assert (stats['hits'], stats['misses'], stats['entries']) == (1, 1, 1)
+        assert stats['nbytes'] > 0
+        assert str(path) in cache
+
+    def test_mtime_invalidation(self, tmp_path, sample_match_data, large_match_data):
+        """Test that a changed file is reparsed"""
+        path = tmp_path / 'm.yaml'
+        _write(path, sample_match_data)
+        cache = MatchCache()
+        assert len(cache.get(str(path))) == 2
+
+        _write(path, large_match_data)
+        st = os.stat(path)
+        os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 10 ** 9))
+
+        assert len(cache.get(str(path))) == 120
+        assert cache.stats()['invalidations'] == 1
+
+    def test_lru_eviction_by_count_and_bytes(self, tmp_path):
+        """Test eviction of least recently used entries"""
+        paths = [str(tmp_path / f'{name}.yaml') for name in 'abc']
+        for path in paths:
+            _write(path, {'innings': []})
+        cache = MatchCache(max_entries=2, load=lambda p: p, sizeof=lambda v: 10)
+
+        cache.get(paths[0])
+        cache.get(paths[1])
+        cache.get(paths[0])
+        cache.get(paths[2])
+
+        assert paths[0] in cache and paths[2] in cache and paths[1] not in cache
+        assert cache.evictions == 1
+
+        by_bytes = MatchCache(max_entries=10, max_bytes=25, load=lambda p: p, sizeof=lambda v: 10)
+        for path in paths:
+            by_bytes.get(path)
+        assert len(by_bytes) == 2
+        assert by_bytes.nbytes == 20
+
+    def test_concurrent_requests_collapse(self, tmp_path):
+        """Test that concurrent misses for one file share a single load"""
+        path = str(tmp_path / 'm.yaml')
+        _write(path, {'innings': []})
+        calls = []
+
+        def slow_load(p):
+            calls.append(p)
+            time.sleep(0.1)
+            return object()
+
+        cache = MatchCache(load=slow_load, sizeof=lambda v: 1)
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(cache.get(path)))
+                   for _ in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        assert len(calls) == 1
+        assert len(results) == 8
+        assert all(r is results[0] for r in results)
+
+    def test_errors_propagate_and_are_not_cached(self, tmp_path):
+        """Test that load failures raise and are retried"""
+        path = tmp_path / 'bad.yaml'
+        path.write_text('{ invalid ][')
+        cache = MatchCache()
+
+        with pytest.raises(Exception):
+            cache.get(str(path))
+        assert len(cache) == 0
+        with pytest.raises(FileNotFoundError):
+            cache.get(str(tmp_path / 'missing.yaml'))
+
+    def test_invalidate_and_clear(self, tmp_path):
+        """Test explicit invalidation"""
+        path = str(tmp_path / 'm.yaml')
+        _write(path, {'innings': []})
+        cache = MatchCache(load=lambda p: p, sizeof=lambda v: 5)
+        cache.get(path)
+        cache.invalidate(path)
+        assert len(cache) == 0 and cache.nbytes == 0
+        cache.get(path)
+        cache.clear()
+        assert len(cache) == 0
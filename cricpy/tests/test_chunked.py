@@ -0,0 +1,186 @@
+"""
+Test suite for cricpy.stats.chunked module
+"""
+import pandas as pd
+import pytest
+from cricpy.io.file_loader import BallKey
+from cricpy.stats.chunked import (
+    GroupAggregate, aggregate_chunked, batting_summary, bowling_summary, iter_chunks,
+)
+
+
+def _ball(batsman, non_striker, bowler, batter=0, extras=None, wicket=None):
+    ball = {'batsman': batsman, 'non_striker': non_striker, 'bowler': bowler,
+            'runs': {'batsman': batter, 'extras': sum((extras or {}).values()),
+                     'total': batter + sum((extras or {}).values())}}
+    if extras:
+        ball['extras'] = extras
+    if wicket:
+        ball['wicket'] = wicket
+    return ball
+
+
+@pytest.fixture
+def attribution_match():
+    """Byes, penalty runs, a non-striker run out and a retirement"""
+    deliveries = [
+        _ball('A', 'B', 'X', batter=4),
+        _ball('A', 'B', 'X', extras={'byes': 2}),
+        _ball('A', 'B', 'X', extras={'penalty': 5}),
+        _ball('A', 'B', 'X', batter=1, wicket={'kind': 'run out', 'player_out': 'B'}),
+        _ball('A', 'C', 'X', extras={'wides': 1}),
+        _ball('A', 'C', 'X', wicket={'kind': 'retired hurt', 'player_out': 'A'}),
+        _ball('D', 'C', 'Y', wicket={'kind': 'bowled', 'player_out': 'D'}),
+    ]
+    return {'info': {'teams': ['P', 'Q']}, 'innings': [{'1st innings': {
+        'team': 'P',
+        'deliveries': [{BallKey(float(f'0.{i}'), f'0.{i}'): ball}
+                       for i, ball in enumerate(deliveries, 1)],
+    }}]}
+
+
+@pytest.fixture
+def matches(sample_match_data, large_match_data, match_with_all_dismissal_types,
+            match_with_all_extras_types):
+    return [
+        ('m1', sample_match_data),
+        ('m2', large_match_data),
+        ('m3', match_with_all_dismissal_types),
+        ('m4', match_with_all_extras_types),
+        ('m5', large_match_data),
+    ]
+
+
+class TestChunkedAggregation:
+    """Test cases for chunked aggregation"""
+
+    def test_iter_chunks_bounds_matches(self, matches):
+        """Test that chunks hold at most chunk_size matches"""
+        chunks = list(iter_chunks(iter(matches), chunk_size=2))
+        assert [c['match_id'].nunique() for c in chunks] == [2, 2, 1]
+        assert sum(len(c) for c in chunks) == 2 + 120 + 10 + 5 + 120
+        assert chunks[0].loc[0, 'match_type'] == 'T20'
+        assert chunks[0].loc[0, 'season'] == '2024'
+        assert {'is_four', 'is_six', 'is_wicket', 'is_legal_for_batter'} <= set(chunks[0].columns)
+
+    @pytest.mark.parametrize('chunk_size', [1, 2, 100])
+    def test_results_independent_of_chunk_size(self, matches, chunk_size):
+        """Test that chunked results equal a single in-memory aggregation"""
+        reducers = {'batting': batting_summary(), 'bowling': bowling_summary()}
+        expected = aggregate_chunked(iter(matches), reducers, chunk_size=1000)
+        result = aggregate_chunked(iter(matches), reducers, chunk_size=chunk_size)
+
+        for name in reducers:
+            pd.testing.assert_frame_equal(result[name], expected[name], check_dtype=False)
+
+        batting = result['batting']
+        all_rows = pd.concat(list(iter_chunks(iter(matches), chunk_size=1000)))
+        assert batting['runs'].sum() == all_rows['runs_batter'].sum()
+        assert batting.loc['Rohit Sharma', 'runs'] == 4
+        assert batting.loc['Rohit Sharma', 'balls'] == 2
+
+    def test_mean_min_max(self, matches):
+        """Test the mean, min and max aggregations across chunks"""
+        reducer = GroupAggregate('batting_team', avg=('runs_total', 'mean'),
+                                 best=('runs_total', 'max'), worst=('runs_total', 'min'),
+                                 balls=('ball', 'count'))
+        result = aggregate_chunked(iter(matches), reducer, chunk_size=1)
+
+        all_rows = pd.concat(list(iter_chunks(iter(matches), chunk_size=1000)))
+        expected = all_rows.groupby('batting_team')['runs_total'].agg(
+            ['mean', 'max', 'min', 'count'])
+        assert result['avg'].tolist() == pytest.approx(expected['mean'].tolist())
+        assert result['best'].tolist() == expected['max'].tolist()
+        assert result['worst'].tolist() == expected['min'].tolist()
+        assert result['balls'].tolist() == expected['count'].tolist()
+
+    def test_group_by_info_columns(self, matches):
+        """Test grouping on match metadata columns"""
+        result = aggregate_chunked(iter(matches), GroupAggregate(
+            ['match_type', 'match_id'], runs=('runs_total', 'sum')), chunk_size=2)
+        assert result.loc[('T20', 'm1'), 'runs'] == 4
+        assert len(result) == 5
+
+    @pytest.mark.parametrize('backend', ['pandas', 'polars'])
+    def test_scoring_rules(self, attribution_match, backend):
+        """Test crediting outs to the player out and charging bowlers as the scorecards do"""
+        if backend == 'polars':
+            pytest.importorskip('polars')
+        for schema in ('narrow', 'full'):
+            result = aggregate_chunked(
+                iter([('m', attribution_match)]),
+                {'batting': batting_summary(), 'bowling': bowling_summary()},
+                schema=schema, backend=backend)
+            batting, bowling = result['batting'], result['bowling']
+            assert batting['outs'].to_dict() == {'A': 0, 'B': 1, 'D': 1}
+            assert batting.loc['A', 'runs'] == 5 and batting.loc['A', 'balls'] == 5
+            assert batting.loc['B', 'balls'] == 0
+            assert bowling.to_dict('index') == {
+                'X': {'deliveries': 6, 'runs': 6, 'wickets': 0},
+                'Y': {'deliveries': 1, 'runs': 0, 'wickets': 1},
+            }
+
+    def test_empty_source_and_validation(self):
+        """Test empty input and invalid arguments"""
+        assert aggregate_chunked(iter([]), batting_summary()) is None
+        with pytest.raises(ValueError):
+            GroupAggregate('bowler', runs=('runs_total', 'median'))
+        with pytest.raises(ValueError):
+            list(iter_chunks(iter([]), chunk_size=0))
+
+
+class TestPolarsBackend:
+    """Test cases for backend='polars'"""
+
+    @pytest.fixture(autouse=True)
+    def _polars(self):
+        pytest.importorskip('polars')
+
+    def test_chunks_are_polars_frames(self, matches):
+        """Test that chunks carry the same rows and flag columns"""
+        chunks = list(iter_chunks(iter(matches), chunk_size=2, backend='polars'))
+        expected = list(iter_chunks(iter(matches), chunk_size=2))
+        assert [c.height for c in chunks] == [len(c) for c in expected]
+        for chunk, frame in zip(chunks, expected):
+            for name in ('is_legal_for_batter', 'is_four', 'is_six', 'is_wicket', 'is_out',
+                         'is_bowler_wicket', 'runs_conceded', 'runs_total'):
+                assert chunk[name].to_list() == frame[name].tolist()
+
+    @pytest.mark.parametrize('chunk_size', [1, 100])
+    def test_results_match_pandas_backend(self, matches, chunk_size):
+        """Test that both backends give the same aggregates"""
+        reducers = {
+            'batting': batting_summary(),
+            'bowling': bowling_summary(),
+            'teams': GroupAggregate(['match_type', 'batting_team'], avg=('runs_total', 'mean'),
+                                    best=('runs_total', 'max'), balls=('ball', 'count')),
+        }
+        expected = aggregate_chunked(iter(matches), reducers, chunk_size=chunk_size)
+        result = aggregate_chunked(iter(matches), reducers, chunk_size=chunk_size, backend='polars')
+        for name in reducers:
+            # missing match types are None on one side and NaN on the other
+            pd.testing.assert_frame_equal(result[name], expected[name], check_dtype=False,
+                                          check_index_type=False)
+
+    def test_unknown_backend(self, matches):
+        """Test that an unknown backend is rejected"""
+        with pytest.raises(ValueError):
+            list(iter_chunks(iter(matches), backend='dask'))
+
+    @pytest.mark.performance
+    def test_backend_benchmark(self, large_match_data):
+        """Benchmark both backends on an archive-sized stream of matches"""
+        import time
+
+        archive = [(f'm{i}', large_match_data) for i in range(2000)]
+        reducers = {'batting': batting_summary(), 'bowling': bowling_summary(),
+                    'teams': GroupAggregate(['match_type', 'season', 'batting_team'],
+                                            runs=('runs_total', 'sum'))}
+        times = {}
+        for backend in ('pandas', 'polars'):
+            start = time.perf_counter()
+            aggregate_chunked(iter(archive), reducers, chunk_size=500, backend=backend)
+            times[backend] = time.perf_counter() - start
+        print(f"\npandas: {times['pandas']:.2f} s, polars: {times['polars']:.2f} s "
+              f"for {len(archive)} matches")
+        assert times['polars'] < times['pandas'] * 1.5
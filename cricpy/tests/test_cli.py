@@ -0,0 +1,199 @@
+"""
+Test suite for cricpy.cli module
+"""
+import json
+import pandas as pd
+import pytest
+import yaml
+from cricpy.cli import main
+
+
+def _write_match(directory, name, match_type='T20', season='2024', balls=2):
+    deliveries = [
+        {round(0.1 * (i + 1), 1): {'batsman': 'A', 'bowler': 'B',
+                                   'runs': {'batsman': 1, 'extras': 0, 'total': 1}}}
+        for i in range(balls)
+    ]
+    content = {
+        'info': {'match_type': match_type, 'season': season, 'teams': ['X', 'Y']},
+        'innings': [{'1st innings': {'team': 'X', 'deliveries': deliveries}}]
+    }
+    with open(directory / name, 'w') as f:
+        yaml.dump(content, f)
+
+
+class TestConvert:
+    """Test cases for the convert command"""
+
+    def test_convert_writes_partitioned_csv(self, tmp_path, capsys):
+        """Test that output is partitioned by match type and season"""
+        src, dst = tmp_path / 'src', tmp_path / 'dst'
+        src.mkdir()
+        _write_match(src, 'm1.yaml', 'T20', '2024', balls=3)
+        _write_match(src, 'm2.yaml', 'ODI', '2023/24', balls=2)
+
+        code = main(['convert', str(src), str(dst), '--format', 'csv'])
+
+        assert code == 0
+        t20 = pd.read_csv(dst / 'match_type=T20' / 'season=2024' / 'm1.csv')
+        odi = pd.read_csv(dst / 'match_type=ODI' / 'season=2023-24' / 'm2.csv')
+        assert len(t20) == 3
+        assert len(odi) == 2
+        assert (t20['match_id'] == 'm1').all()
+
+        err = capsys.readouterr().err
+        assert '2 files, 5 balls, 0 failed' in err
+        assert 'balls/s' in err
+
+    def test_convert_json_input(self, tmp_path):
+        """Test converting a Cricsheet JSON file"""
+        src, dst = tmp_path / 'src', tmp_path / 'dst'
+        src.mkdir()
+        content = {
+            'info': {'match_type': 'T20', 'dates': ['2022-05-01']},
+            'innings': [{'team': 'X', 'overs': [{'over': 0, 'deliveries': [
+                {'batter': 'A', 'bowler': 'B', 'runs': {'batter': 6, 'extras': 0, 'total': 6}}
+            ]}]}]
+        }
+        (src / 'j1.json').write_text(json.dumps(content))
+
+        assert main(['convert', str(src), str(dst), '--format', 'csv', '-q']) == 0
+        df = pd.read_csv(dst / 'match_type=T20' / 'season=2022' / 'j1.csv')
+        assert df.iloc[0]['runs_batter'] == 6
+
+    def test_convert_wire(self, tmp_path):
+        """Test writing wire format messages"""
+        from cricpy.io.wire import read_wire
+
+        src, dst = tmp_path / 'src', tmp_path / 'dst'
+        src.mkdir()
+        _write_match(src, 'm1.yaml', balls=3)
+
+        assert main(['convert', str(src), str(dst), '--format', 'wire', '-q']) == 0
+        message = read_wire((dst / 'match_type=T20' / 'season=2024' / 'm1.wire').read_bytes())
+        assert message.match_id == 'm1'
+        assert list(message.to_pandas()['batsman']) == ['A'] * 3
+
+    def test_convert_failure_exit_code(self, tmp_path, capsys):
+        """Test that per-file failures give a non-zero exit status"""
+        src, dst = tmp_path / 'src', tmp_path / 'dst'
+        src.mkdir()
+        _write_match(src, 'good.yaml')
+        (src / 'bad.yaml').write_text('{ invalid yaml ][')
+
+        code = main(['convert', str(src), str(dst), '--format', 'csv', '-q'])
+
+        assert code == 1
+        assert 'error:' in capsys.readouterr().err
+        assert (dst / 'match_type=T20' / 'season=2024' / 'good.csv').exists()
+
+    def test_convert_with_workers(self, tmp_path):
+        """Test converting with a process pool"""
+        src, dst = tmp_path / 'src', tmp_path / 'dst'
+        src.mkdir()
+        for i in range(6):
+            _write_match(src, f'm{i}.yaml')
+
+        assert main(['convert', str(src), str(dst), '--format', 'csv', '--workers', '2', '-q']) == 0
+        assert len(list((dst / 'match_type=T20' / 'season=2024').iterdir())) == 6
+
+    def test_convert_missing_source(self, tmp_path):
+        """Test that a missing source is a usage error"""
+        with pytest.raises(SystemExit) as exc:
+            main(['convert', str(tmp_path / 'nope'), str(tmp_path / 'out'), '--format', 'csv'])
+        assert exc.value.code == 2
+
+
+class TestExplain:
+    """Test cases for per-file cost reports and LPT scheduling"""
+
+    def test_explain_report(self, tmp_path):
+        """Test that the report lists every file, most expensive first"""
+        src, dst, report = tmp_path / 'src', tmp_path / 'dst', tmp_path / 'report.csv'
+        src.mkdir()
+        _write_match(src, 'small.yaml', balls=2)
+        _write_match(src, 'big.yaml', balls=600)
+        (src / 'bad.yaml').write_text('{ invalid yaml ][')
+
+        code = main(['convert', str(src), str(dst), '--format', 'csv', '-q',
+                     '--explain', str(report)])
+
+        assert code == 1
+        rows = pd.read_csv(report)
+        assert list(rows.columns) == ['file', 'bytes', 'balls', 'decode_s', 'parse_s', 'write_s',
+                                      'total_s', 'status']
+        assert rows['total_s'].is_monotonic_decreasing
+        by_file = rows.set_index(rows['file'].map(lambda f: f.rsplit('/', 1)[-1]))
+        assert by_file.loc['big.yaml', 'balls'] == 600
+        assert by_file.loc['big.yaml', 'bytes'] > by_file.loc['small.yaml', 'bytes']
+        assert by_file.loc['big.yaml', 'decode_s'] > 0
+        assert by_file.loc['bad.yaml', 'status'] == 'decode_error'
+        assert by_file.loc['bad.yaml', 'parse_s'] == 0
+
+    def test_estimate_costs(self, tmp_path):
+        """Test cost estimates from file sizes and from an earlier report"""
+        from cricpy.cli import estimate_costs, lpt_order, read_explain_report
+
+        src = tmp_path / 'src'
+        src.mkdir()
+        for name, balls in [('a.yaml', 2), ('b.yaml', 300), ('c.yaml', 40)]:
+            _write_match(src, name, balls=balls)
+        paths = [str(src / name) for name in ('a.yaml', 'b.yaml', 'c.yaml')]
+        assert lpt_order(paths, estimate_costs(paths)) == [paths[1], paths[2], paths[0]]
+
+        report = tmp_path / 'report.csv'
+        main(['convert', str(src), str(tmp_path / 'dst'), '--format', 'csv', '-q',
+              '--explain', str(report)])
+        costs = read_explain_report(str(report))
+        assert set(costs) == set(paths)
+        # a file measured at its current size costs its measured time
+        assert estimate_costs(paths, costs)[1] == costs[paths[1]][1]
+        # a changed file falls back to its size times the report's rate
+        _write_match(src, 'b.yaml', balls=3)
+        assert estimate_costs(paths, costs)[1] != costs[paths[1]][1]
+
+    def test_lpt_schedule(self, tmp_path):
+        """Test converting with the LPT schedule and costs from a report"""
+        src, dst, report = tmp_path / 'src', tmp_path / 'dst', tmp_path / 'report.csv'
+        src.mkdir()
+        for i in range(4):
+            _write_match(src, f'm{i}.yaml', balls=10 * (i + 1))
+        args = ['convert', str(src), str(dst), '--format', 'csv', '-q', '--workers', '2']
+
+        assert main(args + ['--schedule', 'lpt', '--explain', str(report)]) == 0
+        assert main(args + ['--schedule', 'lpt', '--costs', str(report)]) == 0
+        assert len(list((dst / 'match_type=T20' / 'season=2024').iterdir())) == 4
+        with pytest.raises(SystemExit):
+            main(args + ['--costs', str(report)])
+
+    @pytest.mark.performance
+    def test_lpt_benchmark(self, tmp_path):
+        """Benchmark the makespan of stream and LPT order on measured per-file costs"""
+        import heapq
+
+        from cricpy.cli import estimate_costs, lpt_order, read_explain_report
+
+        src, report = tmp_path / 'src', tmp_path / 'report.csv'
+        src.mkdir()
+        for i in range(24):
+            _write_match(src, f'a{i:02d}.yaml', balls=120)
+        for i in range(2):
+            _write_match(src, f'z{i}.yaml', balls=1500)
+        main(['convert', str(src), str(tmp_path / 'dst'), '--format', 'csv', '-q',
+              '--explain', str(report)])
+        measured = read_explain_report(str(report))
+        paths = sorted(measured)
+
+        def makespan(order, workers=4):
+            # each file goes to the first worker to become free, as in the process pool
+            finish = [0.0] * workers
+            for path in order:
+                heapq.heapreplace(finish, finish[0] + measured[path][1])
+            return max(finish)
+
+        stream = makespan(paths)
+        by_size = makespan(lpt_order(paths, estimate_costs(paths)))
+        by_report = makespan(lpt_order(paths, estimate_costs(paths, measured)))
+        print(f'\n4-worker makespan: stream {stream:.2f}s, lpt by size {by_size:.2f}s, '
+              f'lpt by report {by_report:.2f}s')
+        assert by_report < stream and by_size < stream
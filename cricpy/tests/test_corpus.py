@@ -0,0 +1,132 @@
+"""
+Test suite for cricpy.io.corpus module
+"""
+import numpy as np
+import pandas as pd
+import pytest
+import yaml
+from cricpy.cli import main
+from cricpy.io.corpus import CorpusWriter, build_corpus, open_corpus
+from cricpy.parsers.cricsheet_parser import parse_match
+
+
+class TestCorpus:
+    """Test cases for building and opening a corpus"""
+
+    def test_round_trip(self, tmp_path, sample_match_data, match_with_all_dismissal_types,
+                        match_with_all_extras_types):
+        """Test that a corpus reproduces parse_match output"""
+        matches = [('a', sample_match_data), ('b', match_with_all_dismissal_types),
+                   ('c', match_with_all_extras_types)]
+        build_corpus(matches, str(tmp_path / 'corpus'))
+
+        corpus = open_corpus(str(tmp_path / 'corpus'))
+        df = corpus.to_pandas()
+
+        expected = pd.concat([parse_match(m) for _, m in matches], ignore_index=True)
+        assert len(corpus) == len(expected) == 17
+        assert list(df['match_id'].astype(str)) == ['a'] * 2 + ['b'] * 10 + ['c'] * 5
+        for column in expected.columns:
+            assert df[column].astype(object).where(df[column].notna(), None).tolist() == \
+                expected[column].astype(object).where(expected[column].notna(), None).tolist()
+
+    def test_columns_are_memory_mapped(self, tmp_path, large_match_data):
+        """Test that columns are read-only maps over the corpus files"""
+        build_corpus([('m', large_match_data)], str(tmp_path / 'corpus'))
+        corpus = open_corpus(str(tmp_path / 'corpus'))
+
+        runs = corpus.column('runs_total')
+        assert isinstance(runs, np.memmap)
+        assert not runs.flags.writeable
+        assert runs.dtype == np.int16
+        assert int(runs.sum()) == parse_match(large_match_data)['runs_total'].sum()
+
+    def test_match_lookup_and_metadata(self, tmp_path, sample_match_data, large_match_data):
+        """Test per-match slicing and the match metadata table"""
+        build_corpus([('big', large_match_data), ('ipl', sample_match_data)], str(tmp_path / 'c'))
+        corpus = open_corpus(str(tmp_path / 'c'))
+
+        ipl = corpus.match('ipl')
+        assert len(ipl) == 2
+        assert ipl['batsman'].tolist() == ['Rohit Sharma', 'Rohit Sharma']
+        meta = corpus.matches.set_index('match_id')
+        assert meta.loc['ipl', 'venue'] == 'Wankhede Stadium'
+        assert meta.loc['ipl', 'season'] == '2024'
+        assert meta.loc['big', 'stop'] - meta.loc['big', 'start'] == 120
+        with pytest.raises(KeyError):
+            corpus.match('missing')
+
+    def test_duplicate_match_ids(self, tmp_path, sample_match_data, large_match_data):
+        """Test matches sharing an id, as a.yaml and a.json do"""
+        matches = [('a', large_match_data), ('b', sample_match_data), ('a', sample_match_data)]
+        corpus = build_corpus(matches, str(tmp_path / 'c'))
+
+        df = corpus.to_pandas()
+        assert df['match_id'].value_counts().to_dict() == {'a': 122, 'b': 2}
+        assert list(df['match_id'].cat.categories) == ['a', 'b']
+        assert df['match_id'].iloc[-1] == 'a' and df['match_id'].iloc[120] == 'b'
+        assert len(corpus.match('a')) == 122
+        assert (corpus.table('wickets')['match_id'] == 'a').all()
+
+    def test_small_flushes(self, tmp_path, large_match_data):
+        """Test that flushing in small chunks gives the same data"""
+        with CorpusWriter(str(tmp_path / 'c'), flush_rows=7) as writer:
+            writer.add('m1', large_match_data)
+            writer.add('m2', large_match_data)
+        corpus = open_corpus(str(tmp_path / 'c'))
+        assert len(corpus) == 240
+        assert corpus.column('ball')[125] == pytest.approx(0.6)
+
+    def test_empty_and_existing(self, tmp_path):
+        """Test empty corpora and refusing to overwrite"""
+        corpus = build_corpus([], str(tmp_path / 'c'))
+        assert len(corpus) == 0
+        assert len(corpus.to_pandas()) == 0
+        with pytest.raises(FileExistsError):
+            build_corpus([], str(tmp_path / 'c'))
+        assert len(build_corpus([], str(tmp_path / 'c'), overwrite=True)) == 0
+        with pytest.raises(FileNotFoundError):
+            open_corpus(str(tmp_path))
+
+    def test_failed_build_has_no_manifest(self, tmp_path, sample_match_data):
+        """Test that an interrupted build is not openable"""
+        def matches():
+            yield 'a', sample_match_data
+            raise RuntimeError('interrupted')
+
+        with pytest.raises(RuntimeError):
+            build_corpus(matches(), str(tmp_path / 'c'))
+        with pytest.raises(FileNotFoundError):
+            open_corpus(str(tmp_path / 'c'))
+
+    def test_corpus_command(self, tmp_path, sample_match_data):
+        """Test building a corpus from a folder on the command line"""
+        src = tmp_path / 'src'
+        src.mkdir()
+        for name in ('m1.yaml', 'm2.yaml'):
+            with open(src / name, 'w') as f:
+                yaml.dump(sample_match_data, f)
+
+        assert main(['corpus', str(src), str(tmp_path / 'c'), '-q']) == 0
+        corpus = open_corpus(str(tmp_path / 'c'))
+        assert corpus.matches['match_id'].tolist() == ['m1', 'm2']
+        assert len(corpus) == 4
+
+    def test_side_tables(self, tmp_path, sample_match_data, match_with_all_dismissal_types):
+        """Test corpus-wide wickets and fielders tables keyed by corpus row"""
+        build_corpus([('a', sample_match_data), ('b', match_with_all_dismissal_types)],
+                     str(tmp_path / 'c'))
+        corpus = open_corpus(str(tmp_path / 'c'))
+
+        wickets = corpus.table('wickets')
+        fielders = corpus.table('fielders')
+        deliveries = corpus.to_pandas()
+
+        assert len(wickets) == 10
+        assert (wickets['match_id'] == 'b').all()
+        assert wickets['row'].min() == 2
+        assert (deliveries.loc[wickets['row'], 'dismissal'].tolist()
+                == wickets['kind'].astype(str).tolist())
+        assert fielders['fielder'].tolist() == ['Fielder 1', 'Fielder 2', 'Wicket Keeper']
+        assert not fielders['substitute'].any()
+        assert isinstance(corpus.column('row', table='fielders'), np.memmap)
@@ -3,7 +3,11 @@ Test suite for cricpy.parsers.cricsheet_parser module
 """
 import pytest
 import pandas as pd
-from cricpy.parsers.cricsheet_parser import parse_match
+import time
+from cricpy.io.file_loader import BallKey, load_yaml
+from cricpy.parsers.cricsheet_parser import (
+    COLUMNS, FULL_COLUMNS, parse_match, parse_wickets, split_ball,
+)
 
 
 class TestParseMatch:
@@ -409,4 +413,336 @@ class TestParseMatch:
         
         # Different innings
         assert df.iloc[5]['inning'] == '2nd innings'
-        assert df.iloc[5]['batting_team'] == 'South Africa'
\ No newline at end of file
+        assert df.iloc[5]['batting_team'] == 'South Africa'
+
+    def test_parse_json_layout(self):
+        """Test parsing a match in the Cricsheet JSON layout"""
+        match_dict = {
+            'innings': [
+                {
+                    'team': 'India',
+                    'overs': [
+                        {
+                            'over': 0,
+                            'deliveries': [
+                                {'batter': 'Rohit', 'bowler': 'Starc', 'non_striker': 'Gill',
+                                 'runs': {'batter': 4, 'extras': 0, 'total': 4}},
+                                {'batter': 'Rohit', 'bowler': 'Starc', 'non_striker': 'Gill',
+                                 'runs': {'batter': 0, 'extras': 1, 'total': 1},
+                                 'extras': {'wides': 1}},
+                            ]
+                        },
+                        {
+                            'over': 1,
+                            'deliveries': [
+                                {'batter': 'Gill', 'bowler': 'Cummins', 'non_striker': 'Rohit',
+                                 'runs': {'batter': 0, 'extras': 0, 'total': 0},
+                                 'wickets': [{'kind': 'caught', 'player_out': 'Gill',
+                                              'fielders': [{'name': 'Smith'}]}]},
+                            ]
+                        }
+                    ]
+                },
+                {'team': 'Australia', 'overs': []}
+            ]
+        }
+
+        df = parse_match(match_dict)
+
+        assert len(df) == 3
+        assert list(df['ball']) == [0.1, 0.2, 1.1]
+        assert (df['inning'] == '1st innings').all()
+        assert df.iloc[0]['batsman'] == 'Rohit'
+        assert df.iloc[0]['runs_batter'] == 4
+        assert df.iloc[1]['extras_type'] == 'wides'
+        assert df.iloc[2]['dismissal'] == 'caught'
+        assert df.iloc[2]['fielder'] == 'Smith'
+        assert list(df['over']) == [0, 0, 1]
+        assert list(df['ball_in_over']) == [1, 2, 1]
+
+    def test_parse_invalid_output(self, sample_match_data):
+        """Test that an unknown output kind is rejected"""
+        with pytest.raises(ValueError):
+            parse_match(sample_match_data, output='excel')
+
+
+class TestArrowOutput:
+    """Test cases for Arrow output"""
+
+    def test_parse_match_arrow(self, match_with_all_extras_types):
+        """Test that Arrow output matches the pandas output"""
+        pa = pytest.importorskip('pyarrow')
+        batch = parse_match(match_with_all_extras_types, output='arrow')
+
+        assert isinstance(batch, pa.RecordBatch)
+        assert batch.schema.names == list(parse_match(match_with_all_extras_types).columns)
+        assert pa.types.is_dictionary(batch.schema.field('batsman').type)
+        assert batch.column('extras_type').to_pylist() == [
+            'wides', 'noballs', 'byes', 'legbyes', 'penalty'
+        ]
+        assert batch.column('runs_total').to_pylist() == [1, 1, 2, 1, 5]
+
+    def test_arrow_to_pandas_arrow_dtype(self, sample_match_data):
+        """Test handing a batch to pandas with Arrow-backed dtypes"""
+        pytest.importorskip('pyarrow')
+        batch = parse_match(sample_match_data, output='arrow')
+        df = batch.to_pandas(types_mapper=pd.ArrowDtype)
+        assert isinstance(df['runs_total'].dtype, pd.ArrowDtype)
+        assert df['runs_total'].sum() == 4
+
+    def test_iter_record_batches(self, large_match_data, sample_match_data):
+        """Test batching a corpus into RecordBatches"""
+        pa = pytest.importorskip('pyarrow')
+        from cricpy.parsers.cricsheet_parser import arrow_schema, iter_record_batches
+        matches = [('m1', large_match_data), ('empty', {}), ('m2', sample_match_data),
+                   ('m3', large_match_data)]
+
+        batches = list(iter_record_batches(matches, max_rows=100))
+
+        assert [b.num_rows for b in batches] == [120, 122]
+        assert all(b.schema == arrow_schema(match_id=True) for b in batches)
+        table = pa.Table.from_batches(batches)
+        assert table.column('match_id').to_pylist().count('m2') == 2
+        assert 'empty' not in table.column('match_id').to_pylist()
+
+
+class TestPolarsOutput:
+    """Test cases for Polars output"""
+
+    def test_parse_match_polars(self, match_with_all_extras_types):
+        """Test that Polars output matches the pandas output"""
+        pl = pytest.importorskip('polars')
+        frame = parse_match(match_with_all_extras_types, output='polars')
+        expected = parse_match(match_with_all_extras_types)
+
+        assert isinstance(frame, pl.DataFrame)
+        assert frame.columns == list(expected.columns)
+        assert frame.schema['ball'] == pl.Float64
+        assert frame.schema['dismissal'] == pl.Utf8
+        assert frame['extras_type'].to_list() == expected['extras_type'].tolist()
+        assert frame['runs_total'].to_list() == [1, 1, 2, 1, 5]
+
+    def test_normalized_polars(self, json_match_with_events):
+        """Test the normalized tables as Polars frames"""
+        pl = pytest.importorskip('polars')
+        tables = parse_match(json_match_with_events, output='polars', normalize=True)
+        assert tables.wickets['player_out'].to_list() == ['Root', 'Stokes']
+        assert tables.fielders.schema['substitute'] == pl.Boolean
+
+
+@pytest.fixture
+def json_match_with_events():
+    """A JSON-layout match with multiple wickets, a review, a replacement and penalty runs"""
+    return {
+        'innings': [
+            {
+                'team': 'England',
+                'overs': [
+                    {
+                        'over': 0,
+                        'deliveries': [
+                            {'batter': 'Root', 'bowler': 'Lyon', 'non_striker': 'Stokes',
+                             'runs': {'batter': 0, 'extras': 0, 'total': 0},
+                             'review': {'by': 'England', 'umpire': 'Dharmasena',
+                                        'batter': 'Root', 'decision': 'upheld'}},
+                            {'batter': 'Root', 'bowler': 'Lyon', 'non_striker': 'Stokes',
+                             'runs': {'batter': 0, 'extras': 6, 'total': 6},
+                             'extras': {'noballs': 1, 'penalty': 5}},
+                            {'batter': 'Root', 'bowler': 'Lyon', 'non_striker': 'Stokes',
+                             'runs': {'batter': 0, 'extras': 0, 'total': 0},
+                             'wickets': [
+                                 {'player_out': 'Root', 'kind': 'run out',
+                                  'fielders': [{'name': 'Smith'}, {'name': 'Carey'}]},
+                                 {'player_out': 'Stokes', 'kind': 'retired out'},
+                             ],
+                             'replacements': {'match': [
+                                 {'in': 'Wood', 'out': 'Stokes', 'reason': 'concussion_substitute',
+                                  'team': 'England'}
+                             ]}},
+                        ]
+                    }
+                ]
+            }
+        ]
+    }
+
+
+class TestFullSchema:
+    """Test cases for schema='full' and parse_wickets"""
+
+    def test_narrow_is_default(self, sample_match_data):
+        """Test that the default schema keeps the narrow columns"""
+        assert list(parse_match(sample_match_data).columns) == COLUMNS
+
+    def test_full_columns(self, json_match_with_events):
+        """Test the extra columns of the full schema"""
+        df = parse_match(json_match_with_events, schema='full')
+
+        assert list(df.columns) == FULL_COLUMNS
+        assert df['delivery_id'].tolist() == [0, 1, 2]
+        assert df['non_striker'].tolist() == ['Stokes'] * 3
+        assert df.iloc[1]['extras_noballs'] == 1
+        assert df.iloc[1]['extras_penalty'] == 5
+        assert df.iloc[1]['extras_type'] == 'noballs'
+        assert df.iloc[0]['review_decision'] == 'upheld'
+        assert df.iloc[0]['review_by'] == 'England'
+        assert df['wicket_count'].tolist() == [0, 0, 2]
+        assert df.iloc[2]['player_out'] == 'Root'
+        assert df.iloc[2]['fielder'] == 'Smith, Carey'
+        assert df.iloc[2]['replacement_in'] == 'Wood'
+        assert df.iloc[2]['replacement_reason'] == 'concussion_substitute'
+
+    def test_full_matches_narrow(self, match_with_all_dismissal_types):
+        """Test that the full schema leaves the narrow columns unchanged"""
+        narrow = parse_match(match_with_all_dismissal_types)
+        full = parse_match(match_with_all_dismissal_types, schema='full')
+        pd.testing.assert_frame_equal(full[COLUMNS], narrow)
+        assert full['wicket_count'].sum() == 10
+
+    def test_parse_wickets(self, json_match_with_events, match_with_all_dismissal_types):
+        """Test the wickets side table, including multiple wickets per delivery"""
+        wickets = parse_wickets(json_match_with_events)
+        assert wickets['delivery_id'].tolist() == [2, 2]
+        assert wickets['wicket_number'].tolist() == [1, 2]
+        assert wickets['player_out'].tolist() == ['Root', 'Stokes']
+        assert wickets.iloc[0]['fielders'] == 'Smith, Carey'
+
+        yaml_wickets = parse_wickets(match_with_all_dismissal_types)
+        assert len(yaml_wickets) == 10
+        assert yaml_wickets.iloc[3]['fielders'] == 'Fielder 2'
+        assert len(parse_wickets({})) == 0
+
+    @pytest.mark.parametrize('key, value', [
+        ('wicket', [{'kind': 'run out', 'player_out': 'X', 'fielders': ['F']},
+                    {'kind': 'retired out', 'player_out': 'Z'}]),
+        ('wickets', [{'kind': 'run out', 'player_out': 'X', 'fielders': ['F']}]),
+    ])
+    def test_yaml_wicket_lists(self, key, value):
+        """Test that every schema reads the first wicket of a YAML wicket list"""
+        match = {'innings': [{'1st innings': {'team': 'A', 'deliveries': [
+            {0.1: {'batsman': 'X', 'bowler': 'Y', 'runs': {'total': 0}, key: value}}
+        ]}}]}
+        for df in (parse_match(match), parse_match(match, schema='full'),
+                   parse_match(match, normalize=True).deliveries):
+            assert df.iloc[0]['dismissal'] == 'run out'
+            assert df.iloc[0]['fielder'] == 'F'
+        assert parse_match(match, schema='full').iloc[0]['wicket_count'] == len(value)
+
+    def test_invalid_schema(self, sample_match_data):
+        """Test that an unknown schema is rejected"""
+        with pytest.raises(ValueError):
+            parse_match(sample_match_data, schema='wide')
+
+    @pytest.mark.performance
+    def test_schema_benchmark(self, large_match_data):
+        """Benchmark narrow and full schemas on the same match"""
+        def best_of(schema, repeat=20):
+            times = []
+            for _ in range(repeat):
+                start = time.perf_counter()
+                parse_match(large_match_data, schema=schema)
+                times.append(time.perf_counter() - start)
+            return min(times)
+
+        narrow, full = best_of('narrow'), best_of('full')
+        print(f'\nnarrow: {narrow * 1e3:.2f} ms, full: {full * 1e3:.2f} ms')
+        assert narrow <= full
+
+
+class TestNormalizedTables:
+    """Test cases for parse_match(normalize=True)"""
+
+    def test_bundle(self, json_match_with_events):
+        """Test the deliveries, wickets and fielders tables"""
+        tables = parse_match(json_match_with_events, normalize=True)
+
+        assert tables.deliveries['delivery_id'].tolist() == [0, 1, 2]
+        assert list(tables.deliveries.columns) == ['delivery_id'] + COLUMNS
+        assert tables.wickets.to_dict('list') == {
+            'delivery_id': [2, 2], 'wicket_number': [1, 2],
+            'player_out': ['Root', 'Stokes'], 'kind': ['run out', 'retired out'],
+        }
+        assert tables.fielders['fielder'].tolist() == ['Smith', 'Carey']
+        assert tables.fielders['wicket_number'].tolist() == [1, 1]
+
+        joined = tables.fielders.merge(tables.deliveries, on='delivery_id')
+        assert joined['bowler'].tolist() == ['Lyon', 'Lyon']
+
+    def test_substitute_fielders(self):
+        """Test that substitute fielders are flagged in both layouts"""
+        yaml_match = {'innings': [{'1st innings': {'team': 'A', 'deliveries': [
+            {0.1: {'batsman': 'X', 'bowler': 'Y', 'runs': {'total': 0},
+                   'wicket': {'kind': 'caught', 'player_out': 'X', 'fielders': ['Jones (sub)']}}}
+        ]}}]}
+        fielders = parse_match(yaml_match, normalize=True).fielders
+        assert fielders['fielder'].tolist() == ['Jones']
+        assert fielders['substitute'].tolist() == [True]
+
+        json_match = {'innings': [{'team': 'A', 'overs': [{'over': 0, 'deliveries': [
+            {'batter': 'X', 'bowler': 'Y', 'runs': {'batter': 0, 'extras': 0, 'total': 0},
+             'wickets': [{'kind': 'caught', 'player_out': 'X',
+                          'fielders': [{'name': 'Jones', 'substitute': True}]}]}
+        ]}]}]}
+        fielders = parse_match(json_match, normalize=True).fielders
+        assert fielders.to_dict('list')['substitute'] == [True]
+
+    def test_bundle_full_schema_and_arrow(self, json_match_with_events):
+        """Test combining normalize with the full schema and Arrow output"""
+        tables = parse_match(json_match_with_events, schema='full', normalize=True)
+        assert list(tables.deliveries.columns) == FULL_COLUMNS
+
+        pa = pytest.importorskip('pyarrow')
+        batches = parse_match(json_match_with_events, output='arrow', normalize=True)
+        assert all(isinstance(b, pa.RecordBatch) for b in batches)
+        assert batches.fielders.schema.field('substitute').type == pa.bool_()
+
+    def test_empty_bundle(self):
+        """Test a match without deliveries"""
+        tables = parse_match({}, normalize=True)
+        assert len(tables.deliveries) == len(tables.wickets) == len(tables.fielders) == 0
+
+
+class TestBallNumbers:
+    """Test cases for the exact over/ball columns"""
+
+    YAML_MATCH = """
+info:
+  teams: [A, B]
+innings:
+  - 1st innings:
+      team: A
+      deliveries:
+        - 0.9: {batsman: X, bowler: Y, runs: {batsman: 0, extras: 1, total: 1}, extras: {wides: 1}}
+        - 0.10: {batsman: X, bowler: Y, runs: {batsman: 1, extras: 0, total: 1}}
+        - 1.1: {batsman: X, bowler: Y, runs: {batsman: 4, extras: 0, total: 4}}
+  - 2nd innings:
+      team: B
+      deliveries:
+        - 0.1: {batsman: Z, bowler: W, runs: {batsman: 0, extras: 0, total: 0}}
+"""
+
+    def test_yaml_keys_are_exact(self, tmp_path):
+        """Test that 0.10 is ball 10 of over 0, not ball 1"""
+        path = tmp_path / 'm.yaml'
+        path.write_text(self.YAML_MATCH)
+        df = parse_match(load_yaml(str(path)))
+
+        assert df['ball'].dtype == float
+        assert list(df['over']) == [0, 0, 1, 0]
+        assert list(df['ball_in_over']) == [9, 10, 1, 1]
+        assert list(df['delivery_index']) == [0, 1, 2, 0]
+
+    def test_plain_float_keys(self, sample_match_data):
+        """Test ball keys that did not come from load_yaml"""
+        df = parse_match(sample_match_data)
+        assert list(df['over']) == [0, 0]
+        assert list(df['ball_in_over']) == [1, 2]
+        assert list(df['delivery_index']) == [0, 1]
+
+    @pytest.mark.parametrize('ball_number,expected', [
+        (0.1, (0, 1)), (19.6, (19, 6)), ('7.3', (7, 3)), (BallKey(0.1, '0.10'), (0, 10)),
+        (5, (5, 0)),
+    ])
+    def test_split_ball(self, ball_number, expected):
+        """Test splitting ball numbers into integers"""
+        assert split_ball(ball_number) == expected
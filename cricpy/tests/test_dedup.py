@@ -0,0 +1,138 @@
+"""
+Test suite for cricpy.io.dedup module
+"""
+import copy
+import json
+from unittest.mock import patch
+
+import pytest
+import yaml
+from cricpy.cli import main
+from cricpy.io import file_loader
+from cricpy.io.dedup import FingerprintIndex, match_identity
+from cricpy.io.file_loader import iter_matches, load_all_yaml
+
+
+@pytest.fixture
+def bundles(tmp_path, sample_match_data, large_match_data):
+    """Two bundles sharing matches under different file names"""
+    folder = tmp_path / 'bundles'
+    folder.mkdir()
+    text = yaml.dump(sample_match_data)
+    (folder / 'all_1001.yaml').write_text(text)
+    (folder / 'ipl_1001.yaml').write_text(text)
+    reformatted = copy.deepcopy(sample_match_data)
+    reformatted['meta']['revision'] = 2
+    (folder / 'team_1001.yaml').write_text(yaml.dump(reformatted, default_flow_style=True))
+    large = copy.deepcopy(large_match_data)
+    large['info']['dates'] = ['2023-05-01']
+    (folder / 'all_2002.yaml').write_text(yaml.dump(large))
+    return folder
+
+
+class TestMatchIdentity:
+    """Test cases for match identity fingerprints"""
+
+    def test_identity_ignores_team_order_and_meta(self, sample_match_data):
+        """Test that the identity depends only on who played where and when"""
+        other = copy.deepcopy(sample_match_data)
+        other['info']['teams'].reverse()
+        other['meta'] = {}
+        assert match_identity(other) == match_identity(sample_match_data)
+        other['info']['dates'] = ['2024-01-02']
+        assert match_identity(other) != match_identity(sample_match_data)
+
+    def test_unidentifiable_match(self):
+        """Test that matches without teams or dates have no identity"""
+        assert match_identity({'info': {'teams': ['A', 'B']}}) is None
+        assert match_identity(None) is None
+
+
+class TestDedupIngest:
+    """Test cases for skipping duplicates during ingest"""
+
+    def test_duplicates_are_skipped_and_reported(self, bundles):
+        """Test that copies and reformatted copies are skipped"""
+        index = FingerprintIndex()
+        ids = [match_id for match_id, _ in iter_matches(str(bundles), dedup=index)]
+        assert ids == ['all_1001', 'all_2002']
+        assert [(d.duplicate_of, d.reason) for d in index.duplicates] == [
+            ('all_1001.yaml', 'content'), ('all_1001.yaml', 'identity')]
+        assert len(index) == 2
+
+    def test_duplicates_are_not_decoded(self, bundles):
+        """Test that skipped files never reach the full YAML decode"""
+        with patch.object(file_loader, 'yaml_loads', wraps=file_loader.yaml_loads) as decode:
+            matches = load_all_yaml(str(bundles), dedup=FingerprintIndex())
+        assert len(matches) == 2
+        assert decode.call_count == 2
+
+    def test_json_copy_of_yaml_match(self, bundles, sample_match_data):
+        """Test identity dedup across the YAML and JSON layouts"""
+        data = copy.deepcopy(sample_match_data)
+        data['innings'] = []
+        (bundles / 'zz_1001.json').write_text(json.dumps(data))
+        index = FingerprintIndex()
+        ids = [match_id for match_id, _ in iter_matches(str(bundles), dedup=index)]
+        assert 'zz_1001' not in ids
+
+    def test_content_only(self, bundles):
+        """Test that identity=False keeps reformatted copies"""
+        index = FingerprintIndex(identity=False)
+        ids = [match_id for match_id, _ in iter_matches(str(bundles), dedup=index)]
+        assert ids == ['all_1001', 'all_2002', 'team_1001']
+
+    def test_index_persists_across_runs(self, tmp_path, bundles, large_match_data):
+        """Test that a later run skips matches ingested by an earlier one"""
+        path = str(tmp_path / 'seen.idx')
+        with FingerprintIndex(path) as index:
+            assert len(list(iter_matches(str(bundles), dedup=index))) == 2
+
+        (bundles / 'new_3003.yaml').write_text(yaml.dump(large_match_data))
+        with FingerprintIndex(path) as index:
+            ids = [match_id for match_id, _ in iter_matches(str(bundles), dedup=index)]
+        assert ids == ['new_3003']
+        assert len(index.duplicates) == 4
+
+    def test_failed_file_does_not_shadow_copy(self, tmp_path, bundles):
+        """Test that a file failing after its fingerprints were taken is forgotten"""
+        text = (bundles / 'all_1001.yaml').read_text()
+        (bundles / 'aaa_1001.yaml').write_text(text + '  - broken: [\n')
+        index = FingerprintIndex(str(tmp_path / 'seen.idx'))
+        errors = []
+        ids = [match_id for match_id, _ in
+               iter_matches(str(bundles), dedup=index, on_error=lambda p, e: errors.append(p))]
+        assert ids == ['all_1001', 'all_2002']
+        assert len(errors) == 1 and not index._pending
+
+        index.discard(str(bundles / 'all_2002.yaml'))
+        index.close()
+        with FingerprintIndex(str(tmp_path / 'seen.idx')) as again:
+            ids = [match_id for match_id, _ in iter_matches(str(bundles), dedup=again)]
+        assert ids == ['all_2002']
+
+    def test_failed_run_is_not_persisted(self, tmp_path, bundles):
+        """Test that leaving the index on an exception drops that run's entries"""
+        path = str(tmp_path / 'seen.idx')
+        with pytest.raises(RuntimeError):
+            with FingerprintIndex(path) as index:
+                for _ in iter_matches(str(bundles), dedup=index):
+                    raise RuntimeError('ingest failed')
+        with FingerprintIndex(path) as index:
+            assert len(list(iter_matches(str(bundles), dedup=index))) == 2
+
+    def test_cli(self, tmp_path, bundles, capsys):
+        """Test the corpus command's dedup options"""
+        assert main(['corpus', str(bundles), str(tmp_path / 'c'), '--dedup']) == 0
+        err = capsys.readouterr().err
+        assert 'matches=2' in err
+        assert '2 duplicate files skipped' in err
+
+        index = str(tmp_path / 'seen.idx')
+        assert main(['corpus', str(bundles), str(tmp_path / 'c1'), '--dedup-index', index,
+                     '-q']) == 0
+        assert main(['corpus', str(bundles), str(tmp_path / 'c2'), '--dedup-index', index]) == 0
+        assert 'matches=0' in capsys.readouterr().err
+        rebuild = ['corpus', str(bundles), str(tmp_path / 'c1'), '--dedup-index', index]
+        assert main(rebuild + ['--overwrite']) == 0
+        assert 'matches=2' in capsys.readouterr().err
@@ -1,12 +1,14 @@
 """
 Test suite for cricpy.io.file_loader module
 """
+import logging
 import os
 import pytest
 import yaml
 import tempfile
 from unittest.mock import patch, mock_open, MagicMock
-from cricpy.io.file_loader import load_yaml, load_all_yaml
+import pickle
+from cricpy.io.file_loader import BallKey, LoadStats, load_yaml, load_all_yaml
 
 
 class TestLoadYaml:
@@ -88,13 +90,50 @@ class TestLoadYaml:
             # Restore permissions for cleanup
             os.chmod(yaml_file, 0o644)
     
-    @patch('builtins.print')
-    def test_error_message_printed(self, mock_print):
-        """Test that error messages are printed correctly"""
-        load_yaml("/nonexistent/file.yaml")
-        mock_print.assert_called_once()
-        assert "[ERROR]" in str(mock_print.call_args)
-        assert "Failed to load file" in str(mock_print.call_args)
+    def test_error_message_logged(self, caplog):
+        """Test that load failures are logged rather than printed"""
+        with patch('builtins.print') as mock_print:
+            with caplog.at_level(logging.ERROR, logger='cricpy.io.file_loader'):
+                load_yaml("/nonexistent/file.yaml")
+        mock_print.assert_not_called()
+        assert len(caplog.records) == 1
+        assert caplog.records[0].levelno == logging.ERROR
+        assert "Failed to load file" in caplog.records[0].getMessage()
+
+    def test_error_callback(self, caplog):
+        """Test that on_error receives the failure instead of the error log"""
+        errors = []
+        with caplog.at_level(logging.ERROR, logger='cricpy.io.file_loader'):
+            result = load_yaml("/nonexistent/file.yaml",
+                               on_error=lambda p, e: errors.append((p, e)))
+        assert result is None
+        assert len(errors) == 1
+        assert errors[0][0] == "/nonexistent/file.yaml"
+        assert isinstance(errors[0][1], FileNotFoundError)
+        assert not caplog.records
+
+    def test_load_stats(self, tmp_path):
+        """Test that LoadStats records reads, bytes and failures"""
+        good = tmp_path / "good.yaml"
+        good.write_text("test: data\n")
+        bad = tmp_path / "bad.yaml"
+        bad.write_text("{ invalid yaml content: ][")
+
+        stats = LoadStats(keep_slowest=1)
+        load_yaml(str(good), stats=stats)
+        load_yaml(str(bad), stats=stats, on_error=lambda p, e: None)
+
+        assert stats.files_read == 2
+        assert stats.bytes_read == good.stat().st_size + bad.stat().st_size
+        assert stats.failed_count == 1
+        assert stats.failed[0].path == str(bad)
+        assert stats.load_time > 0
+        assert len(stats.slowest_files) == 1
+
+        merged = LoadStats().merge(stats).merge(stats)
+        assert merged.files_read == 4
+        assert merged.failed_count == 2
+        assert merged.as_dict()['bytes_read'] == 2 * stats.bytes_read
     
     def test_load_large_yaml_file(self, tmp_path):
         """Test loading a large YAML file"""
@@ -118,6 +157,35 @@ class TestLoadYaml:
         assert result is not None
         assert len(result['innings']) == 50
 
+    def test_ball_keys_keep_source_text(self, tmp_path):
+        """Test that ball keys remember how they were written"""
+        path = tmp_path / 'm.yaml'
+        path.write_text('deliveries:\n  - 0.1: a\n  - 0.10: b\nratio: -0.5\n')
+        result = load_yaml(str(path))
+
+        keys = [next(iter(d)) for d in result['deliveries']]
+        assert keys == [0.1, 0.1]
+        assert [k.text for k in keys] == ['0.1', '0.10']
+        assert all(isinstance(k, BallKey) for k in keys)
+        assert type(result['ratio']) is float
+
+        restored = pickle.loads(pickle.dumps(keys[1]))
+        assert restored == 0.1 and restored.text == '0.10'
+
+    def test_ball_keys_dump_back(self, tmp_path):
+        """Test that a loaded match round-trips through PyYAML's dumpers"""
+        path = tmp_path / 'm.yaml'
+        path.write_text('deliveries:\n- 0.1: a\n- 0.10: b\n')
+        result = load_yaml(str(path))
+
+        for dump in (yaml.safe_dump, yaml.dump):
+            text = dump(result)
+            assert text == path.read_text()
+            again = tmp_path / 'again.yaml'
+            again.write_text(text)
+            keys = [next(iter(d)) for d in load_yaml(str(again))['deliveries']]
+            assert [k.text for k in keys] == ['0.1', '0.10']
+
 
 class TestLoadAllYaml:
     """Test cases for load_all_yaml function"""
@@ -219,6 +287,20 @@ class TestLoadAllYaml:
         filenames = [item[0] for item in result]
         assert set(filenames) == set(f'match_{i:02d}.yaml' for i in range(5))
     
+    def test_load_all_yaml_with_stats(self, tmp_path):
+        """Test collecting errors and stats across a folder"""
+        (tmp_path / 'valid.yaml').write_text('match_id: 1')
+        (tmp_path / 'invalid.yaml').write_text('{ invalid: yaml content ][')
+        errors = []
+        stats = LoadStats()
+
+        result = load_all_yaml(str(tmp_path), on_error=lambda p, e: errors.append(p), stats=stats)
+
+        assert len(result) == 1
+        assert errors == [str(tmp_path / 'invalid.yaml')]
+        assert stats.files_read == 2
+        assert stats.failed_count == 1
+
     def test_load_all_yaml_mixed_extensions(self, tmp_path):
         """Test loading files with both .yaml and .yml extensions"""
         yaml_content = {'test': 'data'}
@@ -0,0 +1,71 @@
+"""
+Test suite for lazy package imports
+"""
+import subprocess
+import sys
+import pytest
+import cricpy
+
+
+def _modules_after(statement):
+    code = f'import sys; {statement}; print(" ".join(sorted(sys.modules)))'
+    out = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True)
+    return set(out.stdout.split())
+
+
+class TestLazyImports:
+    """Test cases for PEP 562 lazy attributes"""
+
+    def test_import_cricpy_is_light(self):
+        """Test that importing the package does not import pandas or yaml"""
+        modules = _modules_after('import cricpy, cricpy.io, cricpy.parsers')
+        assert 'pandas' not in modules
+        assert 'yaml' not in modules
+
+    def test_loader_does_not_import_pandas(self):
+        """Test that loader-only users do not pay for pandas"""
+        modules = _modules_after('from cricpy import load_yaml')
+        assert 'yaml' in modules
+        assert 'pandas' not in modules
+
+    def test_cli_help_does_not_import_pandas(self):
+        """Test that the CLI module defers pandas"""
+        assert 'pandas' not in _modules_after('import cricpy.cli')
+
+    def test_lazy_attributes_resolve(self):
+        """Test that lazy names resolve to the real objects"""
+        from cricpy.io.file_loader import load_yaml
+        from cricpy.parsers.cricsheet_parser import parse_match
+        assert cricpy.load_yaml is load_yaml
+        assert cricpy.parse_match is parse_match
+        assert cricpy.io.load_yaml is load_yaml
+        assert cricpy.parsers.parse_match is parse_match
+        assert 'parse_match' in dir(cricpy)
+        for name in cricpy.__all__:
+            assert getattr(cricpy, name) is not None
+
+    def test_unknown_attribute(self):
+        """Test that unknown names still raise AttributeError"""
+        with pytest.raises(AttributeError):
+            cricpy.does_not_exist
+        with pytest.raises(AttributeError):
+            cricpy.io.does_not_exist
+
+    @pytest.mark.performance
+    def test_import_time_benchmark(self):
+        """Benchmark import time of cricpy against its heavy dependencies"""
+        def import_seconds(module):
+            code = (f'import time; t = time.perf_counter(); import {module}; '
+                    'print(time.perf_counter() - t)')
+            runs = [
+                float(subprocess.run([sys.executable, '-c', code], capture_output=True,
+                                     text=True, check=True).stdout)
+                for _ in range(3)
+            ]
+            return min(runs)
+
+        cricpy_time = import_seconds('cricpy')
+        pandas_time = import_seconds('pandas')
+        print(f'\nimport cricpy: {cricpy_time * 1e3:.1f} ms, '
+              f'import pandas: {pandas_time * 1e3:.1f} ms')
+        assert cricpy_time < pandas_time
@@ -0,0 +1,290 @@
+"""
+Test suite for cricpy.parsers.live module
+"""
+import random
+import time
+from unittest.mock import patch
+
+import pytest
+import yaml
+from cricpy.io.file_loader import yaml_loads
+from cricpy.parsers import live as live_module
+from cricpy.parsers.cricsheet_parser import COLUMNS, parse_match
+from cricpy.parsers.live import LiveMatch, LiveMatchFile
+
+CRICSHEET_STYLE = """\
+meta:
+  data_version: 0.9
+info:
+  overs: 20
+  teams:
+    - A
+    - B
+innings:
+  - 1st innings:
+      team: A
+      deliveries:
+        - 0.1:
+            batsman: X
+            bowler: P
+            runs:
+              batsman: 4
+              extras: 0
+              total: 4
+        - 0.2:
+            batsman: X
+            bowler: P
+            extras:
+              wides: 1
+            runs:
+              batsman: 0
+              extras: 1
+              total: 1
+        - 0.3:
+            batsman: X
+            bowler: P
+            runs:
+              batsman: 0
+              extras: 0
+              total: 0
+            wicket:
+              fielders:
+                - Q
+              kind: caught
+              player_out: X
+  - 2nd innings:
+      team: B
+      deliveries:
+        - 0.1:
+            batsman: Y
+            bowler: R
+            runs:
+              batsman: 1
+              extras: 0
+              total: 1
+        - 0.2:
+            batsman: Z
+            bowler: R
+            extras:
+              legbyes: 2
+            runs:
+              batsman: 0
+              extras: 2
+              total: 2
+"""
+
+
+@pytest.fixture
+def two_innings_match():
+    return yaml_loads(CRICSHEET_STYLE)
+
+
+def _grow(path, text, every=3, **kwargs):
+    """Write ``text`` to ``path`` a few lines at a time, refreshing a follower"""
+    live = LiveMatchFile(str(path), **kwargs)
+    path.write_text('')
+    added = []
+    lines = text.splitlines(True)
+    with open(path, 'a') as f:
+        for i, line in enumerate(lines, 1):
+            f.write(line)
+            f.flush()
+            if i % every == 0 or i == len(lines):
+                added.append(live.refresh())
+    return live, added
+
+
+class TestLiveMatch:
+    """Test cases for adding deliveries one at a time"""
+
+    def test_matches_parse_match(self, two_innings_match):
+        """Test that delivery-by-delivery input gives the parse_match columns"""
+        live = LiveMatch(two_innings_match['info'])
+        for inning in two_innings_match['innings']:
+            for name, data in inning.items():
+                for delivery in data['deliveries']:
+                    for ball, ball_info in delivery.items():
+                        live.add(name, data['team'], ball, ball_info)
+        frame = live.frame()
+        assert frame[COLUMNS].equals(parse_match(two_innings_match))
+        assert frame['innings_runs'].tolist() == [4, 5, 5, 1, 3]
+        assert frame['innings_wickets'].tolist() == [0, 0, 1, 0, 0]
+        assert frame['innings_balls'].tolist() == [1, 1, 2, 1, 2]
+
+    def test_per_ball_reads_build_new_rows(self, large_match_data):
+        """Test that reading the frame after every ball converts only the new rows"""
+        live = LiveMatch(large_match_data['info'])
+        built = []
+
+        def rows_frame(columns, start, stop):
+            built.append(stop - start)
+            return build(columns, start, stop)
+
+        build = live_module._rows_frame
+        with patch.object(live_module, '_rows_frame', side_effect=rows_frame):
+            for inning in large_match_data['innings']:
+                for name, data in inning.items():
+                    for delivery in data['deliveries']:
+                        for ball, ball_info in delivery.items():
+                            seen = len(live)
+                            live.add(name, data['team'], ball, ball_info)
+                            new = live.frame(since=seen)
+                            assert new.index.tolist() == [seen]
+                            assert live.frame().iloc[-1].equals(new.iloc[0])
+        # since=0 is the whole frame, so the first ball is built once for both reads
+        assert built == [1] * (2 * len(live) - 1)
+        assert live.frame()[COLUMNS].equals(parse_match(large_match_data))
+
+    def test_aggregates_and_state(self, two_innings_match):
+        """Test the innings, batting and bowling aggregates and the chase state"""
+        live = LiveMatch(two_innings_match['info'])
+        for inning in two_innings_match['innings']:
+            for name, data in inning.items():
+                for delivery in data['deliveries']:
+                    for ball, ball_info in delivery.items():
+                        live.add(name, data['team'], ball, ball_info)
+
+        innings = live.innings().set_index('inning')
+        totals = innings.loc['1st innings', ['runs', 'wickets', 'balls', 'extras']]
+        assert totals.tolist() == [5, 1, 2, 1]
+        batting = live.batting().set_index(['inning', 'batsman'])
+        assert batting.loc[('1st innings', 'X')].tolist() == [4, 2, 1, 0, True]
+        bowling = live.bowling().set_index(['inning', 'bowler'])
+        assert bowling.loc[('1st innings', 'P')].tolist() == [2, 5, 1]
+        assert bowling.loc[('2nd innings', 'R')].tolist() == [2, 1, 0]
+
+        state = live.state()
+        assert state['inning'] == '2nd innings' and state['runs'] == 3
+        assert state['target'] == 6 and state['required_runs'] == 3
+        assert state['balls_remaining'] == 118
+        assert state['required_rate'] == pytest.approx(18 / 118)
+
+    def test_add_json(self):
+        """Test deliveries in the JSON layout"""
+        match = {'info': {}, 'innings': [{'team': 'A', 'overs': [
+            {'over': 0, 'deliveries': [
+                {'batter': 'X', 'bowler': 'P', 'runs': {'batter': 1, 'extras': 0, 'total': 1}},
+                {'batter': 'Y', 'bowler': 'P', 'runs': {'batter': 0, 'extras': 0, 'total': 0},
+                 'wickets': [{'kind': 'bowled', 'player_out': 'Y'}]},
+            ]},
+            {'over': 1, 'deliveries': [
+                {'batter': 'X', 'bowler': 'Q', 'runs': {'batter': 6, 'extras': 0, 'total': 6}},
+            ]},
+        ]}]}
+        live = LiveMatch()
+        for inning in match['innings']:
+            for over in inning['overs']:
+                for delivery in over['deliveries']:
+                    live.add_json(inning['team'], over['over'], delivery)
+        assert live.frame()[COLUMNS].equals(parse_match(match))
+        assert live.state()['wickets'] == 1
+
+
+class TestLiveMatchFile:
+    """Test cases for following a growing match file"""
+
+    @pytest.mark.parametrize('style', ['cricsheet', 'pyyaml'])
+    def test_growing_file(self, tmp_path, two_innings_match, style):
+        """Test that refreshes while the file grows line by line give the whole match"""
+        text = CRICSHEET_STYLE
+        if style == 'pyyaml':
+            text = yaml.dump(yaml.safe_load(CRICSHEET_STYLE))
+        live, added = _grow(tmp_path / 'live.yaml', text)
+        assert sum(added) + live.refresh(final=True) == 5
+        assert live.info['overs'] == 20
+        assert live.frame()[COLUMNS].equals(parse_match(two_innings_match))
+        assert live.refresh() == 0
+
+    def test_reads_only_the_tail(self, tmp_path, large_match_data):
+        """Test that each refresh decodes only the newly written deliveries"""
+        path = tmp_path / 'live.yaml'
+        with patch.object(live_module, 'yaml_loads', wraps=live_module.yaml_loads) as decode:
+            live, _ = _grow(path, yaml.dump(large_match_data), every=8)
+        assert len(live) == 120
+        assert max(len(call.args[0]) for call in decode.call_args_list[1:]) < 200
+        assert live._offset == path.stat().st_size
+
+    def test_wait_for_next(self, tmp_path, two_innings_match):
+        """Test holding the newest delivery back until the next one starts"""
+        path = tmp_path / 'live.yaml'
+        text = CRICSHEET_STYLE
+        cut = text.index('        - 0.3:')
+        path.write_text(text[:cut] + '        - 0.3:\n            batsman: X\n')
+        live = LiveMatchFile(str(path))
+        assert live.refresh() == 2
+        path.write_text(text)
+        assert live.refresh() == 2
+        assert live.frame()['dismissal'].tolist()[2] == 'caught'
+        assert live.refresh(final=True) == 1
+
+    @pytest.mark.parametrize('seed', range(3))
+    def test_partial_writes(self, tmp_path, large_match_data, seed):
+        """Test that writes cut anywhere, even inside a delivery, give parse_match's rows"""
+        data = yaml.dump(large_match_data).encode('utf-8')
+        path = tmp_path / 'live.yaml'
+        path.write_bytes(b'')
+        live = LiveMatchFile(str(path))
+        rng = random.Random(seed)
+        with open(path, 'ab') as f:
+            offset = 0
+            while offset < len(data):
+                size = rng.randint(1, 60)
+                f.write(data[offset:offset + size])
+                f.flush()
+                offset += size
+                live.refresh()
+        live.refresh(final=True)
+        assert live.frame()[COLUMNS].equals(parse_match(large_match_data))
+
+    def test_complete_runs_without_waiting(self, tmp_path):
+        """Test that wait_for_next=False still waits for all of the runs"""
+        path = tmp_path / 'live.yaml'
+        cut = CRICSHEET_STYLE.index('              total: 1\n        - 0.3:')
+        path.write_text(CRICSHEET_STYLE[:cut])
+        live = LiveMatchFile(str(path), wait_for_next=False)
+        assert live.refresh() == 1
+        path.write_text(CRICSHEET_STYLE[:cut] + '              total: 1\n')
+        assert live.refresh() == 1
+        assert live.frame()['runs_total'].tolist() == [4, 1]
+
+    def test_replaced_file(self, tmp_path):
+        """Test that a file that shrinks is read again from the start"""
+        path = tmp_path / 'live.yaml'
+        path.write_text(CRICSHEET_STYLE)
+        live = LiveMatchFile(str(path))
+        assert live.refresh(final=True) == 5
+        first = yaml.safe_load(CRICSHEET_STYLE)
+        del first['innings'][1]
+        path.write_text(yaml.dump(first))
+        assert live.refresh(final=True) == 3
+        assert len(live) == 3
+
+    @pytest.mark.performance
+    def test_incremental_benchmark(self, tmp_path, large_match_data):
+        """Benchmark following a growing file against reparsing it after every ball"""
+        path = tmp_path / 'live.yaml'
+        text = yaml.dump(large_match_data)
+        header, _, body = text.partition('- 1st innings:\n')
+        chunks = body.split('    - ')
+        prefix = header + '- 1st innings:\n' + chunks[0]
+        deliveries = ['    - ' + chunk for chunk in chunks[1:]]
+
+        path.write_text(prefix)
+        start = time.perf_counter()
+        live = LiveMatchFile(str(path))
+        with open(path, 'a') as f:
+            for delivery in deliveries:
+                f.write(delivery)
+                f.flush()
+                live.refresh()
+        live.refresh(final=True)
+        incremental = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for n in range(1, len(deliveries) + 1):
+            parse_match(yaml_loads(prefix + ''.join(deliveries[:n])))
+        reparse = time.perf_counter() - start
+        print(f'\nincremental: {incremental * 1e3:.0f} ms, reparse: {reparse * 1e3:.0f} ms '
+              f'for {len(deliveries)} balls')
+        assert len(live) == 120
+        assert incremental < reparse
@@ -0,0 +1,99 @@
+"""
+Test suite for cricpy.profiling module
+"""
+import json
+import os
+import subprocess
+import sys
+import pytest
+import yaml
+from cricpy import profiling
+from cricpy.io.file_loader import load_all_yaml
+from cricpy.parsers.cricsheet_parser import parse_match
+from cricpy.profiling import profile, profiled, stage
+
+
+class TestProfiler:
+    """Test cases for the Profiler"""
+
+    def test_disabled_by_default(self):
+        """Test that nothing is active and stage() is a shared no-op"""
+        assert profiling.active_profiler() is None
+        assert stage('a') is stage('b')
+
+    def test_records_pipeline_stages(self, sample_yaml_files, sample_match_data):
+        """Test that load and parse stages are recorded"""
+        with profile() as prof:
+            matches = load_all_yaml(str(sample_yaml_files))
+            parse_match(sample_match_data)
+
+        stages = prof.as_dict()
+        assert len(matches) == 3
+        assert stages['load_all_yaml']['count'] == 1
+        assert stages['load_yaml']['count'] == 3
+        assert stages['read']['count'] == 3
+        assert stages['yaml.decode']['count'] == 3
+        assert stages['parse_match']['count'] == 1
+        assert stages['parse_match.rows']['count'] == 1
+        assert stages['parse_match.frame']['count'] == 1
+        assert stages['load_all_yaml']['wall'] >= stages['load_yaml']['wall']
+        assert 'load_all_yaml' in prof.report()
+        assert profiling.active_profiler() is None
+
+    def test_memory_and_chrome_trace(self, tmp_path, large_match_data):
+        """Test tracemalloc accounting and Chrome trace output"""
+        trace = tmp_path / 'trace.json'
+        with profile(trace_memory=True, chrome_trace=str(trace)) as prof:
+            parse_match(large_match_data)
+
+        assert prof.as_dict()['parse_match']['peak_bytes'] > 0
+        events = json.loads(trace.read_text())['traceEvents']
+        names = {e['name'] for e in events}
+        assert {'parse_match', 'parse_match.rows', 'parse_match.frame'} <= names
+        assert all(e['ph'] == 'X' and e['dur'] >= 0 for e in events)
+
+    def test_profiled_decorator_records_failures(self):
+        """Test that a raising stage is still recorded"""
+        @profiled('boom')
+        def boom():
+            raise ValueError('x')
+
+        with profile() as prof:
+            try:
+                boom()
+            except ValueError:
+                pass
+        assert prof.as_dict()['boom']['count'] == 1
+
+    def test_environment_flag(self, tmp_path):
+        """Test CRICPY_PROFILE reports at process exit"""
+        match_file = tmp_path / 'm.yaml'
+        match_file.write_text(yaml.dump({'innings': []}))
+        trace = tmp_path / 'trace.json'
+        env = dict(os.environ, CRICPY_PROFILE='1', CRICPY_PROFILE_TRACE=str(trace))
+        code = f'from cricpy.io.file_loader import load_yaml; load_yaml({str(match_file)!r})'
+        result = subprocess.run([sys.executable, '-c', code], env=env,
+                                capture_output=True, text=True, check=True)
+        assert 'load_yaml' in result.stderr
+        assert trace.exists()
+
+    @pytest.mark.parametrize('value', ['0', 'false', 'No', ''])
+    def test_environment_flag_off(self, tmp_path, value):
+        """Test that CRICPY_PROFILE=0 and the like leave profiling off"""
+        trace = tmp_path / 'trace.json'
+        env = dict(os.environ, CRICPY_PROFILE=value, CRICPY_PROFILE_TRACE=str(trace))
+        code = 'from cricpy import profiling; print(profiling._active is None)'
+        result = subprocess.run([sys.executable, '-c', code], env=env,
+                                capture_output=True, text=True, check=True)
+        assert result.stdout.strip() == 'True'
+        assert result.stderr == ''
+        assert not trace.exists()
+
+    @pytest.mark.parametrize('value, expected', [
+        ('1', True), ('TRUE', True), (' yes ', True), ('on', True),
+        ('0', False), ('false', False), ('off', False), ('', False),
+    ])
+    def test_env_flag(self, monkeypatch, value, expected):
+        """Test parsing boolean environment variables"""
+        monkeypatch.setenv('CRICPY_PROFILE_MEMORY', value)
+        assert profiling._env_flag('CRICPY_PROFILE_MEMORY') is expected
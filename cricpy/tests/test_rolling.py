@@ -0,0 +1,142 @@
+"""
+Test suite for cricpy.stats.rolling module
+"""
+import numpy as np
+import pandas as pd
+import pytest
+from cricpy.stats.chunked import iter_chunks
+from cricpy.io.file_loader import BallKey
+from cricpy.stats.rolling import batting_form, bowling_form, rolling_sums
+
+
+@pytest.fixture
+def deliveries():
+    """Random deliveries of 40 matches between a handful of players"""
+    rng = np.random.RandomState(7)
+    n_matches, balls = 40, 30
+    n = n_matches * balls
+    match = np.repeat(np.arange(n_matches), balls)
+    extras = rng.choice([None, 'wides', 'noballs', 'byes', 'legbyes'], n,
+                        p=[.8, .05, .05, .05, .05])
+    runs_extras = np.where(extras == None, 0, 1)  # noqa: E711
+    runs_batter = np.where(np.isin(extras, ['wides', 'byes', 'legbyes']), 0,
+                           rng.choice([0, 1, 2, 4, 6], n))
+    return pd.DataFrame({
+        'match_id': [f'm{i:02d}' for i in match],
+        # dates are out of match_id order to check ordering by date
+        'date': [f'2024-{1 + (i * 7) % 12:02d}-{1 + i % 28:02d}' for i in match],
+        'inning': np.where(np.arange(n) % balls < balls // 2, '1st innings', '2nd innings'),
+        'over': (np.arange(n) % balls) // 6,
+        'batsman': rng.choice(['A', 'B', 'C', 'D'], n),
+        'bowler': rng.choice(['P', 'Q', 'R'], n),
+        'runs_batter': runs_batter,
+        'runs_extras': runs_extras,
+        'runs_total': runs_batter + runs_extras,
+        'extras_type': extras,
+        'dismissal': rng.choice([None, 'bowled', 'run out', 'retired hurt'], n,
+                                p=[.9, .06, .02, .02]),
+    })
+
+
+class TestRollingSums:
+    """Test cases for the cumulative-sum window kernel"""
+
+    def test_windows_restart_per_key(self):
+        """Test that windows never reach into the previous key"""
+        sums, counts = rolling_sums(['a', 'a', 'a', 'b', 'b'], [1, 2, 3, 10, 20], window=2)
+        assert sums.tolist() == [1, 3, 5, 10, 30]
+        assert counts.tolist() == [1, 2, 2, 1, 2]
+
+    def test_invalid_window(self):
+        """Test that empty windows are rejected"""
+        with pytest.raises(ValueError):
+            rolling_sums(['a'], [1], window=0)
+
+
+class TestBattingForm:
+    """Test cases for rolling batting form"""
+
+    def test_matches_per_player_rolling(self, deliveries):
+        """Test against a per-player groupby-rolling reference"""
+        form = batting_form(deliveries, window=3)
+
+        df = deliveries.assign(balls=(deliveries['extras_type'] != 'wides').astype(int),
+                               outs=deliveries['dismissal'].isin(['bowled', 'run out']).astype(int))
+        innings = df.groupby(['batsman', 'match_id', 'inning'], sort=False).agg(
+            date=('date', 'first'), runs=('runs_batter', 'sum'), balls=('balls', 'sum'),
+            outs=('outs', 'sum')).reset_index()
+        innings = innings.sort_values(['batsman', 'date', 'match_id', 'inning'], kind='stable')
+        expected = innings.groupby('batsman')[['runs', 'balls', 'outs']].rolling(
+            3, min_periods=1).sum()
+
+        assert form[['batsman', 'match_id', 'inning']].values.tolist() == \
+            innings[['batsman', 'match_id', 'inning']].values.tolist()
+        for column in ('runs', 'balls', 'outs'):
+            assert form[f'window_{column}'].tolist() == expected[column].tolist()
+        last = form.iloc[-1]
+        assert last['strike_rate'] == pytest.approx(
+            100 * last['window_runs'] / last['window_balls'])
+
+    def test_dates_from_mapping(self, sample_match_data, large_match_data):
+        """Test supplying match dates from match metadata"""
+        chunk = next(iter_chunks([('x', sample_match_data), ('y', large_match_data)]))
+        with pytest.raises(ValueError):
+            batting_form(chunk)
+        form = batting_form(chunk, window=5, dates={'x': '2024-01-01', 'y': '2023-01-01'})
+        rohit = form[form['batsman'] == 'Rohit Sharma']
+        assert rohit['runs'].tolist() == [4]
+        assert rohit['average'].isna().all()
+
+    def test_outs_credited_to_player_out(self):
+        """Test a non-striker run out and a retirement"""
+        balls = [
+            {'batsman': 'A', 'non_striker': 'B', 'bowler': 'X',
+             'runs': {'batsman': 1, 'extras': 0, 'total': 1},
+             'wicket': {'kind': 'run out', 'player_out': 'B'}},
+            {'batsman': 'A', 'non_striker': 'C', 'bowler': 'X',
+             'runs': {'batsman': 2, 'extras': 0, 'total': 2}},
+            {'batsman': 'A', 'non_striker': 'C', 'bowler': 'X',
+             'runs': {'batsman': 0, 'extras': 0, 'total': 0},
+             'wicket': {'kind': 'retired hurt', 'player_out': 'A'}},
+        ]
+        match = {'info': {'teams': ['P', 'Q'], 'dates': ['2024-01-01']}, 'innings': [
+            {'1st innings': {'team': 'P', 'deliveries': [
+                {BallKey(float(f'0.{i}'), f'0.{i}'): ball} for i, ball in enumerate(balls, 1)
+            ]}},
+        ]}
+        chunk = next(iter_chunks([('m', match)], info_columns=('date',)))
+        form = batting_form(chunk).set_index('batsman')
+        assert form[['runs', 'balls', 'outs']].to_dict('index') == {
+            'A': {'runs': 3, 'balls': 3, 'outs': 0},
+            'B': {'runs': 0, 'balls': 0, 'outs': 1},
+        }
+        assert np.isnan(form.loc['A', 'average'])
+        assert form.loc['B', 'average'] == 0
+
+
+class TestBowlingForm:
+    """Test cases for rolling bowling form"""
+
+    def test_economy_by_match(self, deliveries):
+        """Test bowler runs and legal balls in the last N matches"""
+        form = bowling_form(deliveries, window=4)
+        for bowler, rows in form.groupby('bowler'):
+            assert rows['date'].tolist() == sorted(rows['date'])
+            assert rows['window_size'].max() == 4
+        row = form.iloc[10]
+        previous = form.iloc[7:11]
+        assert (previous['bowler'] == row['bowler']).all()
+        assert row['window_runs'] == previous['runs'].sum()
+        assert row['economy'] == pytest.approx(6 * previous['runs'].sum() / previous['balls'].sum())
+
+    def test_by_over(self, deliveries):
+        """Test over windows and the excluded extras and dismissals"""
+        form = bowling_form(deliveries, window=6, unit='over')
+        legal = ~deliveries['extras_type'].isin(['wides', 'noballs'])
+        assert form['balls'].sum() == legal.sum()
+        byes = deliveries['extras_type'].isin(['byes', 'legbyes'])
+        byes_runs = deliveries.loc[byes, 'runs_extras'].sum()
+        assert form['runs'].sum() == deliveries['runs_total'].sum() - byes_runs
+        assert form['wickets'].sum() == (deliveries['dismissal'] == 'bowled').sum()
+        with pytest.raises(ValueError):
+            bowling_form(deliveries, unit='season')
@@ -0,0 +1,126 @@
+"""
+Test suite for cricpy.stats.scorecard module
+"""
+import json
+import os
+
+import pandas as pd
+import pytest
+from cricpy.cli import main
+from cricpy.io.corpus import build_corpus
+from cricpy.parsers.cricsheet_parser import parse_info, parse_match
+from cricpy.stats.scorecard import corpus_scorecards, scorecards, write_json, write_parquet
+
+
+@pytest.fixture
+def matches(sample_match_data, match_with_all_dismissal_types, match_with_all_extras_types,
+            large_match_data):
+    return [('a', sample_match_data), ('b', match_with_all_dismissal_types),
+            ('c', match_with_all_extras_types), ('d', large_match_data)]
+
+
+@pytest.fixture
+def cards(matches):
+    deliveries = pd.concat(
+        [parse_match(m, schema='full').assign(match_id=i) for i, m in matches], ignore_index=True)
+    metadata = [dict(parse_info(m), match_id=i) for i, m in matches]
+    return scorecards(deliveries, metadata)
+
+
+class TestScorecards:
+    """Test cases for batch scorecards"""
+
+    def test_innings_totals(self, cards, matches):
+        """Test innings totals against per-match sums"""
+        innings = cards.innings.set_index('match_id')
+        for match_id, match in matches:
+            df = parse_match(match)
+            assert innings.loc[match_id, 'runs'] == df['runs_total'].sum()
+        assert innings.loc['c', 'overs'] == '0.3'
+        assert innings.loc['b', 'wickets'] == 9
+
+    def test_batting_card(self, cards):
+        """Test batting order, balls faced and dismissal credits"""
+        batting = cards.batting[cards.batting['match_id'] == 'b'].set_index('player')
+        assert list(batting.index[:3]) == ['Batsman 1', 'Batsman 2', 'Batsman 3']
+        assert batting.loc['Batsman 2', 'how_out'] == 'caught'
+        assert batting.loc['Batsman 2', 'dismissed_by'] == 'Bowler 2'
+        assert batting.loc['Batsman 2', 'fielder'] == 'Fielder 1'
+        assert pd.isna(batting.loc['Batsman 4', 'dismissed_by'])
+        assert batting['out'].sum() == 9
+
+        rohit = cards.batting[cards.batting['match_id'] == 'a'].iloc[0]
+        assert (rohit['runs'], rohit['balls'], rohit['fours']) == (4, 2, 1)
+        assert rohit['strike_rate'] == 200.0
+
+    def test_bowling_and_extras(self, cards):
+        """Test that bowlers are not charged byes, leg-byes or penalties"""
+        bowler = cards.bowling[cards.bowling['match_id'] == 'c'].iloc[0]
+        assert (bowler['balls'], bowler['runs'], bowler['wides'], bowler['noballs']) == (3, 2, 1, 1)
+        extras = cards.extras.set_index('match_id').loc['c']
+        assert extras[['wides', 'noballs', 'byes', 'legbyes', 'penalty', 'total']].tolist() == \
+            [1, 1, 2, 1, 5, 10]
+
+        large = cards.bowling[cards.bowling['match_id'] == 'd']
+        assert large['balls'].sum() == 120
+        assert large['maidens'].sum() == \
+            (cards.innings.set_index('match_id').loc['d', 'runs'] == 0) * 20
+
+    @pytest.mark.parametrize('extras', [{'noballs': 1, 'byes': 2}, {'byes': 2, 'noballs': 1}])
+    def test_no_ball_with_byes(self, extras):
+        """Test that a no-ball with byes charges the bowler the no-ball only"""
+        match = {'innings': [{'1st innings': {'team': 'X', 'deliveries': [
+            {0.1: {'batsman': 'A', 'bowler': 'B', 'extras': extras,
+                   'runs': {'batsman': 0, 'extras': 3, 'total': 3}}},
+            {0.2: {'batsman': 'A', 'bowler': 'B',
+                   'runs': {'batsman': 1, 'extras': 0, 'total': 1}}},
+        ]}}]}
+        cards = scorecards(parse_match(match, schema='full').assign(match_id='m'))
+        bowler = cards.bowling.iloc[0]
+        assert (bowler['balls'], bowler['runs'], bowler['noballs']) == (1, 2, 1)
+        assert cards.batting.iloc[0]['balls'] == 2
+        extras = cards.extras.iloc[0]
+        assert extras[['noballs', 'byes', 'total']].tolist() == [1, 2, 3]
+
+    def test_fall_of_wickets_and_results(self, cards):
+        """Test wicket numbering, score at each wicket and result lines"""
+        fow = cards.fall_of_wickets[cards.fall_of_wickets['match_id'] == 'b']
+        assert fow['wicket'].tolist() == list(range(1, 10))
+        assert fow['over'].iloc[0] == '0.1'
+        results = cards.results.set_index('match_id')
+        assert results.loc['a', 'summary'] == 'Mumbai Indians won by 10 runs'
+
+
+class TestScorecardOutput:
+    """Test cases for writing scorecards"""
+
+    def test_json_per_match(self, tmp_path, cards):
+        """Test one JSON document per match with nested innings"""
+        assert write_json(cards, str(tmp_path)) == 4
+        with open(tmp_path / 'b.json') as f:
+            document = json.load(f)
+        innings = document['innings'][0]
+        assert document['match_id'] == 'b'
+        assert len(innings['batting']) == 10
+        assert innings['extras']['total'] == 0
+        assert len(innings['fall_of_wickets']) == 9
+        assert 'summary' in document['result']
+
+    def test_parquet_tables(self, tmp_path, cards):
+        """Test one Parquet file per table"""
+        pytest.importorskip('pyarrow')
+        write_parquet(cards, str(tmp_path))
+        assert sorted(os.listdir(tmp_path)) == sorted(f'{name}.parquet' for name in cards._fields)
+        batting = pd.read_parquet(tmp_path / 'batting.parquet')
+        assert len(batting) == len(cards.batting)
+
+    def test_corpus_scorecards_and_cli(self, tmp_path, matches, cards):
+        """Test building scorecards from a corpus and the scorecards command"""
+        corpus = build_corpus(matches, str(tmp_path / 'corpus'))
+        from_corpus = corpus_scorecards(corpus)
+        assert from_corpus.innings['runs'].tolist() == cards.innings['runs'].tolist()
+        assert from_corpus.batting['player'].tolist() == cards.batting['player'].tolist()
+
+        assert main(['scorecards', str(tmp_path / 'corpus'), str(tmp_path / 'json'),
+                     '--format', 'json', '-q']) == 0
+        assert sorted(os.listdir(tmp_path / 'json')) == ['a.json', 'b.json', 'c.json', 'd.json']
@@ -0,0 +1,148 @@
+"""
+Test suite for cricpy.io.shards module and sharded loading
+"""
+import json
+import os
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pytest
+import yaml
+from cricpy.cli import main
+from cricpy.io.corpus import build_corpus, open_corpus
+from cricpy.io.file_loader import iter_match_files, iter_matches, load_all_yaml, shard_of
+from cricpy.io.shards import ingest_shard, merge_shards, shard_dirname
+
+
+def _write_archive(folder, matches):
+    folder.mkdir()
+    for i, match in enumerate(matches):
+        with open(folder / f'{1000 + i}.yaml', 'w') as f:
+            yaml.dump(match, f)
+    return str(folder)
+
+
+@pytest.fixture
+def archive(tmp_path, sample_match_data, large_match_data, match_with_all_dismissal_types,
+            match_with_all_extras_types):
+    matches = [sample_match_data, large_match_data, match_with_all_dismissal_types,
+               match_with_all_extras_types] * 3
+    return _write_archive(tmp_path / 'archive', matches)
+
+
+def _ingest(task):
+    src, dst, shard_index, num_shards = task
+    return ingest_shard(src, dst, shard_index, num_shards)
+
+
+def _assert_same_corpus(left, right):
+    assert left.manifest['n_deliveries'] == right.manifest['n_deliveries']
+    assert left.matches.astype(str).equals(right.matches.astype(str))
+    assert left.to_pandas().astype(str).equals(right.to_pandas().astype(str))
+    for table in ('wickets', 'fielders'):
+        assert left.table(table).astype(str).equals(right.table(table).astype(str))
+
+
+class TestShardAssignment:
+    """Test cases for deterministic shard assignment"""
+
+    def test_shard_of_is_stable(self):
+        """Test that assignment depends only on the base name"""
+        assert shard_of('1000.yaml', 4) == shard_of('/a/b/1000.yaml', 4)
+        assert shard_of('1000.yaml', 4) == zlib.crc32(b'1000.yaml') % 4
+        assert [shard_of(f'{i}.yaml', 7) for i in range(5)] == \
+            [shard_of(f'{i}.yaml', 7) for i in range(5)]
+        assert all(0 <= shard_of(f'{i}.json', 3) < 3 for i in range(50))
+
+    def test_shards_partition_the_archive(self, archive):
+        """Test that every file belongs to exactly one shard"""
+        everything = list(iter_match_files(archive))
+        shards = [list(iter_match_files(archive, shard_index=i, num_shards=3)) for i in range(3)]
+        assert sorted(p for shard in shards for p in shard) == everything
+
+        loaded = [name for i in range(3)
+                  for name, _ in load_all_yaml(archive, shard_index=i, num_shards=3)]
+        assert sorted(loaded) == sorted(os.path.basename(p) for p in everything)
+
+    @pytest.mark.parametrize('shard_index,num_shards', [
+        (0, None), (None, 2), (2, 2), (-1, 2), (0, 0),
+    ])
+    def test_invalid_shard(self, archive, shard_index, num_shards):
+        """Test that incomplete or out-of-range shard arguments are rejected"""
+        with pytest.raises(ValueError):
+            list(iter_matches(archive, shard_index=shard_index, num_shards=num_shards))
+
+
+class TestMergeShards:
+    """Test cases for ingesting shards and merging them"""
+
+    def test_merge_matches_single_node_build(self, tmp_path, archive):
+        """Test that shards ingested in parallel merge into the single-node corpus"""
+        num_shards = 3
+        dirs = [str(tmp_path / shard_dirname(i, num_shards)) for i in range(num_shards)]
+        with ProcessPoolExecutor(max_workers=num_shards) as executor:
+            manifests = list(executor.map(
+                _ingest, [(archive, d, i, num_shards) for i, d in enumerate(dirs)]))
+        assert sum(m['n_matches'] for m in manifests) == 12
+
+        merged = merge_shards(list(reversed(dirs)), str(tmp_path / 'merged'))
+        single = build_corpus(iter_matches(archive), str(tmp_path / 'single'))
+        _assert_same_corpus(merged, single)
+        assert [m['shard_index'] for m in merged.manifest['merged_from']] == [0, 1, 2]
+
+    def test_row_keys_are_rebased(self, tmp_path, archive):
+        """Test that side tables point at the merged delivery rows"""
+        dirs = [str(tmp_path / f's{i}') for i in range(2)]
+        for i, d in enumerate(dirs):
+            ingest_shard(archive, d, i, 2)
+        merged = merge_shards(dirs, str(tmp_path / 'merged'))
+
+        rows = merged.column('row', 'wickets')
+        assert len(rows) > 0
+        assert np.array_equal(merged.column('dismissal')[rows], merged.column('kind', 'wickets'))
+        assert np.array_equal(merged.column('match_index')[rows],
+                              merged.column('match_index', 'wickets'))
+
+    def test_failed_files_are_recorded(self, tmp_path, archive):
+        """Test that unreadable files end up in the shard manifest"""
+        with open(os.path.join(archive, 'bad.yaml'), 'w') as f:
+            f.write('key: [unclosed')
+        shard = shard_of('bad.yaml', 2)
+        manifest = ingest_shard(archive, str(tmp_path / 's'), shard, 2)
+        assert [f['source'] for f in manifest['failed']] == ['bad.yaml']
+        with open(tmp_path / 's' / 'shard.json') as f:
+            assert json.load(f) == manifest
+
+    def test_rejects_incomplete_or_mixed_shards(self, tmp_path, archive):
+        """Test that missing, duplicated and mismatched shards are rejected"""
+        a = str(tmp_path / 'a')
+        b = str(tmp_path / 'b')
+        c = str(tmp_path / 'c')
+        ingest_shard(archive, a, 0, 2)
+        ingest_shard(archive, b, 0, 2)
+        ingest_shard(archive, c, 1, 3)
+        with pytest.raises(ValueError, match='missing'):
+            merge_shards([a], str(tmp_path / 'm1'))
+        with pytest.raises(ValueError, match='duplicate'):
+            merge_shards([a, b], str(tmp_path / 'm2'))
+        with pytest.raises(ValueError, match='different'):
+            merge_shards([a, c], str(tmp_path / 'm3'))
+
+        partial = merge_shards([a], str(tmp_path / 'm4'), require_complete=False)
+        assert partial.manifest['n_matches'] == len(list(iter_match_files(archive, shard_index=0,
+                                                                          num_shards=2)))
+
+    def test_cli(self, tmp_path, archive, capsys):
+        """Test the ingest-shard and merge-shards commands"""
+        dirs = [str(tmp_path / f's{i}') for i in range(2)]
+        for i, d in enumerate(dirs):
+            assert main(['ingest-shard', archive, d, '--shard-index', str(i),
+                         '--num-shards', '2', '-q']) == 0
+        assert main(['merge-shards'] + dirs + ['-o', str(tmp_path / 'merged'), '-q']) == 0
+        single = build_corpus(iter_matches(archive), str(tmp_path / 'single'))
+        _assert_same_corpus(open_corpus(str(tmp_path / 'merged')), single)
+
+        with pytest.raises(SystemExit) as exc:
+            main(['merge-shards', dirs[0], '-o', str(tmp_path / 'partial')])
+        assert exc.value.code == 2
@@ -0,0 +1,164 @@
+"""
+Test suite for cricpy.stats.similarity module
+"""
+import time
+from unittest.mock import patch
+
+import numpy as np
+import pandas as pd
+import pytest
+from cricpy.io.corpus import build_corpus, open_corpus
+from cricpy.stats import similarity
+from cricpy.stats.similarity import PlayerSimilarity, batting_features
+
+# scoring probabilities of (0, 1, 4, 6) in the powerplay/middle and the death overs
+STYLES = {
+    'anchor': ([0.30, 0.60, 0.08, 0.02], [0.30, 0.60, 0.08, 0.02]),
+    'finisher': ([0.50, 0.40, 0.05, 0.05], [0.20, 0.30, 0.25, 0.25]),
+    'opener': ([0.30, 0.30, 0.30, 0.10], [0.50, 0.40, 0.05, 0.05]),
+}
+
+
+@pytest.fixture
+def deliveries():
+    """Synthetic deliveries of four batters of each style, 240 balls each"""
+    rng = np.random.default_rng(0)
+    frames = []
+    for style, (early, death) in STYLES.items():
+        for n in range(4):
+            over = np.repeat(np.arange(20), 12)
+            runs = np.where(over < 15, rng.choice([0, 1, 4, 6], 240, p=early),
+                            rng.choice([0, 1, 4, 6], 240, p=death))
+            dismissal = np.full(240, None, dtype=object)
+            kind = 'caught' if style != 'anchor' else 'bowled'
+            dismissal[rng.choice(240, 4, replace=False)] = kind
+            frames.append(pd.DataFrame({
+                'batsman': f'{style} {n}', 'over': over, 'runs_batter': runs,
+                'runs_total': runs, 'extras_type': None, 'dismissal': dismissal,
+            }))
+    return pd.concat(frames, ignore_index=True)
+
+
+def _as_match(rows):
+    """Match dict of one batter's deliveries, six to the over"""
+    balls = []
+    for i, (over, runs, dismissal) in enumerate(zip(rows['over'], rows['runs_batter'],
+                                                    rows['dismissal'])):
+        ball = {'batsman': rows['batsman'].iloc[0], 'bowler': 'B', 'non_striker': 'N',
+                'runs': {'batsman': int(runs), 'extras': 0, 'total': int(runs)}}
+        if isinstance(dismissal, str):
+            player_out = ball['batsman']
+            if 'player_out' in rows.columns and isinstance(rows['player_out'].iloc[i], str):
+                player_out = rows['player_out'].iloc[i]
+            ball['wicket'] = {'kind': dismissal, 'player_out': player_out}
+        balls.append({int(over) + (i % 6 + 1) / 10: ball})
+    return {'info': {}, 'innings': [{'1st innings': {'team': 'A', 'deliveries': balls}}]}
+
+
+class TestBattingFeatures:
+    """Test cases for the player feature table"""
+
+    def test_features(self, deliveries):
+        """Test phase-wise and dismissal features"""
+        features = batting_features(deliveries)
+        assert len(features) == 12
+        row = features.loc['anchor 0']
+        rows = deliveries[deliveries['batsman'] == 'anchor 0']
+        death = rows[rows['over'] >= 15]
+        assert row['death_strike_rate'] == pytest.approx(100 * death['runs_batter'].mean())
+        assert row['death_dot_pct'] == pytest.approx((death['runs_batter'] == 0).mean())
+        assert row['death_balls_share'] == pytest.approx(0.25)
+        assert row['dismissal_bowled'] == 1.0 and row['dismissal_other'] == 0.0
+        assert row['balls_per_dismissal'] == 60
+        assert row['balls'] == 240
+
+    def test_dismissals_credit_player_out(self, tmp_path, deliveries):
+        """Test that a non-striker run out counts against the player out"""
+        deliveries['player_out'] = None
+        ran_out = deliveries.index[(deliveries['batsman'] == 'anchor 0')
+                                   & deliveries['dismissal'].isna()][0]
+        deliveries.loc[ran_out, ['dismissal', 'player_out']] = ['run out', 'finisher 0']
+
+        matches = [(f'm{n}', _as_match(rows.reset_index(drop=True)))
+                   for n, (_, rows) in enumerate(deliveries.groupby('batsman', sort=False))]
+        corpus = build_corpus(matches, str(tmp_path / 'corpus'))
+        for features in (batting_features(deliveries), PlayerSimilarity.build(corpus).features):
+            anchor, finisher = features.loc['anchor 0'], features.loc['finisher 0']
+            assert anchor['dismissal_bowled'] == 1.0 and anchor['balls_per_dismissal'] == 60
+            assert finisher['dismissal_run_out'] == pytest.approx(0.2)
+            assert finisher['balls_per_dismissal'] == 48
+
+    def test_min_balls(self, deliveries):
+        """Test that batters with few balls are left out"""
+        assert batting_features(deliveries, min_balls=1000).empty
+
+
+class TestPlayerSimilarity:
+    """Test cases for similarity queries"""
+
+    def test_most_similar(self, deliveries):
+        """Test that nearest neighbours share a batting style"""
+        sim = PlayerSimilarity(batting_features(deliveries))
+        top = sim.most_similar('finisher 0', k=3)
+        assert list(top.index) == sorted(top.index, key=lambda p: -top.loc[p, 'similarity'])
+        assert all(name.startswith('finisher') for name in top.index)
+        assert 'finisher 0' not in top.index
+        assert top['similarity'].iloc[0] <= 1.0 + 1e-6
+
+    def test_phase_query(self, deliveries):
+        """Test that a death-overs query compares death-overs columns only"""
+        sim = PlayerSimilarity(batting_features(deliveries))
+        assert all(name.startswith('opener') for name in sim.most_similar('opener 0', k=3).index)
+        death = sim.most_similar('opener 0', k=7, phase='death')
+        assert {name.split()[0] for name in death.index[:7]} == {'opener', 'anchor'}
+        with pytest.raises(ValueError):
+            sim.most_similar('opener 0', phase='extra time')
+        with pytest.raises(KeyError):
+            sim.most_similar('nobody')
+
+    def test_neighbours(self, deliveries):
+        """Test that the blocked all-pairs query agrees with single queries"""
+        sim = PlayerSimilarity(batting_features(deliveries))
+        indices, scores = sim.neighbours(k=3, block=5)
+        assert indices.shape == (12, 3)
+        for i, player in enumerate(sim.players):
+            top = sim.most_similar(player, k=3)
+            assert list(sim.players[indices[i]]) == list(top.index)
+            assert scores[i] == pytest.approx(top['similarity'].to_numpy())
+
+    def test_cache(self, tmp_path, deliveries):
+        """Test that the feature matrix is cached and rebuilt when the corpus changes"""
+        matches = [(f'm{n}', _as_match(rows))
+                   for n, (_, rows) in enumerate(deliveries.groupby('batsman', sort=False))]
+        build_corpus(matches, str(tmp_path / 'corpus'))
+        corpus = open_corpus(str(tmp_path / 'corpus'))
+        cache = str(tmp_path / 'batting.npz')
+
+        built = PlayerSimilarity.build(corpus, cache=cache)
+        with patch.object(similarity, 'batting_features') as rebuild:
+            cached = PlayerSimilarity.build(open_corpus(str(tmp_path / 'corpus')), cache=cache)
+        assert not rebuild.called
+        pd.testing.assert_frame_equal(cached.features, built.features, check_exact=False)
+        assert list(cached.most_similar('anchor 1', k=3).index) == list(
+            built.most_similar('anchor 1', k=3).index)
+
+        build_corpus(matches[:6], str(tmp_path / 'corpus'), overwrite=True)
+        rebuilt = PlayerSimilarity.build(open_corpus(str(tmp_path / 'corpus')), cache=cache)
+        assert len(rebuilt) == 6
+
+    @pytest.mark.performance
+    def test_query_benchmark(self):
+        """Benchmark top-k queries over a large player table"""
+        rng = np.random.default_rng(0)
+        features = pd.DataFrame(rng.random((20000, 18)),
+                                index=[f'player {i}' for i in range(20000)],
+                                columns=[f'f{i}' for i in range(18)])
+        features['balls'] = 100
+        sim = PlayerSimilarity(features)
+        sim.matrix()
+        start = time.perf_counter()
+        for i in range(100):
+            sim.most_similar(f'player {i}', k=10)
+        per_query = (time.perf_counter() - start) / 100
+        print(f'\ntop-10 query over 20000 players: {per_query * 1e3:.2f} ms')
+        assert per_query < 0.05
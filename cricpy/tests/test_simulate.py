@@ -0,0 +1,169 @@
+"""
+Test suite for cricpy.models.simulate module
+"""
+import bisect
+import random
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+from cricpy.models.simulate import (
+    MAX_WICKETS, OUTCOMES, OutcomeModel, fit_outcome_model, simulate_innings,
+)
+
+
+def _constant_model(outcome, overs=20):
+    """A model where every delivery has the same outcome"""
+    probs = np.zeros((overs, MAX_WICKETS, len(OUTCOMES)))
+    probs[..., OUTCOMES.index(outcome)] = 1.0
+    return OutcomeModel(probs)
+
+
+@pytest.fixture
+def history():
+    """Deliveries of 100 synthetic 20-over innings"""
+    rng = np.random.default_rng(0)
+    n = 100 * 120
+    return pd.DataFrame({
+        'match_id': np.repeat(np.arange(100), 120).astype(str),
+        'inning': '1st innings',
+        'over': np.tile(np.repeat(np.arange(20), 6), 100),
+        'runs_total': rng.choice([0, 1, 2, 4, 6], n, p=[0.35, 0.35, 0.1, 0.12, 0.08]),
+        'extras_type': np.where(rng.random(n) < 0.03, 'wides', None),
+        'dismissal': np.where(rng.random(n) < 0.04, 'bowled', None),
+    })
+
+
+class TestFitOutcomeModel:
+    """Test cases for estimating outcome probabilities"""
+
+    def test_probabilities(self, history):
+        """Test that every state has a distribution close to the data"""
+        model = fit_outcome_model(history, smoothing=0.0001)
+        assert model.probs.shape == (20, MAX_WICKETS, len(OUTCOMES))
+        assert np.allclose(model.probs.sum(axis=-1), 1.0)
+        assert model.counts.sum() == len(history)
+
+        legal = history['extras_type'].isna() & history['dismissal'].isna()
+        fours = (history['runs_total'][legal] == 4).mean() * legal.mean()
+        weights = model.counts / model.counts.sum()
+        four_rate = (model.probs[..., OUTCOMES.index('4')] * weights).sum()
+        assert four_rate == pytest.approx(fours, abs=1e-3)
+
+    def test_wickets_down_and_smoothing(self, history):
+        """Test that wickets are counted per innings and empty states get the over's distribution"""
+        innings = pd.DataFrame({
+            'match_id': ['a', 'a', 'a', 'a', 'b'],
+            'inning': ['1st innings', '1st innings', '2nd innings', '2nd innings', '1st innings'],
+            'over': [0, 0, 0, 0, 0],
+            'runs_total': [0, 4, 0, 1, 6],
+            'extras_type': [None, None, None, None, None],
+            'dismissal': ['bowled', None, 'retired hurt', None, None],
+        })
+        counts = fit_outcome_model(innings, max_overs=1).counts
+        assert counts[0, :2].tolist() == [4, 1]
+
+        model = fit_outcome_model(history)
+        assert model.counts[0, 9] == 0
+        assert model.probs[0, 9] == pytest.approx(model.probs[0, 0], abs=0.05)
+
+        with pytest.raises(ValueError):
+            fit_outcome_model(history, max_overs=0)
+
+
+class TestSimulateInnings:
+    """Test cases for batched innings simulation"""
+
+    def test_deterministic_models(self):
+        """Test innings ends after the overs, at ten wickets and on reaching the target"""
+        sim = simulate_innings(_constant_model('1'), 50, seed=0)
+        assert (sim.runs == 120).all() and (sim.balls == 120).all()
+
+        sim = simulate_innings(_constant_model('W'), 50, runs=30, wickets=4, seed=0)
+        assert (sim.wickets == MAX_WICKETS).all() and (sim.runs == 30).all()
+        assert (sim.balls == 6).all()
+
+        sim = simulate_innings(_constant_model('x1'), 5, max_overs=1, target=12, seed=0)
+        assert (sim.runs == 12).all() and (sim.balls == 0).all()
+        assert sim.win_probability == 1.0
+
+        sim = simulate_innings(_constant_model('4'), 5, runs=150, balls=120, target=151)
+        assert (sim.runs == 150).all() and sim.win_probability == 0.0
+
+    def test_seed_reproducibility(self, history):
+        """Test that a seed fixes the result and different seeds differ"""
+        model = fit_outcome_model(history)
+        first = simulate_innings(model, 2000, seed=42)
+        second = simulate_innings(model, 2000, seed=42)
+        other = simulate_innings(model, 2000, seed=43)
+        assert np.array_equal(first.runs, second.runs)
+        assert np.array_equal(first.wickets, second.wickets)
+        assert not np.array_equal(first.runs, other.runs)
+
+    def test_outcome_distribution(self, history):
+        """Test the score distribution against the historical innings"""
+        model = fit_outcome_model(history)
+        sim = simulate_innings(model, 20000, seed=1)
+        totals = history.groupby('match_id')['runs_total'].sum()
+        assert sim.runs.mean() == pytest.approx(totals.mean(), rel=0.05)
+        distribution = sim.runs_distribution()
+        assert distribution.sum() == pytest.approx(1.0)
+        assert distribution.index.is_monotonic_increasing
+        quantiles = sim.quantiles()
+        assert quantiles.is_monotonic_increasing
+        summary = sim.summary()
+        assert summary['simulations'] == 20000 and summary['win_probability'] is None
+
+    def test_chase(self, history):
+        """Test that a chase's win probability falls with the target"""
+        model = fit_outcome_model(history)
+        easy = simulate_innings(model, 5000, runs=100, wickets=2, balls=60, target=150, seed=3)
+        hard = simulate_innings(model, 5000, runs=100, wickets=2, balls=60, target=250, seed=3)
+        assert easy.win_probability > 0.9 > 0.1 > hard.win_probability
+        assert easy.runs.max() <= 150 + 6
+
+    def test_invalid_arguments(self, history):
+        """Test argument validation"""
+        model = fit_outcome_model(history)
+        with pytest.raises(ValueError):
+            simulate_innings(model, 10, engine='cuda')
+        with pytest.raises(ValueError):
+            simulate_innings(model, 0)
+        with pytest.raises(ValueError):
+            OutcomeModel(np.ones((20, 11, 3)))
+
+    def test_numba_engine(self, history):
+        """Test that the compiled engine agrees in distribution"""
+        pytest.importorskip('numba')
+        model = fit_outcome_model(history)
+        compiled = simulate_innings(model, 20000, seed=5, engine='numba')
+        vectorized = simulate_innings(model, 20000, seed=5)
+        again = simulate_innings(model, 20000, seed=5, engine='numba')
+        assert np.array_equal(compiled.runs, again.runs)
+        assert compiled.runs.mean() == pytest.approx(vectorized.runs.mean(), rel=0.01)
+
+    @pytest.mark.performance
+    def test_simulation_benchmark(self, history):
+        """Benchmark the vectorized simulator against a per-simulation Python loop"""
+        model = fit_outcome_model(history)
+        cum = model.cumulative()
+
+        def python_loop(n_sims):
+            rng = random.Random(0)
+            for _ in range(n_sims):
+                runs = wickets = balls = 0
+                while balls < 120 and wickets < MAX_WICKETS:
+                    k = bisect.bisect_left(cum[balls // 6, wickets].tolist(), rng.random())
+                    runs += int(k < 7) * k + int(k > 7) * (k - 7)
+                    wickets += int(k == 7)
+                    balls += int(k <= 7)
+
+        start = time.perf_counter()
+        python_loop(2000)
+        loop_rate = 2000 / (time.perf_counter() - start)
+        start = time.perf_counter()
+        simulate_innings(model, 50000, seed=0)
+        vector_rate = 50000 / (time.perf_counter() - start)
+        print(f'\npython loop: {loop_rate:,.0f} sims/s, vectorized: {vector_rate:,.0f} sims/s')
+        assert vector_rate > 5 * loop_rate
@@ -0,0 +1,136 @@
+"""
+Test suite for cricpy.synthetic module
+"""
+import json
+import os
+import time
+import zipfile
+
+import pytest
+from cricpy.cli import main
+from cricpy.io.file_loader import iter_matches, load_match
+from cricpy.parsers.cricsheet_parser import parse_match
+from cricpy.parsers.validation import validate_match
+from cricpy.synthetic import (
+    FORMATS, iter_synthetic_matches, squad, synthetic_match, write_synthetic_corpus,
+)
+
+
+class TestSyntheticMatches:
+    """Test cases for generated match dictionaries"""
+
+    def test_reproducible(self):
+        """Test that a seed reproduces a corpus and any match can be made alone"""
+        first = list(iter_synthetic_matches(5, seed=3, formats=('T20', 'ODI')))
+        assert first == list(iter_synthetic_matches(5, seed=3, formats=('T20', 'ODI')))
+        assert first != list(iter_synthetic_matches(5, seed=4, formats=('T20', 'ODI')))
+        assert synthetic_match(seed=3, index=4, formats=('T20', 'ODI')) == first[4][1]
+        assert list(iter_synthetic_matches(2, seed=3, formats=('T20', 'ODI'), start=3)) == first[3:]
+        assert len({match_id for match_id, _ in first}) == 5
+
+    @pytest.mark.parametrize('name', sorted(FORMATS))
+    def test_formats(self, name):
+        """Test that every format gives valid, consistent matches"""
+        spec = FORMATS[name]
+        for _, match in iter_synthetic_matches(20, seed=1, formats=name):
+            info = match['info']
+            assert validate_match(match) == []
+            assert info['match_type'] == spec.match_type
+            people = info['registry']['people']
+            for team, players in info['players'].items():
+                assert len(players) == 11 and set(players) <= set(squad(team))
+                assert set(players) <= set(people)
+
+            df = parse_match(match)
+            assert len(match['innings']) <= spec.innings
+            totals = df.groupby('batting_team', sort=False)['runs_total'].sum()
+            for _, inning in df.groupby('inning', sort=False):
+                assert inning['dismissal'].notna().sum() <= 10
+                legal = ~inning['extras_type'].isin(['wides', 'noballs'])
+                per_over = legal.groupby(inning['over']).sum()
+                assert per_over.max() <= spec.balls_per_over
+                if spec.overs is not None:
+                    assert inning['over'].max() < spec.overs
+
+            outcome = info['outcome']
+            if 'winner' in outcome and 'wickets' in outcome['by']:
+                assert outcome['winner'] == df['batting_team'].iloc[-1]
+                assert totals[outcome['winner']] > totals.drop(outcome['winner']).iloc[0]
+            elif 'winner' in outcome:
+                loser = [t for t in info['teams'] if t != outcome['winner']][0]
+                assert totals[outcome['winner']] - totals[loser] == outcome['by']['runs']
+
+    def test_realistic_scoring(self):
+        """Test that T20 scoring, extras and dismissals are in realistic ranges"""
+        frames = [parse_match(m) for _, m in iter_synthetic_matches(100, seed=2)]
+        first_innings = [df[df['inning'] == '1st innings']['runs_total'].sum() for df in frames]
+        assert 130 < sum(first_innings) / len(first_innings) < 190
+        extras = {kind for df in frames for kind in df['extras_type'].dropna()}
+        assert extras == {'wides', 'noballs', 'byes', 'legbyes'}
+        dismissals = {kind for df in frames for kind in df['dismissal'].dropna()}
+        assert {'caught', 'bowled', 'lbw', 'run out', 'stumped'} <= dismissals
+
+    def test_json_layout(self):
+        """Test that both layouts parse to the same deliveries"""
+        yaml_match = synthetic_match(seed=5, formats='Test')
+        json_match = synthetic_match(seed=5, formats='Test', layout='json')
+        assert json.loads(json.dumps(json_match)) == json_match
+        assert parse_match(yaml_match).equals(parse_match(json_match))
+
+    def test_invalid_arguments(self):
+        """Test rejecting unknown formats and layouts"""
+        with pytest.raises(ValueError):
+            synthetic_match(formats='T10')
+        with pytest.raises(ValueError):
+            synthetic_match(layout='xml')
+        with pytest.raises(ValueError):
+            write_synthetic_corpus('out', 1, file_format='csv')
+
+
+class TestSyntheticCorpus:
+    """Test cases for writing synthetic corpora"""
+
+    def test_yaml_and_json_files(self, tmp_path):
+        """Test that written files load back as the generated matches"""
+        expected = dict(iter_synthetic_matches(6, seed=8, formats=tuple(FORMATS)))
+        write_synthetic_corpus(str(tmp_path / 'yaml'), 6, seed=8, formats=tuple(FORMATS))
+        assert dict(iter_matches(str(tmp_path / 'yaml'))) == expected
+
+        paths = write_synthetic_corpus(str(tmp_path / 'json'), 6, seed=8, formats=tuple(FORMATS),
+                                       file_format='json')
+        expected_json = dict(iter_synthetic_matches(6, seed=8, formats=tuple(FORMATS),
+                                                    layout='json'))
+        for path in paths:
+            match_id = os.path.splitext(os.path.basename(path))[0]
+            assert load_match(path) == json.loads(json.dumps(expected_json[match_id]))
+
+    def test_zip_and_workers(self, tmp_path):
+        """Test zip output, identical for any number of workers"""
+        single = write_synthetic_corpus(str(tmp_path / 'one.zip'), 10, seed=1, file_format='zip')[0]
+        pooled = write_synthetic_corpus(str(tmp_path / 'two.zip'), 10, seed=1, file_format='zip',
+                                        workers=2)[0]
+        with zipfile.ZipFile(single) as a, zipfile.ZipFile(pooled) as b:
+            assert len(a.namelist()) == 10
+            assert [a.read(n) for n in a.namelist()] == [b.read(n) for n in b.namelist()]
+
+    def test_fixture_and_cli(self, synthetic_corpus, tmp_path):
+        """Test the conftest fixture and the synthesize command write the same corpus"""
+        folder = synthetic_corpus(count=5, seed=2)
+        args = ['synthesize', str(tmp_path / 'cli'), '--matches', '5', '--seed', '2', '-q']
+        assert main(args) == 0
+        assert sorted(os.listdir(folder)) == sorted(os.listdir(tmp_path / 'cli'))
+        for name in os.listdir(folder):
+            assert (folder / name).read_bytes() == (tmp_path / 'cli' / name).read_bytes()
+        with pytest.raises(SystemExit):
+            main(['synthesize', str(tmp_path / 'bad'), '--formats', 'T10', '-q'])
+
+    @pytest.mark.performance
+    def test_generation_benchmark(self, tmp_path):
+        """Benchmark writing a synthetic T20 corpus"""
+        start = time.perf_counter()
+        write_synthetic_corpus(str(tmp_path / 'corpus'), 2000, seed=0)
+        elapsed = time.perf_counter() - start
+        balls = sum(len(parse_match(m)) for _, m in iter_synthetic_matches(100, seed=0)) / 100
+        print(f'\n2000 T20 matches in {elapsed:.2f}s ({2000 / elapsed:.0f} matches/s, '
+              f'~{2000 * balls / elapsed:.0f} balls/s)')
+        assert elapsed < 20
@@ -0,0 +1,161 @@
+"""
+Test suite for cricpy.parsers.validation module
+"""
+import copy
+import json
+
+import pytest
+import yaml
+from cricpy.cli import main
+from cricpy.parsers.cricsheet_parser import parse_info, parse_match
+from cricpy.parsers.validation import MatchValidationError, check_match, validate_match
+
+
+def _json_match():
+    return {
+        'info': {'match_type': 'T20', 'teams': ['X', 'Y'], 'dates': ['2022-05-01']},
+        'innings': [{'team': 'X', 'overs': [{'over': 0, 'deliveries': [
+            {'batter': 'A', 'bowler': 'B', 'runs': {'batter': 1, 'extras': 1, 'total': 2},
+             'extras': {'wides': 1}, 'wickets': [{'kind': 'bowled', 'player_out': 'A'}]},
+        ]}]}],
+    }
+
+
+def _first_ball(match):
+    delivery = match['innings'][0]['1st innings']['deliveries'][0]
+    return next(iter(delivery.values()))
+
+
+class TestValidateMatch:
+    """Test cases for structural validation"""
+
+    def test_valid_matches(self, sample_match_data, large_match_data):
+        """Test that well-formed YAML and JSON layouts have no issues"""
+        assert validate_match(sample_match_data) == []
+        assert validate_match(large_match_data) == []
+        assert validate_match(_json_match()) == []
+        check_match(_json_match())
+
+    @pytest.mark.parametrize('mutate, code', [
+        (lambda m: m['info'].pop('teams'), 'missing_field'),
+        (lambda m: m['info'].update(venue=7), 'wrong_type'),
+        (lambda m: _first_ball(m).pop('bowler'), 'missing_field'),
+        (lambda m: _first_ball(m)['runs'].update(total=99), 'bad_runs'),
+        (lambda m: _first_ball(m)['runs'].update(batsman=-1), 'bad_runs'),
+        (lambda m: _first_ball(m).update(extras={'overthrows': 4}), 'unknown_extras'),
+        (lambda m: _first_ball(m).update(wicket='bowled'), 'wrong_type'),
+        (lambda m: m['innings'][0]['1st innings']['deliveries'].append({'x': {}}),
+         'bad_ball_number'),
+        (lambda m: m['innings'].append(['not', 'a', 'mapping']), 'not_a_mapping'),
+    ])
+    def test_issue_codes(self, sample_match_data, mutate, code):
+        """Test that each kind of problem is classified"""
+        match = copy.deepcopy(sample_match_data)
+        mutate(match)
+        assert [issue.code for issue in validate_match(match)][:1] == [code]
+
+    def test_json_layout_issues(self):
+        """Test issues found in the JSON layout, with their location"""
+        match = _json_match()
+        delivery = match['innings'][0]['overs'][0]['deliveries'][0]
+        delivery['wickets'] = [{'player_out': 'A'}]
+        issues = validate_match(match)
+        assert [(i.code, i.where) for i in issues] == [
+            ('missing_field', '$.innings[0].overs[0].deliveries[0]')]
+
+    def test_not_a_match(self):
+        """Test documents that are not mappings at all"""
+        assert validate_match(None)[0].code == 'not_a_mapping'
+        assert validate_match({'innings': {}})[0].code == 'missing_field'
+
+    def test_max_issues(self, sample_match_data):
+        """Test that checking stops after max_issues"""
+        match = copy.deepcopy(sample_match_data)
+        for delivery in match['innings'][0]['1st innings']['deliveries']:
+            next(iter(delivery.values()))['runs']['total'] = -1
+        assert len(validate_match(match, max_issues=1)) == 1
+
+        with pytest.raises(MatchValidationError) as exc:
+            check_match(match)
+        assert exc.value.code == 'bad_runs'
+        assert 'more' in str(exc.value)
+
+    def test_parse_match_validate(self, sample_match_data):
+        """Test that parse_match(validate=True) rejects malformed matches"""
+        expected = len(parse_match(sample_match_data))
+        assert len(parse_match(sample_match_data, validate=True)) == expected
+        match = copy.deepcopy(sample_match_data)
+        _first_ball(match)['runs'] = 'four'
+        with pytest.raises(MatchValidationError):
+            parse_match(match, validate=True)
+
+    @pytest.mark.parametrize('layout, change, valid', [
+        ('yaml', [{'kind': 'run out', 'player_out': 'A', 'fielders': ['F']}], True),
+        ('yaml', {'kind': 'caught', 'player_out': 'A', 'fielders': [{'name': 'F'}]}, True),
+        ('yaml', {'kind': 'caught', 'player_out': 'A', 'fielders': [{'role': 'keeper'}]}, False),
+        ('yaml', {'kind': 'caught', 'player_out': 'A', 'fielders': [3]}, False),
+        ('json', [{'kind': 'caught', 'player_out': 'A', 'fielders': ['F']}], True),
+        ('json', [{'kind': 'caught', 'player_out': 'A', 'fielders': [None]}], False),
+        ('json', [{'kind': 'caught', 'player_out': 'A', 'fielders': [{'name': None}]}], False),
+        ('yaml', {'review': {'by': 'X', 'decision': 'struck down'}}, True),
+        ('yaml', {'review': 'x'}, False),
+        ('json', {'review': ['x']}, False),
+        ('yaml', {'replacements': {'match': [{'in': 'C', 'out': 'A'}]}}, True),
+        ('json', {'replacements': [{'role': [{'in': 'C', 'role': 'captain'}]}]}, True),
+        ('yaml', {'replacements': {'match': 'oops'}}, False),
+        ('json', {'replacements': [{'match': ['oops']}]}, False),
+        ('yaml', {'replacements': ['oops']}, False),
+        ('json', {'replacements': 'oops'}, False),
+        ('yaml', {'outcome': {'winner': 'X', 'by': {'runs': 5}}}, True),
+        ('yaml', {'outcome': {'winner': 'X', 'by': 5}}, False),
+        ('json', {'outcome': {'winner': 'X', 'by': 5}}, False),
+    ])
+    def test_validated_matches_parse(self, sample_match_data, layout, change, valid):
+        """Test that a match passing validation parses in every mode"""
+        if layout == 'yaml':
+            match = copy.deepcopy(sample_match_data)
+            ball = _first_ball(match)
+        else:
+            match = _json_match()
+            ball = match['innings'][0]['overs'][0]['deliveries'][0]
+        if isinstance(change, list) or 'kind' in change:
+            ball['wicket' if layout == 'yaml' else 'wickets'] = change
+        elif 'outcome' in change:
+            match['info'].update(change)
+        else:
+            ball.update(change)
+        assert (validate_match(match) == []) is valid
+        if not valid:
+            with pytest.raises(MatchValidationError):
+                parse_match(match, validate=True)
+            return
+        parse_match(match, validate=True)
+        parse_match(match, schema='full', validate=True)
+        parse_match(match, normalize=True, validate=True)
+        parse_info(match)
+
+
+class TestQuarantine:
+    """Test cases for validating and quarantining files during convert"""
+
+    def test_convert_quarantines_bad_files(self, tmp_path, sample_match_data, capsys):
+        """Test that failed files are copied aside and classified"""
+        src, dst, bad = tmp_path / 'src', tmp_path / 'dst', tmp_path / 'bad'
+        src.mkdir()
+        (src / 'good.yaml').write_text(yaml.dump(sample_match_data))
+        broken = copy.deepcopy(sample_match_data)
+        _first_ball(broken)['runs']['total'] = 99
+        (src / 'runs.yaml').write_text(yaml.dump(broken))
+        (src / 'syntax.yaml').write_text('{ invalid yaml ][')
+
+        code = main(['convert', str(src), str(dst), '--format', 'csv', '--validate',
+                     '--quarantine', str(bad), '--workers', '2', '-q'])
+
+        assert code == 1
+        assert '[bad_runs]' in capsys.readouterr().err
+        assert (bad / 'bad_runs' / 'runs.yaml').exists()
+        assert (bad / 'decode_error' / 'syntax.yaml').exists()
+        assert (src / 'runs.yaml').exists()
+        report = [json.loads(line) for line in (bad / 'report.jsonl').read_text().splitlines()]
+        assert sorted(entry['kind'] for entry in report) == ['bad_runs', 'decode_error']
+        assert len(list(dst.rglob('*.csv'))) == 1
@@ -0,0 +1,102 @@
+"""
+Test suite for cricpy.stats.venues module
+"""
+import copy
+
+import pytest
+import yaml
+from cricpy.cli import main
+from cricpy.io.corpus import build_corpus
+from cricpy.stats.venues import VenueIndex
+
+
+def _match(base, first_team, winner, runs, decision='bat'):
+    """Two-innings T20 match where ``first_team`` bats first scoring ``runs`` off over 0"""
+    match = copy.deepcopy(base)
+    teams = match['info']['teams']
+    second_team = teams[1] if first_team == teams[0] else teams[0]
+    ball = {'batsman': 'X', 'bowler': 'Y', 'runs': {'batsman': runs, 'extras': 0, 'total': runs}}
+    death = {'batsman': 'X', 'bowler': 'Y', 'runs': {'batsman': 6, 'extras': 0, 'total': 6}}
+    match['innings'] = [
+        {'1st innings': {'team': first_team, 'deliveries': [{0.1: ball}]}},
+        {'2nd innings': {'team': second_team, 'deliveries': [{19.1: death}]}},
+    ]
+    match['info']['toss'] = {'winner': first_team, 'decision': decision}
+    match['info']['outcome'] = {'winner': winner, 'by': {'runs': 1}}
+    return match
+
+
+@pytest.fixture
+def matches(sample_match_data):
+    home, away = sample_match_data['info']['teams']
+    return [
+        ('m1', _match(sample_match_data, home, home, 180)),
+        ('m2', _match(sample_match_data, away, home, 160, decision='field')),
+        ('m3', _match(sample_match_data, home, away, 140)),
+    ]
+
+
+class TestVenueIndex:
+    """Test cases for venue aggregates"""
+
+    def test_aggregates(self, matches):
+        """Test par score, chase success, toss outcomes and phase rates"""
+        index = VenueIndex()
+        for match_id, match in matches:
+            assert index.add(match_id, match)
+        assert index.par_score('Wankhede Stadium', 'T20') == 160
+        assert index.par_score('Wankhede Stadium', 'ODI') is None
+
+        row = index.summary().iloc[0]
+        assert row['matches'] == 3
+        assert row['chase_success_rate'] == pytest.approx(2 / 3)
+        assert row['toss_bat_rate'] == pytest.approx(2 / 3)
+        assert row['toss_bat_win_rate'] == 0.5
+        assert row['toss_field_win_rate'] == 0.0
+        assert row['powerplay_run_rate'] == 6 * 160
+        assert row['death_run_rate'] == 36
+        assert row['first_innings_std'] == pytest.approx((800 / 3) ** 0.5)
+
+    def test_incremental_save_and_load(self, tmp_path, matches):
+        """Test that a saved index can be extended without double counting"""
+        path = str(tmp_path / 'venues.json')
+        index = VenueIndex.load(path)
+        assert len(index) == 0
+        index.add(*matches[0])
+        index.save(path)
+
+        index = VenueIndex.load(path)
+        assert not index.add(*matches[0])
+        for match_id, match in matches[1:]:
+            index.add(match_id, match)
+        index.save(path)
+
+        reloaded = VenueIndex.load(path)
+        assert len(reloaded) == 3 and 'm2' in reloaded
+        assert reloaded.summary().equals(index.summary())
+
+    def test_merge(self, matches):
+        """Test merging indexes built on disjoint matches"""
+        left, right, whole = VenueIndex(), VenueIndex(), VenueIndex()
+        left.add(*matches[0])
+        for match_id, match in matches[1:]:
+            right.add(match_id, match)
+        for match_id, match in matches:
+            whole.add(match_id, match)
+        assert left.merge(right).summary().equals(whole.summary())
+        with pytest.raises(ValueError):
+            left.merge(whole)
+
+    def test_built_during_ingest(self, tmp_path, matches):
+        """Test filling the index while building a corpus, and from the CLI"""
+        index = VenueIndex()
+        build_corpus(matches, str(tmp_path / 'c'), venues=index)
+        assert index.par_score('Wankhede Stadium', 'T20') == 160
+
+        src = tmp_path / 'src'
+        src.mkdir()
+        for match_id, match in matches:
+            (src / f'{match_id}.yaml').write_text(yaml.dump(match))
+        path = str(tmp_path / 'venues.json')
+        assert main(['corpus', str(src), str(tmp_path / 'c2'), '--venue-index', path, '-q']) == 0
+        assert VenueIndex.load(path).summary().equals(index.summary())
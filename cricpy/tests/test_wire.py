@@ -0,0 +1,140 @@
+"""
+Test suite for cricpy.io.wire module
+"""
+import json
+import mmap
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+from cricpy.io.wire import (
+    RECORD_SIZE, WIRE_STRING_COLUMNS, encode_columns, iter_wire, read_wire, to_wire,
+    write_wire,
+)
+from cricpy.parsers.cricsheet_parser import parse_match
+
+
+def _comparable(df):
+    return df.drop(columns='ball').astype(object).where(df.drop(columns='ball').notna(), None)
+
+
+class TestWire:
+    """Test cases for encoding and decoding wire messages"""
+
+    @pytest.mark.parametrize('fixture', ['sample_match_data', 'match_with_all_dismissal_types',
+                                         'match_with_all_extras_types'])
+    def test_round_trip(self, request, fixture):
+        """Test that decoding reproduces parse_match output"""
+        match = request.getfixturevalue(fixture)
+        message = read_wire(to_wire(match, match_id='m1'))
+        expected = parse_match(match)
+        df = message.to_pandas()
+        assert message.match_id == 'm1'
+        assert list(df.columns) == list(expected.columns)
+        pd.testing.assert_frame_equal(_comparable(df), _comparable(expected))
+        assert df['ball'].tolist() == [float(b) for b in expected['ball']]
+
+    def test_long_over(self):
+        """Test ball numbers of an over with ten or more deliveries"""
+        wide = {'batter': 'A', 'bowler': 'B', 'runs': {'batter': 0, 'extras': 1, 'total': 1},
+                'extras': {'wides': 1}}
+        legal = {'batter': 'A', 'bowler': 'B', 'runs': {'batter': 1, 'extras': 0, 'total': 1}}
+        match = {'innings': [{'team': 'X', 'overs': [
+            {'over': 0, 'deliveries': [wide] * 10 + [legal] * 6},
+            {'over': 1, 'deliveries': [legal]},
+        ]}]}
+        df = read_wire(to_wire(match)).to_pandas()
+        expected = [float(b) for b in parse_match(match)['ball']]
+        assert df['ball'].tolist() == expected
+        assert expected[9] == 0.1 and expected[10] == 0.11
+
+    def test_layout(self, sample_match_data):
+        """Test fixed-width records read without copying"""
+        payload = to_wire(sample_match_data)
+        message = read_wire(payload)
+        assert message.match_id is None
+        assert payload.endswith(message.records.tobytes())
+        assert len(payload) - len(message) * RECORD_SIZE < 100
+        assert not message.records.flags.writeable
+        df = parse_match(sample_match_data)
+        assert message.records['runs_total'].sum() == df['runs_total'].sum()
+        batsman = df['batsman'][0]
+        assert message.strings[message.records['batsman'][0]] == batsman
+
+    def test_empty_string_dictionary(self, sample_match_data):
+        """Test a dictionary holding only the empty string"""
+        columns = parse_match(sample_match_data)
+        for name in WIRE_STRING_COLUMNS:
+            columns[name] = None
+        columns['batsman'] = ''
+        message = read_wire(encode_columns(columns))
+        assert message.strings == ['']
+        assert message.to_pandas()['batsman'].tolist() == ['', '']
+        assert message.to_pandas()['bowler'].isna().all()
+
+        columns['batsman'] = None
+        assert read_wire(encode_columns(columns, match_id='')).match_id == ''
+        assert read_wire(encode_columns(columns)).strings == []
+
+    def test_encode_dataframe(self, sample_match_data):
+        """Test that a parse_match DataFrame encodes like the match dict"""
+        df = parse_match(sample_match_data)
+        assert encode_columns(df, 'x') == to_wire(sample_match_data, 'x')
+
+    def test_stream(self, tmp_path, sample_match_data, large_match_data):
+        """Test writing and iterating a stream of messages"""
+        path = tmp_path / 'deliveries.crw'
+        total = write_wire([('a', sample_match_data), ('b', large_match_data)], str(path))
+        with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            messages = [(m.match_id, len(m)) for m in iter_wire(data)]
+        assert messages == [('a', 2), ('b', 120)]
+        assert total == 122
+
+    def test_invalid(self, sample_match_data):
+        """Test rejecting corrupt or unsupported messages"""
+        payload = to_wire(sample_match_data)
+        with pytest.raises(ValueError, match='not a cricpy'):
+            read_wire(b'XXXX' + payload[4:])
+        with pytest.raises(ValueError, match='version'):
+            read_wire(payload[:4] + b'\x09' + payload[5:])
+        with pytest.raises(ValueError, match='truncated'):
+            read_wire(payload[:-1])
+        with pytest.raises(ValueError, match='after'):
+            read_wire(payload + b'\0')
+        columns = parse_match(sample_match_data)
+        columns['runs_total'] = 300
+        with pytest.raises(ValueError, match='runs_total'):
+            encode_columns(columns)
+
+    @pytest.mark.performance
+    def test_wire_benchmark(self, large_match_data):
+        """Benchmark wire format size and decode speed against JSON"""
+        frames = []
+        for n in range(200):
+            df = parse_match(large_match_data)
+            df['batsman'] = df['batsman'] + f' {n % 40}'
+            frames.append(df)
+        df = pd.concat(frames, ignore_index=True)
+        df['ball'] = df['ball'].astype(float)
+        payload = encode_columns(df)
+        text = df.to_json(orient='records')
+
+        start = time.perf_counter()
+        for _ in range(10):
+            records = json.loads(text)
+        json_time = (time.perf_counter() - start) / 10
+        start = time.perf_counter()
+        for _ in range(10):
+            message = read_wire(payload)
+            runs = np.asarray(message.records['runs_total'], dtype=np.int64).sum()
+        wire_time = (time.perf_counter() - start) / 10
+        start = time.perf_counter()
+        message.to_pandas()
+        frame_time = time.perf_counter() - start
+        print(f'\n{len(df)} deliveries: JSON {len(text)} bytes, {json_time * 1e3:.1f} ms; '
+              f'wire {len(payload)} bytes, {wire_time * 1e3:.3f} ms '
+              f'({frame_time * 1e3:.1f} ms to pandas)')
+        assert runs == sum(r['runs_total'] for r in records)
+        assert len(payload) * 5 < len(text)
+        assert wire_time * 100 < json_time
@@ -45,6 +45,18 @@ setup(
     python_requires=">=3.7",
     install_requires=requirements,
     extras_require={
+        "parquet": [
+            "pyarrow>=8.0.0",
+        ],
+        "arrow": [
+            "pyarrow>=8.0.0",
+        ],
+        "polars": [
+            "polars>=0.20.0",
+        ],
+        "numba": [
+            "numba>=0.56.0",
+        ],
         "dev": [
             "pytest>=7.0.0",
             "pytest-cov>=4.0.0",
@@ -60,8 +72,7 @@ setup(
     },
     entry_points={
         "console_scripts": [
-            # Add any command-line scripts here
-            # "cricpy=cricpy.cli:main",
+            "cricpy=cricpy.cli:main",
         ],
     },
     include_package_data=True,